@@ -0,0 +1,211 @@
+"""
+Merge and metadata benchmark of the delta-state CRDTs
+For each CRDT, replica count and update volume, random updates are
+applied at random replicas; each replica joins its deltas into groups of
+--batch and ships every group to all other replicas. Reported: delta
+updates merged per second at the receivers, full-state merges per
+second, and the serialized bytes and metadata items per live element
+before and after a 2PS+CM sync point. A classic OR-set with unique tags
+and tombstones is the baseline for the dotted-context OR-set.
+
+Usage:
+    python benchmarks/crdt_benchmark.py [--replicas 2,4,8,16] [--updates 1000,10000,100000]
+        [--elements N] [--batch N] [--types orset,orset-tombstone,lww-map,pn-counter]
+        [--seed N] [--json FILE]
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+CHARTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CHARTS_DIR)
+
+import numpy as np
+
+from delta_crdt import DeltaCRDT, LWWMap, ORSet, PNCounter, join, synchronize
+
+class TombstoneORSet(DeltaCRDT):
+    """Baseline OR-set: every add is a unique tag and every removed tag a tombstone."""
+
+    def __init__(self, replica=None):
+        super().__init__(replica)
+        self.counter = 0
+        self.adds = {}  # element -> tags
+        self.removed = set()
+
+    @property
+    def value(self):
+        return {element for element, tags in self.adds.items() if not tags <= self.removed}
+
+    def add(self, element):
+        self.counter += 1
+        tag = (self.replica, self.counter)
+        self.adds.setdefault(element, set()).add(tag)
+        delta = self._delta()
+        delta.adds[element] = {tag}
+        return delta
+
+    def remove(self, element):
+        tags = self.adds.get(element, set()) - self.removed
+        self.removed |= tags
+        delta = self._delta()
+        delta.removed = tags
+        return delta
+
+    def merge(self, other):
+        if not self._accepts(other):
+            return self
+        for element, tags in other.adds.items():
+            self.adds.setdefault(element, set()).update(tags)
+        self.removed |= other.removed
+        return self
+
+    def collect(self):
+        adds = {}
+        for element, tags in self.adds.items():
+            live = tags - self.removed
+            if live:
+                adds[element] = live
+        self.adds = adds
+        self.removed = set()
+
+    def adopt(self, checkpoint):
+        counter = self.counter
+        super().adopt(checkpoint)
+        self.counter = counter
+
+    def metadata(self):
+        return sum(len(tags) for tags in self.adds.values()) + len(self.removed)
+
+def _set_update(crdt, element, draw):
+    return crdt.add(element) if draw < 0.6 else crdt.remove(element)
+
+def _map_update(crdt, element, draw):
+    return crdt.put(element, draw) if draw < 0.6 else crdt.remove(element)
+
+def _counter_update(crdt, element, draw):
+    return crdt.increment(1) if draw < 0.6 else crdt.decrement(1)
+
+# CRDT type -> (class, update given (replica, element, uniform draw))
+TYPES = {
+    'orset': (ORSet, _set_update),
+    'orset-tombstone': (TombstoneORSet, _set_update),
+    'lww-map': (LWWMap, _map_update),
+    'pn-counter': (PNCounter, _counter_update)
+}
+
+def _footprint(replicas):
+    """Mean serialized bytes and metadata items per live element over replicas."""
+    value = replicas[0].value
+    live = max(1, len(value)) if isinstance(value, (set, dict)) else 1
+    size = np.mean([len(pickle.dumps(replica, pickle.HIGHEST_PROTOCOL)) for replica in replicas])
+    items = np.mean([replica.metadata() for replica in replicas])
+    return size / live, items / live
+
+def run(name, n_replicas, updates, elements, batch, seed=0):
+    """
+    Replay one workload and measure merging and metadata.
+
+    Returns:
+        dict: Delta and state merge rates, bytes and metadata per element
+              before and after the sync point
+    """
+    crdt_class, update = TYPES[name]
+    rng = np.random.default_rng(seed)
+    origins = rng.integers(0, n_replicas, updates).tolist()
+    targets = rng.integers(0, elements, updates).tolist()
+    draws = rng.random(updates).tolist()
+
+    replicas = [crdt_class(i) for i in range(n_replicas)]
+    pending = [[] for _ in range(n_replicas)]
+    merge_seconds = 0.0
+    merged = 0
+
+    def ship(origin):
+        nonlocal merge_seconds, merged
+        group = join(pending[origin])
+        started = time.perf_counter()
+        for receiver, replica in enumerate(replicas):
+            if receiver != origin:
+                replica.merge(group)
+        merge_seconds += time.perf_counter() - started
+        merged += len(pending[origin]) * (n_replicas - 1)
+        pending[origin] = []
+
+    for origin, element, draw in zip(origins, targets, draws):
+        pending[origin].append(update(replicas[origin], element, draw))
+        if len(pending[origin]) == batch:
+            ship(origin)
+    for origin in range(n_replicas):
+        if pending[origin]:
+            ship(origin)
+
+    values = [replica.value for replica in replicas]
+    if any(value != values[0] for value in values):
+        raise AssertionError(f"{name}: replicas diverged")
+
+    copies = [replica.copy() for replica in replicas]
+    started = time.perf_counter()
+    state = copies[0]
+    for other in copies[1:]:
+        state.merge(other)
+    state_seconds = time.perf_counter() - started
+
+    bytes_before, items_before = _footprint(replicas)
+    synchronize(replicas)
+    bytes_after, items_after = _footprint(replicas)
+    return {
+        'type': name,
+        'replicas': n_replicas,
+        'updates': updates,
+        'delta_merges_per_sec': merged / merge_seconds if merge_seconds else float('inf'),
+        'state_merges_per_sec': (n_replicas - 1) / state_seconds if state_seconds else float('inf'),
+        'bytes_per_element': bytes_before,
+        'bytes_per_element_synced': bytes_after,
+        'metadata_per_element': items_before,
+        'metadata_per_element_synced': items_after
+    }
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark delta-CRDT merges and metadata")
+    parser.add_argument('--replicas', default='2,4,8,16', help="Comma-separated replica counts")
+    parser.add_argument('--updates', default='1000,10000,100000',
+                        help="Comma-separated update volumes")
+    parser.add_argument('--elements', type=int, default=1000,
+                        help="Distinct elements or keys updated (default: 1000)")
+    parser.add_argument('--batch', type=int, default=32,
+                        help="Deltas joined per shipped group (default: 32)")
+    parser.add_argument('--types', default=','.join(TYPES),
+                        help=f"Comma-separated CRDTs (default: {','.join(TYPES)})")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--json', default=None, help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    print(f"{args.elements:,} elements, delta groups of {args.batch}; "
+          f"per element: bytes and metadata items before -> after sync")
+    print(f"{'crdt':<16}{'replicas':>9}{'updates':>9}{'deltas/s':>12}{'states/s':>10}"
+          f"{'bytes':>16}{'metadata':>14}")
+    results = []
+    for name in args.types.split(','):
+        for n_replicas in [int(r) for r in args.replicas.split(',')]:
+            for updates in [int(u) for u in args.updates.split(',')]:
+                result = run(name, n_replicas, updates, args.elements, args.batch, args.seed)
+                results.append(result)
+                print(f"{name:<16}{n_replicas:>9}{updates:>9,}"
+                      f"{result['delta_merges_per_sec']:>12,.0f}"
+                      f"{result['state_merges_per_sec']:>10,.0f}"
+                      f"{result['bytes_per_element']:>8.0f} -> {result['bytes_per_element_synced']:<4.0f}"
+                      f"{result['metadata_per_element']:>6.1f} -> {result['metadata_per_element_synced']:<4.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
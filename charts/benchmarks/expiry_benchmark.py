@@ -0,0 +1,169 @@
+"""
+Expiry benchmark of the timing-wheel reservation store
+Replays one workload against ReservationStore and a heapq baseline (one
+(deadline, handle) entry per reservation, cancelled handles skipped when
+popped): reservations arrive at a steady rate for a window of simulated
+seconds, a share of them commit (cancel) before their TTL, and the clock
+advances one second at a time until everything left has expired. The
+store is driven both one reservation at a time and in per-second batches.
+
+Usage:
+    python benchmarks/expiry_benchmark.py [--reservations N] [--window S] [--ttl S]
+        [--cancel FRACTION] [--seed N] [--json FILE]
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import time
+
+CHARTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CHARTS_DIR)
+
+import numpy as np
+
+from reservation_store import FixedTTL, ReservationStore
+
+DEFAULT_RESERVATIONS = 1_000_000
+
+def make_workload(n, window, ttl, cancel, seed=0):
+    """
+    Build the arrival second of every reservation and the second its
+    transaction commits (-1 for reservations left to expire).
+
+    Args:
+        n: Reservations
+        window: Seconds over which they arrive
+        ttl: Reservation TTL in seconds
+        cancel: Share of reservations that commit before expiring
+        seed: Random seed
+
+    Returns:
+        tuple: (arrivals, commits) int arrays sorted by arrival
+    """
+    rng = np.random.default_rng(seed)
+    arrivals = np.sort(rng.integers(0, window, n))
+    commits = arrivals + rng.integers(0, int(ttl), n)
+    commits[rng.random(n) >= cancel] = -1
+    return arrivals, commits
+
+def _by_second(seconds, horizon):
+    """Indices of the events of each second, as a list of arrays."""
+    order = np.argsort(seconds, kind='stable')
+    bounds = np.searchsorted(seconds[order], np.arange(horizon + 1))
+    return [order[bounds[s]:bounds[s + 1]] for s in range(horizon)]
+
+def run_heapq(arrivals, commits, ttl, horizon):
+    """
+    Baseline: a binary heap of (deadline, handle) with lazy cancellation.
+
+    Returns:
+        dict: Expired count and seconds spent inserting, cancelling and expiring
+    """
+    arriving = _by_second(arrivals, horizon)
+    committing = _by_second(np.where(commits >= 0, commits, horizon), horizon)
+    heap, cancelled = [], set()
+    expired = 0
+    seconds = {'insert': 0.0, 'cancel': 0.0, 'expire': 0.0}
+    for second in range(horizon):
+        started = time.perf_counter()
+        for handle in arriving[second].tolist():
+            heapq.heappush(heap, (second + ttl, handle))
+        inserted = time.perf_counter()
+        cancelled.update(committing[second].tolist())
+        committed = time.perf_counter()
+        while heap and heap[0][0] <= second:
+            _, handle = heapq.heappop(heap)
+            if handle in cancelled:
+                cancelled.discard(handle)
+            else:
+                expired += 1
+        finished = time.perf_counter()
+        seconds['insert'] += inserted - started
+        seconds['cancel'] += committed - inserted
+        seconds['expire'] += finished - committed
+    return {'expired': expired, **seconds}
+
+def run_wheel(arrivals, commits, ttl, horizon, batched):
+    """
+    The timing-wheel store, one reservation per call or one batch per second.
+
+    Returns:
+        dict: Expired count and seconds spent inserting, cancelling and expiring
+    """
+    arriving = _by_second(arrivals, horizon)
+    committing = _by_second(np.where(commits >= 0, commits, horizon), horizon)
+    store = ReservationStore(FixedTTL(ttl), capacity=len(arrivals))
+    handles = np.zeros(len(arrivals), dtype=np.int64)
+    expired = 0
+    seconds = {'insert': 0.0, 'cancel': 0.0, 'expire': 0.0}
+    for second in range(horizon):
+        started = time.perf_counter()
+        expired += len(store.expire(second)['keys'])
+        expired_at = time.perf_counter()
+        if batched:
+            handles[arriving[second]] = store.reserve_many(arriving[second])
+        else:
+            for i in arriving[second].tolist():
+                handles[i] = store.reserve(i)
+        inserted = time.perf_counter()
+        if batched:
+            store.cancel_many(handles[committing[second]])
+        else:
+            for handle in handles[committing[second]].tolist():
+                store.cancel(handle)
+        finished = time.perf_counter()
+        seconds['expire'] += expired_at - started
+        seconds['insert'] += inserted - expired_at
+        seconds['cancel'] += finished - inserted
+    return {'expired': expired, **seconds}
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark reservation expiry against heapq")
+    parser.add_argument('--reservations', type=int, default=DEFAULT_RESERVATIONS,
+                        help=f"Reservations (default: {DEFAULT_RESERVATIONS:,})")
+    parser.add_argument('--window', type=int, default=600,
+                        help="Seconds over which reservations arrive (default: 600)")
+    parser.add_argument('--ttl', type=int, default=300, help="TTL in seconds (default: 300)")
+    parser.add_argument('--cancel', type=float, default=0.5,
+                        help="Share of reservations committed before expiry (default: 0.5)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--json', default=None, help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    arrivals, commits = make_workload(args.reservations, args.window, args.ttl,
+                                      args.cancel, args.seed)
+    horizon = args.window + args.ttl + 1
+    runs = {
+        'heapq': lambda: run_heapq(arrivals, commits, args.ttl, horizon),
+        'wheel': lambda: run_wheel(arrivals, commits, args.ttl, horizon, batched=False),
+        'wheel (batched)': lambda: run_wheel(arrivals, commits, args.ttl, horizon, batched=True)
+    }
+
+    print(f"{args.reservations:,} reservations over {args.window}s, ttl {args.ttl}s, "
+          f"{args.cancel:.0%} committed")
+    print(f"{'store':<18}{'insert/s':>14}{'cancel/s':>14}{'expire/s':>14}{'total s':>10}")
+    n_cancelled = int((commits >= 0).sum())
+    results = []
+    for name, run in runs.items():
+        result = run()
+        result['store'] = name
+        result['total'] = result['insert'] + result['cancel'] + result['expire']
+        results.append(result)
+        if result['expired'] != results[0]['expired']:
+            print(f"{name}: expired {result['expired']}, expected {results[0]['expired']}")
+            return 1
+        print(f"{name:<18}{args.reservations / result['insert']:>14,.0f}"
+              f"{n_cancelled / result['cancel']:>14,.0f}"
+              f"{result['expired'] / result['expire']:>14,.0f}{result['total']:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Import-time benchmark for the charts package
+Each module is imported in a fresh interpreter under `python -X importtime`.
+The benchmark fails if a non-rendering module pulls in matplotlib, or if a
+module's cumulative import time exceeds its budget.
+
+Usage:
+    python benchmarks/import_time_benchmark.py [--runs N] [--budget-scale X] [--json FILE]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+CHARTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must import without matplotlib, with cumulative import-time
+# budgets in milliseconds. Most of each budget is NumPy's own import.
+MODULE_BUDGETS_MS = {
+    'system_catalog': 400,
+    'distributed_systems_data': 400,
+    'chart_regions_module': 400,
+    'chart_svg_module': 450,
+    'chart_cache_module': 450,
+    'chart_batch_module': 150,
+    'chart_live_module': 450,
+    'chart_transform_module': 400,
+    'chart_density_module': 400,
+    'chart_hit_index_module': 400,
+    'chart_generator': 500,
+    'petri_net': 400,
+    'petri_reachability': 400,
+    'petri_models': 400,
+    'petri_invariants': 400,
+    'petri_simulation': 400,
+    'reservation_store': 400,
+    'quorum_availability': 400,
+    'chart_availability_module': 450,
+    'saga_coordinator': 400,
+    'delta_crdt': 400,
+    'quorum_collector': 400,
+    'token_store': 400
+}
+
+# Modules that no entry in MODULE_BUDGETS_MS may load at import time
+FORBIDDEN_MODULES = ('matplotlib',)
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Args:
+        stderr: Captured stderr of the interpreter
+
+    Returns:
+        dict: Top-level package/module name -> cumulative microseconds
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        times[name] = max(times.get(name, 0), int(cumulative_us))
+    return times
+
+def measure_module(module, runs=5):
+    """
+    Import a module in fresh interpreters and keep the fastest run.
+
+    Args:
+        module: Module name (importable from the charts directory)
+        runs: Number of interpreter launches
+
+    Returns:
+        dict: 'module', 'cumulative_ms' and 'loaded' (names of forbidden modules seen)
+    """
+    best = None
+    loaded = set()
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                              cwd=CHARTS_DIR, capture_output=True, text=True, check=True)
+        times = parse_importtime(proc.stderr)
+        cumulative_ms = times.get(module, 0) / 1000.0
+        best = cumulative_ms if best is None else min(best, cumulative_ms)
+        loaded.update(name for name in times if name.split('.')[0] in FORBIDDEN_MODULES)
+
+    return {
+        'module': module,
+        'cumulative_ms': best,
+        'loaded': sorted({name.split('.')[0] for name in loaded})
+    }
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Guard import times of the charts modules")
+    parser.add_argument('--runs', type=int, default=5,
+                        help="Interpreter launches per module (default: 5)")
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help="Multiply every budget, e.g. on slow CI machines (default: 1.0)")
+    parser.add_argument('--json', default=None, help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    failures = 0
+    for module, budget_ms in MODULE_BUDGETS_MS.items():
+        result = measure_module(module, args.runs)
+        result['budget_ms'] = budget_ms * args.budget_scale
+        problems = []
+        if result['loaded']:
+            problems.append(f"imports {', '.join(result['loaded'])}")
+        if result['cumulative_ms'] > result['budget_ms']:
+            problems.append(f"over budget ({result['budget_ms']:.0f} ms)")
+        result['ok'] = not problems
+        failures += bool(problems)
+        results.append(result)
+
+        status = 'ok' if not problems else 'FAIL: ' + '; '.join(problems)
+        print(f"{module:<28}{result['cumulative_ms']:>9.1f} ms  {status}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+Per-stage benchmark of the chart pipeline
+Times each generate_chart stage (setup_chart, setup_axes, setup_regions,
+setup_data_points, setup_labels) and the save step for each output format,
+on synthetic catalogs of increasing size. Peak Python memory per stage is
+measured in a separate tracemalloc pass so it does not skew the timings.
+Each catalog is first checked with region_statistics against per-region
+NumPy statistics, with non-finite points added outside every region.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py [--sizes 40,1000,10000,100000]
+        [--formats png,svg,pdf] [--repeat N] [--batched] [--labels fixed|placed|none]
+        [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+CHARTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CHARTS_DIR)
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import numpy as np
+
+from chart_regions_module import classify_points, region_statistics
+from distributed_systems_data import CATEGORIES, CHART_DIMENSIONS
+from system_catalog import SystemCatalog
+
+DEFAULT_SIZES = (40, 1000, 10000, 100000)
+DEFAULT_FORMATS = ('png', 'svg', 'pdf')
+
+def make_synthetic_catalog(n, seed=0):
+    """
+    Build a catalog of n systems spread uniformly over the plot area.
+
+    Args:
+        n: Number of systems
+        seed: Random seed
+
+    Returns:
+        SystemCatalog: Synthetic catalog
+    """
+    rng = np.random.default_rng(seed)
+    plot_area = CHART_DIMENSIONS['plot_area']
+    x = plot_area['x'] + rng.random(n) * plot_area['width']
+    y = plot_area['y'] + rng.random(n) * plot_area['height']
+    categories = np.array(list(CATEGORIES), dtype=object)[rng.integers(0, len(CATEGORIES), n)]
+    names = [f"system-{i}" for i in range(n)]
+    return SystemCatalog(names, x, y, categories)
+
+def check_region_statistics(catalog):
+    """
+    Compare region_statistics with statistics of each region's members,
+    after adding NaN and inf points that lie in no region.
+
+    Returns:
+        list: Names of the regions whose statistics differ
+    """
+    x = np.concatenate([catalog.x, [np.nan, np.inf, 0.0, -np.inf]])
+    y = np.concatenate([catalog.y, [0.0, 0.0, np.nan, np.inf]])
+    wrong = []
+    for stats, mask in zip(region_statistics(x, y), classify_points(x, y)):
+        expected = (None, None)
+        if mask.any():
+            expected = ((x[mask].mean(), y[mask].mean()), (x[mask].std(), y[mask].std()))
+        found = (stats['centroid'], stats['spread'])
+        if stats['count'] != mask.sum() or any(
+                (a is None) != (b is None) or (a is not None and not np.allclose(a, b))
+                for a, b in zip(found, expected)):
+            wrong.append(stats['name'])
+    return wrong
+
+def run_pipeline(data_points, formats, out_dir, batched=False, labels='fixed', timer=None):
+    """
+    Run every stage once, then save the figure in each format.
+
+    Args:
+        data_points: List of data point dicts
+        formats: Output formats to save
+        out_dir: Directory for the saved files
+        batched: Use the batched marker renderer
+        labels: 'fixed', 'placed' (collision-aware) or 'none'
+        timer: Callable(name, fn) that runs fn and records its cost
+
+    Returns:
+        dict: Output sizes in bytes per format
+    """
+    import matplotlib.pyplot as plt
+    from chart_setup_module import setup_chart
+    from chart_axes_module import setup_axes
+    from chart_regions_module import setup_regions
+    from chart_datapoints_module import setup_data_points
+    from chart_labels_module import setup_labels
+
+    fig, ax = timer('setup_chart', setup_chart)
+    timer('setup_axes', lambda: setup_axes(ax))
+    timer('setup_regions', lambda: setup_regions(ax))
+    timer('setup_data_points', lambda: setup_data_points(ax, batched=batched, data_points=data_points))
+    if labels != 'none':
+        timer('setup_labels', lambda: setup_labels(ax, avoid_collisions=(labels == 'placed'),
+                                                   data_points=data_points))
+
+    sizes = {}
+    for fmt in formats:
+        path = os.path.join(out_dir, f"chart.{fmt}")
+        timer(f"save_{fmt}", lambda: fig.savefig(path, format=fmt, bbox_inches='tight'))
+        sizes[fmt] = os.path.getsize(path)
+
+    plt.close(fig)
+    return sizes
+
+def time_pipeline(data_points, formats, out_dir, repeat, batched, labels):
+    """
+    Time every stage over several runs.
+
+    Returns:
+        tuple: (stage name -> list of durations in seconds,
+                format -> output size in bytes)
+    """
+    durations = {}
+
+    def timer(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        durations.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+    output_bytes = {}
+    for _ in range(repeat):
+        output_bytes = run_pipeline(data_points, formats, out_dir, batched, labels, timer)
+    return durations, output_bytes
+
+def trace_pipeline(data_points, formats, out_dir, batched, labels):
+    """
+    Measure the peak traced Python memory of every stage.
+
+    Returns:
+        dict: stage name -> peak bytes allocated during the stage
+    """
+    peaks = {}
+
+    def timer(name, fn):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks[name] = peak - base
+        return result
+
+    tracemalloc.start()
+    try:
+        run_pipeline(data_points, formats, out_dir, batched, labels, timer)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+def get_metadata():
+    """Describe the environment the benchmark ran in."""
+    import matplotlib
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=CHARTS_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'matplotlib': matplotlib.__version__,
+        'numpy': np.__version__
+    }
+
+def compare(results, baseline_path):
+    """Print the median-time ratio of each (systems, stage) against a baseline file."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['systems'], r['stage']): r for r in json.load(f)['results']}
+
+    print(f"\nComparison against {baseline_path} (ratio > 1 is slower):")
+    for result in results:
+        previous = baseline.get((result['systems'], result['stage']))
+        if previous and previous['median_s'] > 0:
+            ratio = result['median_s'] / previous['median_s']
+            print(f"{result['systems']:>8}  {result['stage']:<20}{ratio:>8.2f}x")
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the chart pipeline")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated catalog sizes")
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS),
+                        help="Comma-separated output formats")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per size (default: 3)")
+    parser.add_argument('--batched', action='store_true', help="Use batched marker rendering")
+    parser.add_argument('--labels', choices=('fixed', 'placed', 'none'), default='fixed',
+                        help="Label mode (default: fixed)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--output', default='pipeline_benchmark.json',
+                        help="Results file (default: pipeline_benchmark.json)")
+    parser.add_argument('--compare', default=None, help="Baseline results file to compare with")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+
+    results = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for n in sizes:
+            catalog = make_synthetic_catalog(n)
+            wrong = check_region_statistics(catalog)
+            if wrong:
+                print(f"{n:>8}  region statistics differ for: {', '.join(wrong)}")
+                return 1
+            data_points = catalog.to_data_points()
+            durations, output_bytes = time_pipeline(data_points, formats, out_dir,
+                                                    args.repeat, args.batched, args.labels)
+            peaks = {} if args.no_memory else trace_pipeline(data_points, formats, out_dir,
+                                                             args.batched, args.labels)
+
+            for stage, runs in durations.items():
+                fmt = stage[len('save_'):] if stage.startswith('save_') else None
+                result = {
+                    'systems': n,
+                    'stage': stage,
+                    'median_s': statistics.median(runs),
+                    'min_s': min(runs),
+                    'runs_s': runs,
+                    'peak_traced_bytes': peaks.get(stage),
+                    'output_bytes': output_bytes.get(fmt) if fmt else None
+                }
+                results.append(result)
+                peak = f"{result['peak_traced_bytes'] / 1e6:>9.1f} MB" if peaks else ''
+                print(f"{n:>8}  {stage:<20}{result['median_s'] * 1000:>10.1f} ms{peak}")
+
+    report = {
+        'metadata': get_metadata(),
+        'options': {
+            'sizes': sizes,
+            'formats': formats,
+            'repeat': args.repeat,
+            'batched': args.batched,
+            'labels': args.labels
+        },
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Micro-benchmark of the bitset quorum collector
+Opens many transactions at once, then feeds every participant's response
+to each of them in random order, with a share of responses retried
+(duplicated) and a share of them negative. The same stream is applied to
+QuorumCollector one vote at a time, to QuorumCollector in large and in
+small batches (where per-call overhead dominates), and to a dict-of-sets
+baseline (transaction -> yes set and no set); all three
+must reach the same decisions. Reported: votes per second and bytes per
+in-flight transaction (traced allocations).
+
+Usage:
+    python benchmarks/quorum_collector_benchmark.py [--transactions N] [--participants N]
+        [--retries FRACTION] [--no FRACTION] [--batch N] [--small-batch N] [--seed N] [--json FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+CHARTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CHARTS_DIR)
+
+import numpy as np
+
+from petri_models import majority_quorum
+from quorum_collector import PENDING, QUORUM, UNREACHABLE, QuorumCollector
+
+DEFAULT_TRANSACTIONS = 300_000
+
+def make_stream(transactions, participants, retries, no, seed=0):
+    """
+    Build a shuffled response stream.
+
+    Returns:
+        tuple: (transaction, participant, ok) arrays
+    """
+    rng = np.random.default_rng(seed)
+    txs = np.repeat(np.arange(transactions), participants)
+    parts = np.tile(np.arange(participants), transactions)
+    repeated = rng.random(len(txs)) < retries
+    txs = np.concatenate([txs, txs[repeated]])
+    parts = np.concatenate([parts, parts[repeated]])
+    oks = rng.random(len(txs)) >= no
+    order = rng.permutation(len(txs))
+    return txs[order], parts[order], oks[order]
+
+def run_baseline(transactions, participants, quorum, stream):
+    """Dict of yes/no sets per transaction; returns decisions by transaction."""
+    yes = {tx: set() for tx in range(transactions)}
+    no = {tx: set() for tx in range(transactions)}
+    decisions = {}
+    allowed = participants - quorum
+    for tx, participant, ok in zip(*(column.tolist() for column in stream)):
+        voters = yes[tx]
+        if participant in voters or participant in no[tx]:
+            continue
+        if ok:
+            voters.add(participant)
+            if len(voters) >= quorum and tx not in decisions:
+                decisions[tx] = QUORUM
+        else:
+            refusers = no[tx]
+            refusers.add(participant)
+            if len(refusers) > allowed and tx not in decisions:
+                decisions[tx] = UNREACHABLE
+    return decisions, (yes, no)
+
+def run_collector(transactions, participants, quorum, stream):
+    """One vote call per response."""
+    collector = QuorumCollector(participants, quorum, capacity=transactions)
+    handles = collector.open_many(np.arange(transactions)).tolist()
+    decisions = {}
+    for tx, participant, ok in zip(*(column.tolist() for column in stream)):
+        decision = collector.vote(handles[tx], participant, ok)
+        if decision != PENDING and tx not in decisions:
+            decisions[tx] = decision
+    return decisions, collector
+
+def run_collector_batched(transactions, participants, quorum, stream, batch):
+    """vote_many over consecutive slices of the stream."""
+    collector = QuorumCollector(participants, quorum, capacity=transactions)
+    handles = collector.open_many(np.arange(transactions))
+    txs, parts, oks = stream
+    decisions = {}
+    for start in range(0, len(txs), batch):
+        decided, outcomes = collector.vote_many(handles[txs[start:start + batch]],
+                                                parts[start:start + batch],
+                                                oks[start:start + batch])
+        keys = collector.keys[decided & 0xFFFFFFFF]
+        decisions.update(zip(keys.tolist(), outcomes.tolist()))
+    return decisions, collector
+
+def _measure(run):
+    started = time.perf_counter()
+    decisions, _ = run()
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    _, state = run()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del state
+    return decisions, seconds, size
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the bitset quorum collector")
+    parser.add_argument('--transactions', type=int, default=DEFAULT_TRANSACTIONS,
+                        help=f"Transactions in flight (default: {DEFAULT_TRANSACTIONS:,})")
+    parser.add_argument('--participants', type=int, default=5,
+                        help="Participants per transaction (default: 5)")
+    parser.add_argument('--retries', type=float, default=0.1,
+                        help="Share of responses sent twice (default: 0.1)")
+    parser.add_argument('--no', type=float, default=0.1,
+                        help="Share of negative responses (default: 0.1)")
+    parser.add_argument('--batch', type=int, default=65536,
+                        help="Responses per vote_many call (default: 65536)")
+    parser.add_argument('--small-batch', type=int, default=16,
+                        help="Responses per vote_many call in the small-batch run (default: 16)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--json', default=None, help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    n, quorum = args.participants, majority_quorum(args.participants)
+    stream = make_stream(args.transactions, n, args.retries, args.no, args.seed)
+    runs = {
+        'dict of sets': lambda: run_baseline(args.transactions, n, quorum, stream),
+        'collector': lambda: run_collector(args.transactions, n, quorum, stream),
+        'collector (batched)': lambda: run_collector_batched(args.transactions, n, quorum,
+                                                             stream, args.batch),
+        f'collector (batch {args.small_batch})': lambda: run_collector_batched(
+            args.transactions, n, quorum, stream, args.small_batch)
+    }
+
+    print(f"{args.transactions:,} transactions, {n} participants, quorum {quorum}, "
+          f"{len(stream[0]):,} responses ({args.retries:.0%} retried, {args.no:.0%} no)")
+    print(f"{'collector':<22}{'votes/s':>14}{'bytes/tx':>10}{'decided':>10}")
+    results = []
+    expected = None
+    for name, run in runs.items():
+        decisions, seconds, size = _measure(run)
+        if expected is None:
+            expected = decisions
+        elif decisions != expected:
+            print(f"{name}: decisions differ from the baseline")
+            return 1
+        result = {'collector': name, 'votes_per_sec': len(stream[0]) / seconds,
+                  'bytes_per_tx': size / args.transactions, 'decided': len(decisions),
+                  'seconds': seconds}
+        results.append(result)
+        print(f"{name:<22}{result['votes_per_sec']:>14,.0f}{result['bytes_per_tx']:>10.1f}"
+              f"{result['decided']:>10,}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
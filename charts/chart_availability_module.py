@@ -0,0 +1,119 @@
+"""
+Module for drawing commit-availability heatmaps
+One panel per protocol (2PC, 3PS, 3PS+QM) shows availability over replica
+counts and failure probabilities for one failure correlation, shaded by
+nines (-log10 of unavailability) so 0.99 and 0.9999 are told apart, and
+each cell is labelled with its availability.
+"""
+
+import numpy as np
+
+from chart_cache_module import output_format
+
+# Panel titles per protocol
+PROTOCOL_TITLES = {'2pc': '2PC', '3ps': '3PS', '3ps+qm': '3PS+QM'}
+
+# Shading saturates at this many nines
+MAX_NINES = 6
+
+def availability_nines(availability):
+    """Convert availability to nines, -log10(1 - a), capped at MAX_NINES."""
+    unavailability = np.clip(1 - np.asarray(availability, dtype=float), 10.0 ** -MAX_NINES, 1)
+    return -np.log10(unavailability)
+
+def draw_availability_heatmap(ax, result, protocol, correlation=0, cmap='viridis', annotate=True):
+    """
+    Draw one protocol's availability over n x p.
+
+    Args:
+        ax: Matplotlib axis object
+        result: Grid from quorum_availability.availability_grid
+        protocol: '2pc', '3ps' or '3ps+qm'
+        correlation: Index into result['correlation']
+        cmap: Matplotlib colormap name (default: 'viridis')
+        annotate: Label each cell with its availability (default: True)
+
+    Returns:
+        AxesImage: The heatmap artist
+    """
+    values = result['availability'][protocol][:, :, correlation]
+    nines = availability_nines(values)
+    image = ax.imshow(nines, cmap=cmap, vmin=0, vmax=MAX_NINES, origin='lower',
+                      aspect='auto', interpolation='nearest')
+
+    ax.set_xticks(range(len(result['p'])))
+    ax.set_xticklabels([f'{p:g}' for p in result['p']], fontsize=8)
+    ax.set_yticks(range(len(result['n'])))
+    if protocol == '3ps+qm':
+        labels = [f'{n} (Q={q})' for n, q in zip(result['n'], result['quorum'])]
+    else:
+        labels = [str(n) for n in result['n']]
+    ax.set_yticklabels(labels, fontsize=8)
+    ax.set_xlabel('failure probability p', fontsize=9, fontfamily='sans-serif')
+    ax.set_title(PROTOCOL_TITLES.get(protocol, protocol), fontsize=11, fontweight='bold',
+                 fontfamily='sans-serif', color='#333333')
+
+    if annotate:
+        for (i, j), value in np.ndenumerate(values):
+            color = 'black' if nines[i, j] > MAX_NINES * 0.6 else 'white'
+            ax.text(j, i, f'{value:.4f}'.rstrip('0').rstrip('.'), ha='center', va='center',
+                    fontsize=7, color=color)
+    return image
+
+def availability_figure(result, correlation=0, protocols=('2pc', '3ps', '3ps+qm'), dpi=100):
+    """
+    Build a figure with one heatmap panel per protocol.
+
+    Args:
+        result: Grid from quorum_availability.availability_grid
+        correlation: Index into result['correlation']
+        protocols: Panels to draw
+        dpi: Dots per inch
+
+    Returns:
+        fig, axes: Matplotlib figure and list of axes
+    """
+    # pyplot is loaded on the first render rather than at import time
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, len(protocols), figsize=(4 * len(protocols), 4), dpi=dpi,
+                             facecolor='white', squeeze=False)
+    axes = list(axes[0])
+    for ax, protocol in zip(axes, protocols):
+        image = draw_availability_heatmap(ax, result, protocol, correlation)
+    axes[0].set_ylabel('replicas n', fontsize=9, fontfamily='sans-serif')
+
+    rho = result['correlation'][correlation]
+    fig.suptitle(f"Commit availability (correlation {rho:g}, {result['zones']} zones)",
+                 fontsize=13, fontweight='bold', fontfamily='sans-serif', color='#333333')
+    colorbar = fig.colorbar(image, ax=axes, shrink=0.8)
+    colorbar.set_label('nines: -log10(1 - availability)', fontsize=9)
+    return fig, axes
+
+def save_availability_chart(result, output_filename, correlation=None, dpi=100):
+    """
+    Save availability heatmaps, one figure per correlation unless one is
+    chosen; with several, the correlation index is added to the file name.
+
+    Args:
+        result: Grid from quorum_availability.availability_grid
+        output_filename: Output file (.png, .svg or .pdf)
+        correlation: Index into result['correlation'] (default: all)
+        dpi: Dots per inch (default: 100)
+
+    Returns:
+        list: Files written
+    """
+    import matplotlib.pyplot as plt
+
+    indices = range(len(result['correlation'])) if correlation is None else [correlation]
+    fmt = output_format(output_filename)
+    stem = output_filename[:-len(fmt) - 1] if output_filename.endswith('.' + fmt) else output_filename
+    written = []
+    for k in indices:
+        filename = output_filename if len(indices) == 1 else f'{stem}-{k}.{fmt}'
+        fig, _ = availability_figure(result, k, dpi=dpi)
+        fig.savefig(filename, format=fmt, dpi=dpi, bbox_inches='tight')
+        plt.close(fig)
+        written.append(filename)
+    return written
@@ -2,8 +2,6 @@
 Module for setting up chart axes, grid lines, and tick labels
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.lines as mlines
 from distributed_systems_data import *
 
 def draw_plot_area_border(ax):
@@ -13,10 +11,12 @@ def draw_plot_area_border(ax):
     Args:
         ax: Matplotlib axis object
     """
+    from matplotlib.patches import Rectangle
+    
     plot_area = CHART_DIMENSIONS['plot_area']
     
     # Draw rectangle border
-    border = plt.Rectangle((plot_area['x'], plot_area['y']), 
+    border = Rectangle((plot_area['x'], plot_area['y']), 
                           plot_area['width'], plot_area['height'],
                           linewidth=1, edgecolor='#1a1a1a', 
                           facecolor='none')
@@ -0,0 +1,229 @@
+"""
+Headless batch rendering of chart variants across a process pool
+A manifest lists variants (data file, format, dpi, include_regions); each
+worker process loads matplotlib once on the Agg backend and closes every
+figure after saving it.
+
+Usage:
+    python chart_batch_module.py manifest.json [--workers N] [--output-dir DIR]
+                                               [--cache-dir DIR [--cache-max-mb MB]]
+
+Manifest format (JSON):
+    {
+        "output_dir": "out",
+        "variants": [
+            {"data": "systems.json", "format": "png", "dpi": 300, "include_regions": true},
+            {"format": "svg", "include_regions": false, "output": "plain.svg"}
+        ]
+    }
+A bare list of variants is also accepted. "data" is optional (the built-in
+data is used when omitted) and relative paths are resolved against the
+manifest's directory.
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SUPPORTED_FORMATS = ('png', 'svg', 'pdf')
+
+# Loaded once per worker by load_renderer
+_generate_chart = None
+_plt = None
+
+def normalize_variant(variant, base_dir='.', output_dir='.'):
+    """
+    Fill in defaults for a manifest variant and resolve its paths.
+
+    Args:
+        variant: Variant dict from the manifest
+        base_dir: Directory relative data paths are resolved against
+        output_dir: Directory outputs are written to
+
+    Returns:
+        dict: Variant with 'data', 'format', 'dpi', 'include_regions' and 'output'
+    """
+    fmt = variant.get('format', 'png').lower()
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of {SUPPORTED_FORMATS}")
+
+    data = variant.get('data')
+    if data is not None:
+        data = os.path.join(base_dir, data)
+
+    dpi = int(variant.get('dpi', 100))
+    include_regions = bool(variant.get('include_regions', True))
+
+    output = variant.get('output')
+    if output is None:
+        stem = os.path.splitext(os.path.basename(data))[0] if data else 'distributed_systems_chart'
+        suffix = 'regions' if include_regions else 'noregions'
+        output = f"{stem}_{suffix}_{dpi}dpi.{fmt}"
+
+    return {
+        'data': data,
+        'format': fmt,
+        'dpi': dpi,
+        'include_regions': include_regions,
+        'output': os.path.join(output_dir, output)
+    }
+
+def load_manifest(manifest_path, output_dir=None):
+    """
+    Read a manifest file and normalise its variants.
+
+    Args:
+        manifest_path: Path to the JSON manifest
+        output_dir: Override for the manifest's output directory
+
+    Returns:
+        list: Normalised variant dicts
+    """
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    if isinstance(manifest, list):
+        manifest = {'variants': manifest}
+    if output_dir is None:
+        output_dir = os.path.join(base_dir, manifest.get('output_dir', '.'))
+
+    return [normalize_variant(variant, base_dir, output_dir)
+            for variant in manifest['variants']]
+
+def init_worker():
+    """
+    Process pool initializer: select the Agg backend before anything in the
+    worker can import matplotlib.
+    """
+    os.environ['MPLBACKEND'] = 'Agg'
+
+def load_renderer():
+    """Import matplotlib and the chart modules, once per worker process."""
+    global _generate_chart, _plt
+    if _generate_chart is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        from chart_generator import generate_chart
+        _plt = plt
+        _generate_chart = generate_chart
+
+def render_variant(variant, cache_dir=None, cache_max_bytes=None):
+    """
+    Render one variant in a worker process.
+
+    Args:
+        variant: Normalised variant dict
+        cache_dir: Optional RenderCache directory; cached renders are copied
+                   without loading matplotlib
+        cache_max_bytes: Size limit for the cache (default: the cache default)
+
+    Returns:
+        dict: The variant plus 'ok', 'seconds', 'cached' and 'error' (if any)
+    """
+    from system_catalog import SystemCatalog
+
+    result = dict(variant)
+    result['cached'] = False
+    start = time.perf_counter()
+    fig = None
+    try:
+        data_points = None
+        if variant['data'] is not None:
+            data_points = SystemCatalog.load(variant['data'])
+
+        output_dir = os.path.dirname(variant['output'])
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        if cache_dir is not None:
+            from chart_cache_module import RenderCache, DEFAULT_MAX_BYTES, cached_generate_chart
+            cache = RenderCache(cache_dir, cache_max_bytes or DEFAULT_MAX_BYTES)
+            result['cached'] = cached_generate_chart(variant['output'],
+                                                     dpi=variant['dpi'],
+                                                     include_regions=variant['include_regions'],
+                                                     data_points=data_points,
+                                                     cache=cache)
+        else:
+            load_renderer()
+            if data_points is not None:
+                data_points = data_points.to_data_points()
+            fig, _ = _generate_chart(output_filename=variant['output'],
+                                     dpi=variant['dpi'],
+                                     show_plot=False,
+                                     include_regions=variant['include_regions'],
+                                     data_points=data_points)
+        result['ok'] = True
+    except Exception as e:
+        result['ok'] = False
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if fig is not None:
+            _plt.close(fig)
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def render_batch(variants, workers=None, cache_dir=None, cache_max_bytes=None):
+    """
+    Render variants in parallel.
+
+    Args:
+        variants: List of normalised variant dicts
+        workers: Number of worker processes (default: CPU count)
+        cache_dir: Optional RenderCache directory shared by all workers
+        cache_max_bytes: Size limit for the cache (default: the cache default)
+
+    Returns:
+        list: Result dicts in manifest order
+    """
+    render = functools.partial(render_variant, cache_dir=cache_dir,
+                               cache_max_bytes=cache_max_bytes)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        return list(pool.map(render, variants))
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Render chart variants from a manifest")
+    parser.add_argument('manifest', help="JSON manifest of variants")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--output-dir', default=None,
+                        help="Directory for outputs (overrides the manifest)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Reuse unchanged renders from this cache directory")
+    parser.add_argument('--cache-max-mb', type=float, default=None,
+                        help="Cache size limit in megabytes")
+    args = parser.parse_args(argv)
+
+    cache_max_bytes = None
+    if args.cache_max_mb is not None:
+        cache_max_bytes = int(args.cache_max_mb * 1024 * 1024)
+
+    variants = load_manifest(args.manifest, args.output_dir)
+    start = time.perf_counter()
+    results = render_batch(variants, args.workers, args.cache_dir, cache_max_bytes)
+    elapsed = time.perf_counter() - start
+
+    failures = 0
+    for result in results:
+        if result['ok']:
+            source = 'cached' if result['cached'] else 'ok'
+            print(f"{source:<8}{result['output']} ({result['seconds']:.2f}s)")
+        else:
+            failures += 1
+            print(f"FAILED  {result['output']}: {result['error']}")
+    print(f"{len(results) - failures}/{len(results)} variants rendered in {elapsed:.2f}s")
+    if args.cache_dir is not None:
+        hits = sum(1 for result in results if result['cached'])
+        print(f"cache: {hits} hits, {len(results) - hits} misses")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Content-addressed cache for rendered chart files
+Renders are keyed on a hash of everything that affects the output (system
+data, categories, titles, axes, trade-off line, regions, annotations,
+format, dpi and options). Cached
+files are kept on disk with size-bounded LRU eviction, and a cache hit is
+served without importing matplotlib.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from distributed_systems_data import *
+from system_catalog import SystemCatalog
+from chart_regions_module import REGIONS, REGION_ANNOTATIONS
+from chart_observers_module import NULL_OBSERVER
+
+# Bump when a rendering module changes its output so old entries stop matching
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dxp-charts')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+def fingerprint_data_points(data_points):
+    """
+    Hash the contents of a SystemCatalog or a list of data point dicts.
+
+    Args:
+        data_points: SystemCatalog or list of dicts with name, x, y and category
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    if isinstance(data_points, SystemCatalog):
+        digest.update(b'catalog')
+        digest.update('\0'.join(data_points.names.tolist()).encode('utf-8'))
+        digest.update(data_points.x.tobytes())
+        digest.update(data_points.y.tobytes())
+        digest.update('\0'.join(data_points.categories.tolist()).encode('utf-8'))
+    else:
+        rows = [(dp['name'], float(dp['x']), float(dp['y']), dp['category'])
+                for dp in data_points]
+        digest.update(json.dumps(rows, separators=(',', ':')).encode('utf-8'))
+    return digest.hexdigest()
+
+def render_key(data_points=None, fmt='png', dpi=100, include_regions=True):
+    """
+    Compute the cache key of a render.
+
+    Args:
+        data_points: SystemCatalog or list of data point dicts (default: the built-in data)
+        fmt: Output format ('png', 'svg' or 'pdf')
+        dpi: Output resolution
+        include_regions: Whether regions are drawn
+
+    Returns:
+        str: Hex digest identifying the rendered output
+    """
+    if data_points is None:
+        data_points = DATA_POINTS
+
+    # Annotations only render when their parent system is present
+    if isinstance(data_points, SystemCatalog):
+        annotations = [a for a in ANNOTATIONS if a['parent'] in data_points]
+    else:
+        annotations = get_annotations_for(data_points)
+
+    inputs = {
+        'version': CACHE_VERSION,
+        'data': fingerprint_data_points(data_points),
+        'categories': CATEGORIES,
+        'title': CHART_TITLE,
+        'axis_labels': [X_AXIS_LABEL, Y_AXIS_LABEL],
+        'axis_categories': [X_AXIS_CATEGORIES, Y_AXIS_CATEGORIES],
+        'trade_off_line': TRADE_OFF_LINE,
+        'dimensions': CHART_DIMENSIONS,
+        'regions': REGIONS if include_regions else None,
+        'region_annotations': REGION_ANNOTATIONS if include_regions else None,
+        'annotations': annotations,
+        'format': fmt,
+        'dpi': dpi
+    }
+    encoded = json.dumps(inputs, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class RenderCache:
+    """
+    Directory of rendered files named by their cache key, evicted least
+    recently used first once their total size exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, key, fmt):
+        """Get the path a cached render is stored at."""
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def get(self, key, fmt):
+        """
+        Look up a render and mark it as recently used.
+
+        Args:
+            key: Cache key from render_key
+            fmt: Output format
+
+        Returns:
+            str: Path of the cached file, or None on a miss
+        """
+        path = self.path_for(key, fmt)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def fetch(self, key, fmt, destination):
+        """
+        Copy a cached render to destination and mark it as recently used.
+
+        Args:
+            key: Cache key from render_key
+            fmt: Output format
+            destination: Path to copy the render to
+
+        Returns:
+            bool: False on a miss, including an entry another process
+                  evicts between the lookup and the copy
+        """
+        path = self.path_for(key, fmt)
+        try:
+            os.utime(path)
+            shutil.copyfile(path, destination)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def put(self, key, fmt, source_path):
+        """
+        Store a rendered file and evict old entries if over the size limit.
+
+        Args:
+            key: Cache key from render_key
+            fmt: Output format
+            source_path: File to copy into the cache
+
+        Returns:
+            str: Path of the cached copy
+        """
+        path = self.path_for(key, fmt)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def entries(self):
+        """
+        List cached files.
+
+        Returns:
+            list: (last used time, size, path) tuples, oldest first
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # evicted by another process
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """Delete least recently used files until the cache fits max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Delete every cached file."""
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+
+    def stats(self):
+        """
+        Get cache counters and current size.
+
+        Returns:
+            dict: hits, misses, evictions, hit_rate, entries and bytes
+        """
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries)
+        }
+
+_default_cache = None
+
+def get_default_cache():
+    """Get the shared RenderCache in DEFAULT_CACHE_DIR, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RenderCache()
+    return _default_cache
+
+def output_format(output_filename):
+    """Get the output format generate_chart uses for a filename."""
+    for fmt in ('svg', 'pdf'):
+        if output_filename.endswith('.' + fmt):
+            return fmt
+    return 'png'
+
+def cached_generate_chart(output_filename, dpi=100, include_regions=True,
+                          data_points=None, cache=None, observer=None):
+    """
+    Write the chart to output_filename, reusing a cached render when the
+    inputs are unchanged. matplotlib is only imported on a miss.
+
+    Args:
+        output_filename: Where to write the chart (format from the extension)
+        dpi: Dots per inch for the output (default: 100)
+        include_regions: Whether to include highlighted regions (default: True)
+        data_points: SystemCatalog or list of data point dicts (default: DATA_POINTS)
+        cache: RenderCache to use (default: get_default_cache())
+        observer: ChartObserver notified of the lookup and output (default: no-op)
+
+    Returns:
+        bool: True if the output came from the cache
+    """
+    if cache is None:
+        cache = get_default_cache()
+    if observer is None:
+        observer = NULL_OBSERVER
+
+    start = time.perf_counter()
+    fmt = output_format(output_filename)
+    key = render_key(data_points, fmt, dpi, include_regions)
+
+    # Workers sharing the cache may evict the entry at any time, so the
+    # lookup and the copy are one step and a vanished entry is a miss
+    hit = cache.fetch(key, fmt, output_filename)
+    observer.cache_lookup(key, hit)
+    if hit:
+        observer.chart_saved(output_filename, fmt, os.path.getsize(output_filename),
+                             time.perf_counter() - start, cached=True)
+        return True
+
+    import matplotlib.pyplot as plt
+    from chart_generator import generate_chart
+
+    if isinstance(data_points, SystemCatalog):
+        data_points = data_points.to_data_points()
+
+    fig, _ = generate_chart(output_filename=output_filename, dpi=dpi, show_plot=False,
+                            include_regions=include_regions, data_points=data_points,
+                            observer=observer)
+    plt.close(fig)
+    cache.put(key, fmt, output_filename)
+    return False
+
+def cached_generate_high_quality_chart(output_filename='distributed_systems_chart.png',
+                                       cache=None, observer=None):
+    """Cached equivalent of generate_high_quality_chart."""
+    return cached_generate_chart(output_filename, dpi=300, cache=cache, observer=observer)
+
+def cached_generate_svg_chart(output_filename='distributed_systems_chart.svg',
+                              cache=None, observer=None):
+    """Cached equivalent of generate_svg_chart."""
+    return cached_generate_chart(output_filename, cache=cache, observer=observer)
@@ -2,11 +2,9 @@
 Module for plotting data points on the chart
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import RegularPolygon
 import numpy as np
 from distributed_systems_data import *
+from system_catalog import SystemCatalog
 
 def get_marker_properties(category):
     """
@@ -65,7 +63,7 @@ def plot_data_point(ax, x, y, category):
             markeredgewidth=props['linewidth'],
             zorder=props['zorder'])
 
-def plot_all_data_points(ax):
+def plot_all_data_points(ax, data_points=None):
     """
     Plot all data points on the chart.
     Note: This only plots the markers, not the labels.
@@ -73,18 +71,100 @@ def plot_all_data_points(ax):
     
     Args:
         ax: Matplotlib axis object
+        data_points: List of data point dicts (default: DATA_POINTS)
     """
-    for data_point in DATA_POINTS:
+    if data_points is None:
+        data_points = DATA_POINTS
+    
+    for data_point in data_points:
         plot_data_point(ax, 
                        data_point['x'], 
                        data_point['y'], 
                        data_point['category'])
 
-def setup_data_points(ax):
+def group_points_by_category(data_points):
+    """
+    Group data point coordinates by category, keeping first-seen category order.
+    
+    Args:
+        data_points: SystemCatalog, or list of data point dicts with 'x', 'y'
+                     and 'category'
+    
+    Returns:
+        dict: category -> (x array, y array)
+    """
+    if isinstance(data_points, SystemCatalog):
+        return data_points.category_groups()
+    
+    groups = {}
+    for data_point in data_points:
+        xs, ys = groups.setdefault(data_point['category'], ([], []))
+        xs.append(data_point['x'])
+        ys.append(data_point['y'])
+    
+    return {category: (np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+            for category, (xs, ys) in groups.items()}
+
+def plot_category_points(ax, xs, ys, category):
+    """
+    Plot every point of one category as a single marker-only artist.
+    
+    Args:
+        ax: Matplotlib axis object
+        xs: Array of X coordinates
+        ys: Array of Y coordinates
+        category: Category shared by all the points
+    
+    Returns:
+        Line2D: The artist holding all markers of the category
+    """
+    props = get_marker_properties(category)
+    
+    # One Line2D with no connecting line renders each marker exactly like
+    # plot_data_point does, but costs one artist per category
+    line, = ax.plot(xs, ys,
+                    linestyle='none',
+                    marker=props['marker'],
+                    markersize=props['markersize'],
+                    markerfacecolor=props['color'],
+                    markeredgecolor=props['edgecolor'],
+                    markeredgewidth=props['linewidth'],
+                    zorder=props['zorder'])
+    return line
+
+def plot_all_data_points_batched(ax, data_points=None):
+    """
+    Plot all data points with one artist per category.
+    Produces the same image as plot_all_data_points but scales to
+    hundreds of thousands of points.
+    
+    Args:
+        ax: Matplotlib axis object
+        data_points: SystemCatalog or list of data point dicts (default: CATALOG)
+    
+    Returns:
+        dict: category -> Line2D artist
+    """
+    if data_points is None:
+        data_points = CATALOG
+    
+    artists = {}
+    for category, (xs, ys) in group_points_by_category(data_points).items():
+        artists[category] = plot_category_points(ax, xs, ys, category)
+    
+    return artists
+
+def setup_data_points(ax, batched=False, data_points=None):
     """
     Main function to set up all data points.
     
     Args:
         ax: Matplotlib axis object
+        batched: Draw one artist per category instead of one per point (default: False)
+        data_points: List of data point dicts, or a SystemCatalog when batched
+                     (default: the built-in data)
     """
-    plot_all_data_points(ax)
\ No newline at end of file
+    if batched:
+        plot_all_data_points_batched(ax, data_points)
+    else:
+        plot_all_data_points(ax, data_points)
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Module for density rendering of very large point sets
+Observations are streamed from a file in fixed-size chunks and binned into
+a raster over the plot area, so memory is bounded by the raster rather than
+the number of points. The raster is drawn underneath the axes, regions and
+named-system markers.
+"""
+
+import itertools
+
+import numpy as np
+
+from distributed_systems_data import *
+from chart_transform_module import CHART_TRANSFORM
+
+# Rows read from a data file per chunk
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# Raster cell size in chart units (one unit is one pixel at 100 dpi)
+DEFAULT_CELL_SIZE = 2.0
+
+# Below the regions (zorder 1) and grid lines (zorder 2)
+DENSITY_ZORDER = 0.5
+
+class DensityGrid:
+    """
+    Fixed-size 2D histogram over a rectangle of the chart.
+    """
+
+    def __init__(self, bounds=None, cell_size=DEFAULT_CELL_SIZE):
+        """
+        Args:
+            bounds: (x_min, y_min, x_max, y_max) in chart coordinates
+                    (default: the plot area)
+            cell_size: Width and height of one cell in chart units
+        """
+        if bounds is None:
+            bounds = CHART_TRANSFORM.plot_bounds()
+        self.bounds = tuple(float(b) for b in bounds)
+        self.cell_size = float(cell_size)
+
+        x_min, y_min, x_max, y_max = self.bounds
+        self.nx = max(1, int(np.ceil((x_max - x_min) / self.cell_size)))
+        self.ny = max(1, int(np.ceil((y_max - y_min) / self.cell_size)))
+
+        # Row 0 is the top of the chart (smallest y), matching the inverted Y axis
+        self.counts = np.zeros((self.ny, self.nx), dtype=np.int64)
+        self.total = 0
+        self.outside = 0
+
+    def add(self, x, y):
+        """
+        Bin a chunk of points.
+
+        Args:
+            x: Chart X coordinates
+            y: Chart Y coordinates
+
+        Returns:
+            int: Number of points that fell inside the grid
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        x_min, y_min, x_max, y_max = self.bounds
+
+        col = np.floor((x - x_min) / self.cell_size)
+        row = np.floor((y - y_min) / self.cell_size)
+        inside = (col >= 0) & (col < self.nx) & (row >= 0) & (row < self.ny)
+
+        # bincount over flat cell indices is a much cheaper histogram2d for
+        # uniform bins
+        flat = row[inside].astype(np.intp) * self.nx + col[inside].astype(np.intp)
+        self.counts += np.bincount(flat, minlength=self.nx * self.ny).reshape(self.ny, self.nx)
+
+        binned = len(flat)
+        self.total += binned
+        self.outside += len(x) - binned
+        return binned
+
+    def merge(self, other):
+        """
+        Add the counts of another grid with the same bounds and cell size
+        (e.g. one filled by a worker process).
+
+        Args:
+            other: DensityGrid
+        """
+        if other.bounds != self.bounds or other.cell_size != self.cell_size:
+            raise ValueError("Can only merge density grids with the same bounds and cell size")
+        self.counts += other.counts
+        self.total += other.total
+        self.outside += other.outside
+
+    def extent(self):
+        """
+        Get the raster extent for imshow.
+
+        Returns:
+            tuple: (left, right, bottom, top) in chart coordinates
+        """
+        x_min, y_min, _, _ = self.bounds
+        return (x_min, x_min + self.nx * self.cell_size,
+                y_min + self.ny * self.cell_size, y_min)
+
+def _parse_columns(header, columns):
+    """Resolve column names against a CSV header into indices."""
+    indices = []
+    for column in columns:
+        if isinstance(column, int):
+            indices.append(column)
+        elif column in header:
+            indices.append(header.index(column))
+        else:
+            raise ValueError(f"Column '{column}' not in header {header}")
+    return indices
+
+def iter_point_chunks(path, columns=(0, 1), chunk_rows=DEFAULT_CHUNK_ROWS, delimiter=','):
+    """
+    Stream (x, y) column pairs from a file, one chunk at a time.
+    .npy files (an (n, k) array) are memory-mapped; anything else is read
+    as delimited text, with an optional header row.
+
+    Args:
+        path: Data file
+        columns: Two column indices, or header names for text files
+        chunk_rows: Rows per chunk
+        delimiter: Text field separator (default: ',')
+
+    Yields:
+        tuple: (first column array, second column array)
+    """
+    if str(path).lower().endswith('.npy'):
+        data = np.load(path, mmap_mode='r')
+        first, second = columns
+        for start in range(0, len(data), chunk_rows):
+            chunk = np.asarray(data[start:start + chunk_rows])
+            yield chunk[:, first].astype(float), chunk[:, second].astype(float)
+        return
+
+    with open(path, encoding='utf-8') as f:
+        first_line = f.readline()
+        fields = [field.strip() for field in first_line.split(delimiter)]
+        try:
+            [float(field) for field in fields]
+            pending = [first_line]
+            header = []
+        except ValueError:
+            pending = []
+            header = fields
+        indices = _parse_columns(header, columns)
+
+        while True:
+            lines = pending + list(itertools.islice(f, chunk_rows - len(pending)))
+            pending = []
+            if not lines:
+                return
+            chunk = np.loadtxt(lines, delimiter=delimiter, usecols=indices, ndmin=2)
+            yield chunk[:, 0], chunk[:, 1]
+
+def density_from_file(path, columns=(0, 1), coordinates='measurements', grid=None,
+                      chunk_rows=DEFAULT_CHUNK_ROWS, delimiter=',', transform=None):
+    """
+    Bin every point in a file into a density grid.
+
+    Args:
+        path: Data file (.npy or delimited text)
+        columns: The two columns to read (indices, or header names)
+        coordinates: 'measurements' for (RTT, agreement fraction) columns,
+                     'chart' for chart (x, y) columns (default: 'measurements')
+        grid: DensityGrid to add to (default: a new grid over the plot area)
+        chunk_rows: Rows read per chunk
+        delimiter: Text field separator (default: ',')
+        transform: ChartTransform for measurements (default: CHART_TRANSFORM)
+
+    Returns:
+        DensityGrid: The filled grid
+    """
+    if coordinates not in ('measurements', 'chart'):
+        raise ValueError(f"coordinates must be 'measurements' or 'chart', not '{coordinates}'")
+    if grid is None:
+        grid = DensityGrid()
+    if transform is None:
+        transform = CHART_TRANSFORM
+
+    for first, second in iter_point_chunks(path, columns, chunk_rows, delimiter):
+        if coordinates == 'measurements':
+            first, second = transform.transform(first, second)
+        grid.add(first, second)
+
+    return grid
+
+def draw_density(ax, grid, cmap='Greys', log_scale=True, alpha=0.8):
+    """
+    Draw a density grid under the rest of the chart. Empty cells are left
+    transparent.
+
+    Args:
+        ax: Matplotlib axis object
+        grid: DensityGrid
+        cmap: Matplotlib colormap name (default: 'Greys')
+        log_scale: Shade by log(1 + count) rather than count (default: True)
+        alpha: Raster opacity (default: 0.8)
+
+    Returns:
+        AxesImage: The raster artist
+    """
+    values = np.log1p(grid.counts) if log_scale else grid.counts.astype(float)
+    values = np.ma.masked_equal(values, 0)
+
+    return ax.imshow(values, cmap=cmap, alpha=alpha, extent=grid.extent(),
+                     origin='upper', interpolation='nearest', aspect=ax.get_aspect(),
+                     zorder=DENSITY_ZORDER)
+
+def setup_density(ax, grid, **kwargs):
+    """
+    Main function to set up the density layer.
+    Can be called at any point; the raster's zorder keeps it underneath.
+
+    Args:
+        ax: Matplotlib axis object
+        grid: DensityGrid
+        **kwargs: Passed to draw_density
+    
+    Returns:
+        AxesImage: The raster artist
+    """
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+    image = draw_density(ax, grid, **kwargs)
+
+    # imshow rescales the view to the raster; restore the axis limits
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    return image
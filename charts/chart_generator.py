@@ -3,14 +3,23 @@ Main module to generate the complete Distributed Systems State-Convergence Chart
 This module orchestrates all the individual components to create the final chart.
 """
 
-import matplotlib.pyplot as plt
+import logging
+import os
+import warnings
+
 from chart_setup_module import setup_chart
 from chart_axes_module import setup_axes
 from chart_regions_module import setup_regions
 from chart_datapoints_module import setup_data_points
 from chart_labels_module import setup_labels
+from chart_density_module import setup_density
+from chart_hit_index_module import write_hit_index
+from chart_svg_module import write_svg_chart
+from chart_observers_module import NULL_OBSERVER, LoggingObserver, observed_stage
 
-def generate_chart(output_filename=None, dpi=100, show_plot=True, include_regions=True):
+def generate_chart(output_filename=None, dpi=100, show_plot=True, include_regions=True,
+                   data_points=None, observer=None, density=None, hit_index=False,
+                   verbose=None):
     """
     Generate the complete distributed systems state-convergence chart.
     
@@ -19,46 +28,74 @@ def generate_chart(output_filename=None, dpi=100, show_plot=True, include_region
         dpi: Dots per inch for the output (default: 100)
         show_plot: Whether to display the plot interactively (default: True)
         include_regions: Whether to include highlighted regions (default: True)
+        data_points: List of data point dicts to plot (default: DATA_POINTS)
+        observer: ChartObserver notified of stage timings and outputs (default: no-op)
+        density: DensityGrid to draw underneath everything else (default: None)
+        hit_index: Also write a '.hits.json' hit-testing index next to the
+                   output file (default: False)
+        verbose: Deprecated; True logs progress like observer=LoggingObserver()
     
     Returns:
         fig, ax: Matplotlib figure and axis objects
     """
+    if verbose is not None:
+        warnings.warn("generate_chart(verbose=...) is deprecated; pass "
+                      "observer=LoggingObserver() instead", DeprecationWarning, stacklevel=2)
+        if verbose and observer is None:
+            observer = LoggingObserver()
+    if observer is None:
+        observer = NULL_OBSERVER
+    
     # Step 1: Set up the basic chart structure (figure, titles, legend)
-    print("Setting up chart structure...")
-    fig, ax = setup_chart()
+    with observed_stage(observer, 'setup_chart') as stage:
+        fig, ax = setup_chart()
+        stage.ax = ax
+    
+    # Optional density raster of bulk observations (drawn underneath everything)
+    if density is not None:
+        with observed_stage(observer, 'setup_density', ax):
+            setup_density(ax, density)
     
     # Step 2: Set up axes (borders, grid lines, ticks, labels, trade-off line)
-    print("Setting up axes and grid...")
-    setup_axes(ax)
+    with observed_stage(observer, 'setup_axes', ax):
+        setup_axes(ax)
     
     # Step 3: Add highlighted regions (if requested)
     if include_regions:
-        print("Adding highlighted regions...")
-        setup_regions(ax)
+        with observed_stage(observer, 'setup_regions', ax):
+            setup_regions(ax)
     
     # Step 4: Plot all data points (markers only, no labels yet)
-    print("Plotting data points...")
-    setup_data_points(ax)
+    with observed_stage(observer, 'setup_data_points', ax):
+        setup_data_points(ax, data_points=data_points)
     
     # Step 5: Add labels (must be done last to ensure they appear on top)
-    print("Adding labels...")
-    setup_labels(ax)
+    with observed_stage(observer, 'setup_labels', ax):
+        setup_labels(ax, data_points=data_points)
     
     # Save the chart if filename is provided
     if output_filename:
-        print(f"Saving chart to {output_filename}...")
-        # Determine format from filename
-        if output_filename.endswith('.svg'):
-            fig.savefig(output_filename, format='svg', dpi=dpi, bbox_inches='tight')
-        elif output_filename.endswith('.pdf'):
-            fig.savefig(output_filename, format='pdf', dpi=dpi, bbox_inches='tight')
-        else:
-            # Default to PNG for other extensions
-            fig.savefig(output_filename, dpi=dpi, bbox_inches='tight')
-        print(f"Chart saved successfully!")
+        with observed_stage(observer, 'save') as stage:
+            # Determine format from filename
+            if output_filename.endswith('.svg'):
+                fmt = 'svg'
+                fig.savefig(output_filename, format='svg', dpi=dpi, bbox_inches='tight')
+            elif output_filename.endswith('.pdf'):
+                fmt = 'pdf'
+                fig.savefig(output_filename, format='pdf', dpi=dpi, bbox_inches='tight')
+            else:
+                # Default to PNG for other extensions
+                fmt = 'png'
+                fig.savefig(output_filename, dpi=dpi, bbox_inches='tight')
+        observer.chart_saved(output_filename, fmt, os.path.getsize(output_filename),
+                             stage.seconds)
+        
+        if hit_index:
+            write_hit_index(output_filename, data_points, fig, dpi)
     
     # Show the plot if requested
     if show_plot:
+        import matplotlib.pyplot as plt
         plt.show()
     
     return fig, ax
@@ -87,14 +124,35 @@ def generate_svg_chart(output_filename='distributed_systems_chart.svg'):
     """
     return generate_chart(output_filename=output_filename, show_plot=False)
 
+def generate_native_svg_chart(output_filename='distributed_systems_chart.svg', include_regions=True,
+                              hit_index=False):
+    """
+    Generate an SVG version of the chart by writing SVG directly.
+    Much faster than generate_svg_chart since no matplotlib figure is built.
+    
+    Args:
+        output_filename: Output filename (default: 'distributed_systems_chart.svg')
+        include_regions: Whether to include highlighted regions (default: True)
+        hit_index: Also write a '.hits.json' hit-testing index (default: False)
+    
+    Returns:
+        str: The output filename
+    """
+    write_svg_chart(output_filename, include_regions=include_regions)
+    if hit_index:
+        write_hit_index(output_filename)
+    return output_filename
+
 if __name__ == "__main__":
-    # Example usage: generate and display the chart
+    # Example usage: generate and display the chart, logging stage timings
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     print("Generating Distributed Systems State-Convergence Chart...")
-    fig, ax = generate_chart()
+    fig, ax = generate_chart(observer=LoggingObserver())
     
     # Optionally save in multiple formats
     # generate_high_quality_chart('chart_high_res.png')
     # generate_svg_chart('chart_vector.svg')
+    # generate_native_svg_chart('chart_vector_fast.svg')
     
     # Generate without regions
     # fig, ax = generate_chart(include_regions=False)
@@ -0,0 +1,370 @@
+"""
+Module for resolving the system under a cursor
+HitIndex buckets system coordinates into a uniform grid stored as CSR arrays
+(points sorted by cell plus per-cell start offsets) and answers k-nearest
+and radius queries in chart or image pixel coordinates. The same arrays are
+exported as JSON next to a rendered chart, so a frontend can answer hover
+and click hits with an identical lookup and no Python.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from distributed_systems_data import *
+
+# Target average number of systems per grid cell
+DEFAULT_POINTS_PER_CELL = 2.0
+
+# Format version of the exported JSON
+HIT_INDEX_VERSION = 1
+
+# Matplotlib writes vector formats in points (72 per inch) whatever the dpi
+VECTOR_DPI = 72
+VECTOR_FORMATS = ('.svg', '.pdf')
+
+class DisplayTransform:
+    """
+    Axis-aligned affine map from chart coordinates to image pixels
+    (origin at the top-left of the rendered image).
+    """
+
+    def __init__(self, scale_x=1.0, scale_y=1.0, offset_x=0.0, offset_y=0.0):
+        self.scale_x = float(scale_x)
+        self.scale_y = float(scale_y)
+        self.offset_x = float(offset_x)
+        self.offset_y = float(offset_y)
+
+    @classmethod
+    def for_figure(cls, fig, dpi=None, bbox_inches='tight', pad_inches=None):
+        """
+        Get the transform of an image saved with fig.savefig.
+
+        Args:
+            fig: Figure holding the chart axis
+            dpi: Resolution the image is saved at (default: the figure's dpi)
+            bbox_inches: 'tight' if the image was saved cropped, as
+                         generate_chart does (default: 'tight')
+            pad_inches: Padding of the tight crop (default: savefig.pad_inches)
+
+        Returns:
+            DisplayTransform: Chart coordinates -> image pixels
+        """
+        import matplotlib
+
+        if dpi is None:
+            dpi = fig.dpi
+        scale = dpi / fig.dpi
+
+        ax = fig.axes[0]
+        (x0, y0), (x1, y1) = ax.transData.transform([(0, 0), (1, 1)])
+
+        if bbox_inches == 'tight':
+            if pad_inches is None:
+                pad_inches = matplotlib.rcParams['savefig.pad_inches']
+            bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(pad_inches)
+            left, top = bbox.x0 * dpi, bbox.y1 * dpi
+        else:
+            left, top = 0.0, fig.bbox.height * scale
+
+        # Display y grows upwards, image rows grow downwards
+        return cls(scale_x=(x1 - x0) * scale,
+                   scale_y=-(y1 - y0) * scale,
+                   offset_x=x0 * scale - left,
+                   offset_y=top - y0 * scale)
+
+    def to_display(self, x, y):
+        """Map chart coordinates to image pixels."""
+        return (np.asarray(x, dtype=float) * self.scale_x + self.offset_x,
+                np.asarray(y, dtype=float) * self.scale_y + self.offset_y)
+
+    def to_data(self, px, py):
+        """Map image pixels to chart coordinates."""
+        return ((np.asarray(px, dtype=float) - self.offset_x) / self.scale_x,
+                (np.asarray(py, dtype=float) - self.offset_y) / self.scale_y)
+
+    def pixels_per_unit(self):
+        """Get the (mean) image pixels per chart unit, for converting radii."""
+        return (abs(self.scale_x) + abs(self.scale_y)) / 2
+
+    def to_dict(self):
+        return {
+            'scale_x': self.scale_x,
+            'scale_y': self.scale_y,
+            'offset_x': self.offset_x,
+            'offset_y': self.offset_y
+        }
+
+# Native SVG output uses chart coordinates as its viewBox
+IDENTITY_TRANSFORM = DisplayTransform()
+
+class HitIndex:
+    """
+    Uniform grid over system coordinates for nearest and radius queries.
+    Query results are catalog row indices, nearest first.
+    """
+
+    def __init__(self, x, y, names=None, cell_size=None):
+        """
+        Build the index.
+
+        Args:
+            x: X coordinates
+            y: Y coordinates
+            names: Optional system names, one per point
+            cell_size: Grid cell size in chart units (default: sized for
+                       DEFAULT_POINTS_PER_CELL systems per cell)
+        """
+        self.x = np.asarray(x, dtype=float).ravel()
+        self.y = np.asarray(y, dtype=float).ravel()
+        if len(self.x) != len(self.y):
+            raise ValueError("x and y must have the same length")
+        self.names = None if names is None else np.asarray(names, dtype=object)
+
+        n = len(self.x)
+        if n:
+            self.x0, self.y0 = float(self.x.min()), float(self.y.min())
+            width = float(self.x.max()) - self.x0
+            height = float(self.y.max()) - self.y0
+        else:
+            self.x0 = self.y0 = width = height = 0.0
+
+        if cell_size is None:
+            area = max(width, 1.0) * max(height, 1.0)
+            cell_size = np.sqrt(area * DEFAULT_POINTS_PER_CELL / max(n, 1))
+        self.cell_size = float(cell_size)
+        self.nx = int(width // self.cell_size) + 1
+        self.ny = int(height // self.cell_size) + 1
+
+        # CSR layout: points sorted by row-major cell id, with the start
+        # offset of every cell (plus one past the end)
+        cells = self._cell_rows(self.y) * self.nx + self._cell_columns(self.x)
+        self.order = np.argsort(cells, kind='stable')
+        self.cell_start = np.searchsorted(cells[self.order], np.arange(self.nx * self.ny + 1))
+        self._sorted_x = self.x[self.order]
+        self._sorted_y = self.y[self.order]
+
+    @classmethod
+    def from_catalog(cls, catalog=None, cell_size=None):
+        """
+        Build an index over a SystemCatalog or list of data point dicts.
+
+        Args:
+            catalog: SystemCatalog or list of data point dicts (default: CATALOG)
+            cell_size: Grid cell size in chart units
+
+        Returns:
+            HitIndex: New index (rows match the catalog's rows)
+        """
+        if catalog is None:
+            catalog = CATALOG
+        if not isinstance(catalog, SystemCatalog):
+            catalog = SystemCatalog.from_data_points(catalog)
+        return cls(catalog.x, catalog.y, catalog.names, cell_size)
+
+    def __len__(self):
+        return len(self.x)
+
+    def _cell_columns(self, x):
+        return np.clip(((np.asarray(x) - self.x0) // self.cell_size).astype(np.intp), 0, self.nx - 1)
+
+    def _cell_rows(self, y):
+        return np.clip(((np.asarray(y) - self.y0) // self.cell_size).astype(np.intp), 0, self.ny - 1)
+
+    def _gather(self, col_min, col_max, row_min, row_max):
+        """Get the sorted-array positions of every point in a block of cells."""
+        # Cells are row-major, so each grid row of the block is one slice
+        starts = self.cell_start[np.arange(row_min, row_max + 1) * self.nx + col_min]
+        ends = self.cell_start[np.arange(row_min, row_max + 1) * self.nx + col_max + 1]
+        slices = [np.arange(start, end) for start, end in zip(starts, ends) if end > start]
+        if not slices:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(slices)
+
+    def _to_data(self, qx, qy, radius, display):
+        if display is None:
+            return float(qx), float(qy), radius, 1.0
+        dx, dy = display.to_data(qx, qy)
+        scale = display.pixels_per_unit()
+        return float(dx), float(dy), None if radius is None else radius / scale, scale
+
+    def nearest(self, qx, qy, k=1, max_distance=None, display=None):
+        """
+        Find the k systems nearest to a point.
+
+        Args:
+            qx: Query X
+            qy: Query Y
+            k: Number of neighbours (default: 1)
+            max_distance: Ignore systems further than this (default: no limit)
+            display: DisplayTransform if the query and max_distance are in
+                     image pixels (default: chart coordinates)
+
+        Returns:
+            tuple: (row indices, distances) nearest first; distances are in
+                   the query's units
+        """
+        qx, qy, max_distance, scale = self._to_data(qx, qy, max_distance, display)
+        if not len(self) or k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        col = int(self._cell_columns(qx))
+        row = int(self._cell_rows(qy))
+        k = min(k, len(self))
+        ring = 0
+        while True:
+            col_min, col_max = max(col - ring, 0), min(col + ring, self.nx - 1)
+            row_min, row_max = max(row - ring, 0), min(row + ring, self.ny - 1)
+            positions = self._gather(col_min, col_max, row_min, row_max)
+
+            # Distance to the searched block's nearest inner edge: every
+            # system closer than this has been seen
+            edges = [qx - (self.x0 + col_min * self.cell_size) if col_min > 0 else np.inf,
+                     self.x0 + (col_max + 1) * self.cell_size - qx if col_max < self.nx - 1 else np.inf,
+                     qy - (self.y0 + row_min * self.cell_size) if row_min > 0 else np.inf,
+                     self.y0 + (row_max + 1) * self.cell_size - qy if row_max < self.ny - 1 else np.inf]
+            covered = min(edges)
+
+            distances = np.hypot(self._sorted_x[positions] - qx, self._sorted_y[positions] - qy)
+            best = np.argsort(distances, kind='stable')[:k]
+            complete = (covered == np.inf or
+                        (len(best) == k and distances[best[-1]] <= covered) or
+                        (max_distance is not None and covered >= max_distance))
+            if complete:
+                if max_distance is not None:
+                    best = best[distances[best] <= max_distance]
+                return self.order[positions[best]], distances[best] * scale
+
+            # Doubling keeps far-away queries (e.g. off the plot) to a few passes
+            ring = max(1, ring * 2)
+
+    def within(self, qx, qy, radius, display=None):
+        """
+        Find every system within a radius of a point.
+
+        Args:
+            qx: Query X
+            qy: Query Y
+            radius: Search radius
+            display: DisplayTransform if the query and radius are in image
+                     pixels (default: chart coordinates)
+
+        Returns:
+            tuple: (row indices, distances) nearest first
+        """
+        qx, qy, radius, scale = self._to_data(qx, qy, radius, display)
+        if not len(self):
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        col_min, col_max = self._cell_columns([qx - radius, qx + radius])
+        row_min, row_max = self._cell_rows([qy - radius, qy + radius])
+        positions = self._gather(col_min, col_max, row_min, row_max)
+
+        distances = np.hypot(self._sorted_x[positions] - qx, self._sorted_y[positions] - qy)
+        inside = np.flatnonzero(distances <= radius)
+        inside = inside[np.argsort(distances[inside], kind='stable')]
+        return self.order[positions[inside]], distances[inside] * scale
+
+    def hit(self, qx, qy, radius, display=None):
+        """
+        Get the name of the system under a cursor.
+
+        Args:
+            qx: Cursor X
+            qy: Cursor Y
+            radius: Hit radius
+            display: DisplayTransform if the cursor and radius are in image pixels
+
+        Returns:
+            str: Nearest system within radius, or None
+        """
+        rows, _ = self.nearest(qx, qy, k=1, max_distance=radius, display=display)
+        if not len(rows) or self.names is None:
+            return None
+        return self.names[rows[0]]
+
+    def to_dict(self, display=None):
+        """
+        Get the index as plain JSON-serialisable data.
+
+        Args:
+            display: DisplayTransform of the image the index ships with
+                     (default: identity, as for native SVG output)
+
+        Returns:
+            dict: Grid parameters, CSR arrays, coordinates, names and transform
+        """
+        if display is None:
+            display = IDENTITY_TRANSFORM
+        return {
+            'version': HIT_INDEX_VERSION,
+            'grid': {
+                'x0': self.x0,
+                'y0': self.y0,
+                'cell_size': self.cell_size,
+                'nx': self.nx,
+                'ny': self.ny,
+                'cell_start': self.cell_start.tolist(),
+                'order': self.order.tolist()
+            },
+            'x': np.round(self.x, 3).tolist(),
+            'y': np.round(self.y, 3).tolist(),
+            'names': None if self.names is None else self.names.tolist(),
+            'display': display.to_dict()
+        }
+
+    def save(self, path, display=None):
+        """
+        Write the index as JSON.
+
+        Args:
+            path: Output file
+            display: DisplayTransform of the accompanying image
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(display), f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by save.
+
+        Returns:
+            tuple: (HitIndex, DisplayTransform)
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != HIT_INDEX_VERSION:
+            raise ValueError(f"Unsupported hit index version {data.get('version')}")
+        index = cls(data['x'], data['y'], data['names'], data['grid']['cell_size'])
+        return index, DisplayTransform(**data['display'])
+
+def hit_index_path(image_filename):
+    """Get the path the hit index of a rendered image is written to."""
+    return os.path.splitext(image_filename)[0] + '.hits.json'
+
+def write_hit_index(image_filename, data_points=None, fig=None, dpi=None):
+    """
+    Write the hit index that goes with a rendered chart.
+
+    Args:
+        image_filename: The rendered chart; the index is written next to it
+        data_points: SystemCatalog or list of data point dicts (default: CATALOG)
+        fig: Figure the image was saved from with bbox_inches='tight';
+             None for native SVG output, whose viewBox is chart coordinates
+        dpi: Resolution the image was saved at (default: the figure's dpi);
+             ignored for .svg and .pdf files, whose units are points
+
+    Returns:
+        str: Path of the written index
+    """
+    display = IDENTITY_TRANSFORM
+    if fig is not None:
+        if os.path.splitext(image_filename)[1].lower() in VECTOR_FORMATS:
+            dpi = VECTOR_DPI
+        display = DisplayTransform.for_figure(fig, dpi)
+
+    path = hit_index_path(image_filename)
+    HitIndex.from_catalog(data_points).save(path, display)
+    return path
@@ -0,0 +1,293 @@
+"""
+Module for collision-aware placement of data point labels
+Text extents are measured once per font size and candidate positions around
+each marker are tested against a uniform grid index of already occupied boxes.
+"""
+
+import logging
+import math
+
+import numpy as np
+
+logger = logging.getLogger('charts')
+
+# Candidate label positions around a marker, tried in order.
+# Each entry is (dx sign, dy sign, ha, va) with screen-down being +y,
+# matching the inverted Y-axis used by the chart.
+CANDIDATE_POSITIONS = [
+    (0, 1, 'center', 'top'),       # below (the classic placement)
+    (0, -1, 'center', 'bottom'),   # above
+    (1, 0, 'left', 'center'),      # right
+    (-1, 0, 'right', 'center'),    # left
+    (1, 1, 'left', 'top'),         # below-right
+    (-1, 1, 'right', 'top'),       # below-left
+    (1, -1, 'left', 'bottom'),     # above-right
+    (-1, -1, 'right', 'bottom')    # above-left
+]
+
+# Position of a label box's near edge relative to its anchor, as a
+# fraction of the label size, for each text alignment
+ALIGN_FRACTIONS = {
+    'left': 0.0,
+    'right': -1.0,
+    'center': -0.5,
+    'top': 0.0,
+    'bottom': -1.0
+}
+
+# Distances (as multiples of the label line height) at which labels that
+# cannot sit next to their marker are retried with a leader line
+LEADER_DISTANCES = [2.5, 4.0]
+
+# Characters used to measure the line height of a font
+LINE_HEIGHT_SAMPLE = 'Tlgjpqy()'
+
+class TextMetrics:
+    """
+    Text extent measurements for one font family and size.
+    Character advances are measured lazily and cached, so a label's width
+    is a sum of cached values rather than a renderer round-trip.
+    """
+
+    def __init__(self, fontsize, fontfamily='sans-serif'):
+        from matplotlib.font_manager import FontProperties
+        from matplotlib.textpath import text_to_path
+
+        self.prop = FontProperties(family=fontfamily, size=fontsize)
+        self._text_to_path = text_to_path
+        _, self.line_height, _ = text_to_path.get_text_width_height_descent(
+            LINE_HEIGHT_SAMPLE, self.prop, ismath=False)
+        self._advances = {}
+
+    def char_width(self, char):
+        """Get the advance width of a single character in points."""
+        width = self._advances.get(char)
+        if width is None:
+            width, _, _ = self._text_to_path.get_text_width_height_descent(
+                char, self.prop, ismath=False)
+            self._advances[char] = width
+        return width
+
+    def measure(self, text):
+        """
+        Measure a (possibly multi-line) string.
+
+        Args:
+            text: Label text, lines separated by newlines
+
+        Returns:
+            tuple: (width, height) in points
+        """
+        lines = text.split('\n')
+        advances = self._advances
+        width = 0.0
+        for line in lines:
+            line_width = 0.0
+            for char in line:
+                char_width = advances.get(char)
+                if char_width is None:
+                    char_width = self.char_width(char)
+                line_width += char_width
+            width = max(width, line_width)
+
+        return width, self.line_height * len(lines)
+
+_metrics_cache = {}
+
+def get_text_metrics(fontsize, fontfamily='sans-serif'):
+    """
+    Get the shared TextMetrics for a font size, creating it on first use.
+
+    Args:
+        fontsize: Font size in points
+        fontfamily: Font family name (default: 'sans-serif')
+
+    Returns:
+        TextMetrics: Cached metrics object
+    """
+    key = (fontfamily, fontsize)
+    metrics = _metrics_cache.get(key)
+    if metrics is None:
+        metrics = _metrics_cache[key] = TextMetrics(fontsize, fontfamily)
+    return metrics
+
+class OccupancyGrid:
+    """
+    Uniform grid index over a bounded area, stored as a boolean raster.
+    A cell is occupied once any inserted box (x0, y0, x1, y1) touches it,
+    so overlap queries cost one array slice regardless of how many boxes
+    have been inserted.
+    """
+
+    def __init__(self, bounds, cell_size):
+        self.x0, self.y0, x1, y1 = bounds
+        self.cell_size = float(cell_size)
+        columns = int(np.ceil((x1 - self.x0) / self.cell_size)) + 1
+        rows = int(np.ceil((y1 - self.y0) / self.cell_size)) + 1
+        self.cells = np.zeros((rows, columns), dtype=bool)
+
+    def _cell_slices(self, box):
+        size = self.cell_size
+        i0 = max(int((box[0] - self.x0) // size), 0)
+        j0 = max(int((box[1] - self.y0) // size), 0)
+        i1 = max(math.ceil((box[2] - self.x0) / size), i0 + 1)
+        j1 = max(math.ceil((box[3] - self.y0) / size), j0 + 1)
+        return slice(j0, j1), slice(i0, i1)
+
+    def insert(self, box):
+        """Mark the cells covered by a box as occupied."""
+        self.cells[self._cell_slices(box)] = True
+
+    def intersects(self, box):
+        """
+        Check whether a box touches any occupied cell.
+        The box must lie inside the grid bounds.
+        """
+        size = self.cell_size
+        x0 = (box[0] - self.x0) / size
+        y0 = (box[1] - self.y0) / size
+        x1 = (box[2] - self.x0) / size
+        y1 = (box[3] - self.y0) / size
+        return bool(self.cells[int(y0):math.ceil(y1), int(x0):math.ceil(x1)].any())
+
+def get_points_to_data_scale(ax):
+    """
+    Get how many data units one typographic point spans on each axis.
+    Uses only the axis transform, so no canvas draw is needed.
+
+    Args:
+        ax: Matplotlib axis object
+
+    Returns:
+        tuple: (x scale, y scale) in data units per point
+    """
+    (x0, y0), (x1, y1) = ax.transData.transform([(0, 0), (1, 1)])
+    pixels_per_point = ax.figure.dpi / 72.0
+    return pixels_per_point / abs(x1 - x0), pixels_per_point / abs(y1 - y0)
+
+def place_labels(ax, labels, fontsize=6, fontfamily='sans-serif',
+                 marker_radius=5.0, on_collision='leader', bounds=None):
+    """
+    Choose non-overlapping positions for labels around their markers.
+
+    Args:
+        ax: Matplotlib axis object (used only for its transform and limits)
+        labels: List of (x, y, text) tuples, one per marker
+        fontsize: Label font size in points (default: 6)
+        fontfamily: Label font family (default: 'sans-serif')
+        marker_radius: Marker half-size in points, treated as an obstacle (default: 5.0)
+        on_collision: 'leader' to retry farther away with a leader line,
+                      'drop' to skip labels that do not fit (default: 'leader');
+                      labels that fit nowhere are skipped either way and
+                      logged to the 'charts' logger, as a warning in 'leader'
+                      mode
+        bounds: (x0, y0, x1, y1) labels must stay within (default: axis limits)
+
+    Returns:
+        list: One dict per placed label with 'text', 'x', 'y', 'ha', 'va'
+              and 'leader' (marker (x, y) for leader lines, else None)
+    """
+    if on_collision not in ('leader', 'drop'):
+        raise ValueError(f"Unknown on_collision mode: {on_collision}")
+
+    metrics = get_text_metrics(fontsize, fontfamily)
+    x_scale, y_scale = get_points_to_data_scale(ax)
+    line_height = metrics.line_height * y_scale
+
+    if bounds is None:
+        (left, right), (bottom, top) = ax.get_xlim(), ax.get_ylim()
+        bounds = (min(left, right), min(bottom, top),
+                  max(left, right), max(bottom, top))
+    bx0, by0, bx1, by1 = bounds
+
+    # Quarter-line cells keep the rasterised boxes close to the real extents
+    grid = OccupancyGrid(bounds, line_height / 4)
+
+    # Markers are obstacles for every label
+    rx = marker_radius * x_scale
+    ry = marker_radius * y_scale
+    for x, y, _ in labels:
+        grid.insert((x - rx, y - ry, x + rx, y + ry))
+
+    # Vertical gap matches the classic 1.2x line offset; sideways labels
+    # clear the marker by a quarter line
+    gap_x = rx + 0.25 * line_height
+    gap_y = 1.2 * line_height
+
+    # Offsets of each candidate anchor from its marker, and of the box
+    # corner from the anchor as fractions of the label size
+    distances = [1.0] + (LEADER_DISTANCES if on_collision == 'leader' else [])
+    candidates = [(sx * gap_x * distance, sy * gap_y * distance,
+                   ALIGN_FRACTIONS[ha], ALIGN_FRACTIONS[va], ha, va, distance > 1.0)
+                  for distance in distances
+                  for sx, sy, ha, va in CANDIDATE_POSITIONS]
+    dx, dy, fx, fy = (np.array([candidate[k] for candidate in candidates]) for k in range(4))
+
+    # Every candidate box for every label in one pass: (labels, candidates)
+    xs = np.array([label[0] for label in labels], dtype=float)[:, None]
+    ys = np.array([label[1] for label in labels], dtype=float)[:, None]
+    sizes = np.array([metrics.measure(label[2]) for label in labels], dtype=float).reshape(-1, 2)
+    widths = sizes[:, 0:1] * x_scale
+    heights = sizes[:, 1:2] * y_scale
+    anchor_xs = xs + dx
+    anchor_ys = ys + dy
+    box_x0 = anchor_xs + fx * widths
+    box_y0 = anchor_ys + fy * heights
+    box_x1 = box_x0 + widths
+    box_y1 = box_y0 + heights
+    inside = (box_x0 >= bx0) & (box_y0 >= by0) & (box_x1 <= bx1) & (box_y1 <= by1)
+    centre_columns = np.clip(((box_x0 + box_x1) / 2 - bx0) // grid.cell_size, 0, None).astype(int)
+    centre_rows = np.clip(((box_y0 + box_y1) / 2 - by0) // grid.cell_size, 0, None).astype(int)
+    centre_columns = np.minimum(centre_columns, grid.cells.shape[1] - 1)
+    centre_rows = np.minimum(centre_rows, grid.cells.shape[0] - 1)
+
+    placements = []
+    unplaced = []
+    cells = grid.cells
+    for i, (x, y, text) in enumerate(labels):
+        # A candidate whose centre cell is already taken cannot fit, which
+        # rules out most candidates in crowded areas with a single gather
+        free = inside[i] & ~cells[centre_rows[i], centre_columns[i]]
+        for k in np.flatnonzero(free):
+            box = (box_x0[i, k], box_y0[i, k], box_x1[i, k], box_y1[i, k])
+            if grid.intersects(box):
+                continue
+            grid.insert(box)
+            _, _, _, _, ha, va, leader = candidates[k]
+            placements.append({
+                'text': text,
+                'x': float(anchor_xs[i, k]),
+                'y': float(anchor_ys[i, k]),
+                'ha': ha,
+                'va': va,
+                'leader': (x, y) if leader else None
+            })
+            break
+        else:
+            unplaced.append(text.split('\n')[0])
+
+    if unplaced:
+        logger.log(logging.WARNING if on_collision == 'leader' else logging.DEBUG,
+                   "%d label(s) did not fit anywhere and were not drawn: %s",
+                   len(unplaced), ', '.join(unplaced))
+    return placements
+
+def draw_placed_labels(ax, placements, props):
+    """
+    Draw labels (and leader lines) produced by place_labels.
+
+    Args:
+        ax: Matplotlib axis object
+        placements: List returned by place_labels
+        props: Text properties from get_label_properties
+    """
+    text_props = {key: value for key, value in props.items() if key not in ('ha', 'va')}
+
+    for placement in placements:
+        if placement['leader'] is not None:
+            marker_x, marker_y = placement['leader']
+            ax.plot([marker_x, placement['x']], [marker_y, placement['y']],
+                    color='#999999', linewidth=0.4, zorder=props['zorder'] - 1)
+
+        ax.text(placement['x'], placement['y'], placement['text'],
+                ha=placement['ha'], va=placement['va'], **text_props)
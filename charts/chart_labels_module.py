@@ -1,10 +1,13 @@
 """
 Module for adding labels to data points on the chart
-Labels are displaced downward by 0.625 × label height
+Labels are displaced downward by 1.2 × label height
 """
 
-import matplotlib.pyplot as plt
 from distributed_systems_data import *
+from chart_label_layout_module import place_labels, draw_placed_labels
+
+# Distance of a label's top below its data point, in label heights
+LABEL_OFFSET_HEIGHTS = 1.2
 
 def get_label_properties():
     """
@@ -24,7 +27,7 @@ def get_label_properties():
 
 def calculate_label_offset(ax, fontsize=6):
     """
-    Calculate the Y offset for labels based on 0.625 × label height.
+    Calculate the Y offset for labels as LABEL_OFFSET_HEIGHTS × label height.
     
     Args:
         ax: Matplotlib axis object
@@ -46,45 +49,109 @@ def calculate_label_offset(ax, fontsize=6):
     # Remove temporary text
     temp_text.remove()
     
-    # Return 0.625 × height (note: height is negative in inverted Y coordinates)
-    return -1.2 * height_data
+    # Height is negative in inverted Y coordinates
+    return -LABEL_OFFSET_HEIGHTS * height_data
 
-def add_data_point_labels(ax):
+def add_data_point_labels(ax, data_points=None):
     """
     Add labels for all data points.
     
     Args:
         ax: Matplotlib axis object
+        data_points: List of data point dicts (default: DATA_POINTS)
     """
+    if data_points is None:
+        data_points = DATA_POINTS
+    
     props = get_label_properties()
     
     # Calculate the label offset
     y_offset = calculate_label_offset(ax, props['fontsize'])
     
     # Add label for each data point
-    for data_point in DATA_POINTS:
+    for data_point in data_points:
         label_x = data_point['x']
         label_y = data_point['y'] + y_offset
         
         ax.text(label_x, label_y, data_point['name'], **props)
     
     # Add special annotations (like "deterministic" for Calvin)
-    for annotation in ANNOTATIONS:
+    for annotation in get_annotations_for(data_points):
         label_x = annotation['x']
         label_y = annotation['y'] + y_offset
         
         ax.text(label_x, label_y, annotation['name'], **props)
 
-def setup_labels(ax):
+def collect_labels(data_points=None, annotations=None):
+    """
+    Build the (x, y, text) list for label placement.
+    Annotations are attached as an extra line under their parent's label.
+    
+    Args:
+        data_points: List of data point dicts (default: DATA_POINTS)
+        annotations: List of annotation dicts (default: ANNOTATIONS)
+    
+    Returns:
+        list: (x, y, text) tuples, one per data point
+    """
+    if data_points is None:
+        data_points = DATA_POINTS
+    if annotations is None:
+        annotations = get_annotations_for(data_points)
+    
+    extra_lines = {}
+    for annotation in annotations:
+        extra_lines.setdefault(annotation['parent'], []).append(annotation['name'])
+    
+    labels = []
+    for data_point in data_points:
+        text = '\n'.join([data_point['name']] + extra_lines.get(data_point['name'], []))
+        labels.append((data_point['x'], data_point['y'], text))
+    
+    return labels
+
+def add_data_point_labels_avoiding_collisions(ax, data_points=None, on_collision='leader'):
+    """
+    Add labels for all data points, moving them around their markers so
+    they do not overlap each other or other markers.
+    
+    Args:
+        ax: Matplotlib axis object
+        data_points: List of data point dicts (default: DATA_POINTS)
+        on_collision: 'leader' or 'drop' for labels that cannot be placed (default: 'leader')
+    
+    Returns:
+        list: Placements as returned by place_labels
+    """
+    props = get_label_properties()
+    
+    placements = place_labels(ax, collect_labels(data_points),
+                              fontsize=props['fontsize'],
+                              fontfamily=props['fontfamily'],
+                              on_collision=on_collision)
+    draw_placed_labels(ax, placements, props)
+    
+    return placements
+
+def setup_labels(ax, avoid_collisions=False, on_collision='leader', data_points=None):
     """
     Main function to set up all labels.
     Must be called AFTER data points have been plotted.
     
     Args:
         ax: Matplotlib axis object
+        avoid_collisions: Use the collision-aware placer instead of the fixed
+                          offset (default: False)
+        on_collision: 'leader' or 'drop' for labels the placer cannot fit (default: 'leader')
+        data_points: List of data point dicts (default: DATA_POINTS)
     """
+    if avoid_collisions:
+        # The placer measures text itself, so no canvas draw is needed
+        add_data_point_labels_avoiding_collisions(ax, data_points, on_collision=on_collision)
+        return
+    
     # Force a draw to ensure proper text measurements
     ax.figure.canvas.draw()
     
     # Add all labels
-    add_data_point_labels(ax)
+    add_data_point_labels(ax, data_points)
\ No newline at end of file
@@ -0,0 +1,329 @@
+"""
+Module for a persistent chart that is updated in place
+LiveChart builds the figure once, draws the static layers (title, legend,
+axes, regions and trade-off line) into a cached background, and keeps one
+marker and one label artist per system, keyed by name. update/add/remove
+only touch that system's artists; redraw restores the background under the
+changed areas and redraws just the artists that overlap them (blitting).
+"""
+
+import numpy as np
+
+from distributed_systems_data import *
+from chart_setup_module import setup_chart
+from chart_axes_module import setup_axes
+from chart_regions_module import setup_regions
+from chart_datapoints_module import get_marker_properties
+from chart_labels_module import get_label_properties, calculate_label_offset
+
+# Extra pixels around each dirty area to cover antialiased edges
+DIRTY_PADDING_PX = 2
+
+class LiveChart:
+    """
+    Chart whose systems can be moved, added and removed without rebuilding
+    the figure.
+
+    Example:
+        chart = LiveChart()
+        chart.update('Raft', 480.0, 300.0)
+        chart.redraw()
+    """
+
+    def __init__(self, data_points=None, include_regions=True):
+        """
+        Build the figure and draw its static background.
+
+        Args:
+            data_points: SystemCatalog or list of data point dicts (default: DATA_POINTS)
+            include_regions: Whether to include highlighted regions (default: True)
+        """
+        if data_points is None:
+            data_points = DATA_POINTS
+        if isinstance(data_points, SystemCatalog):
+            data_points = data_points.to_data_points()
+
+        self.fig, self.ax = setup_chart()
+        setup_axes(self.ax)
+        if include_regions:
+            setup_regions(self.ax)
+
+        self.canvas = self.fig.canvas
+        self._label_props = get_label_properties()
+        self._label_offset = calculate_label_offset(self.ax, self._label_props['fontsize'])
+
+        # name -> {'category', 'marker', 'labels': [(Text, dx, dy)], 'extent'}
+        self._systems = {}
+        self._dirty = []
+        self._background = None
+
+        annotations = {}
+        for annotation in get_annotations_for(data_points):
+            annotations.setdefault(annotation['parent'], []).append(annotation)
+
+        for data_point in data_points:
+            self._create_artists(data_point['name'], data_point['x'], data_point['y'],
+                                 data_point['category'],
+                                 annotations.get(data_point['name'], []))
+
+        self.refresh()
+
+    def __len__(self):
+        return len(self._systems)
+
+    def __contains__(self, name):
+        return name in self._systems
+
+    def _create_artists(self, name, x, y, category, annotations=()):
+        """Create the (animated) marker and label artists of one system."""
+        props = get_marker_properties(category)
+        marker, = self.ax.plot([x], [y],
+                               linestyle='none',
+                               marker=props['marker'],
+                               markersize=props['markersize'],
+                               markerfacecolor=props['color'],
+                               markeredgecolor=props['edgecolor'],
+                               markeredgewidth=props['linewidth'],
+                               zorder=props['zorder'],
+                               animated=True)
+
+        # Annotations keep their offset from the parent system when it moves
+        labels = [(name, 0.0, 0.0)]
+        labels.extend((annotation['name'], annotation['x'] - x, annotation['y'] - y)
+                      for annotation in annotations)
+
+        texts = []
+        for text, dx, dy in labels:
+            artist = self.ax.text(x + dx, y + dy + self._label_offset, text,
+                                  animated=True, **self._label_props)
+            texts.append((artist, dx, dy))
+
+        self._systems[name] = {
+            'category': category,
+            'marker': marker,
+            'labels': texts,
+            'extent': None
+        }
+
+    def _artists(self, system):
+        """Get a system's artists in drawing order (marker first)."""
+        return [system['marker']] + [text for text, _, _ in system['labels']]
+
+    def _extent(self, system):
+        """Get the display-space (x0, y0, x1, y1) box covering a system's artists."""
+        renderer = self.canvas.get_renderer()
+        boxes = np.array([artist.get_window_extent(renderer).extents
+                          for artist in self._artists(system)])
+        return (boxes[:, 0].min(), boxes[:, 1].min(), boxes[:, 2].max(), boxes[:, 3].max())
+
+    def _mark_dirty(self, extent):
+        if extent is not None:
+            self._dirty.append(extent)
+
+    def position(self, name):
+        """
+        Get the current coordinates of a system.
+
+        Args:
+            name: System name
+
+        Returns:
+            tuple: (x, y) in chart coordinates
+        """
+        xs, ys = self._systems[name]['marker'].get_data()
+        return float(xs[0]), float(ys[0])
+
+    def update(self, name, x, y):
+        """
+        Move a system's marker and label. Takes effect on the next redraw.
+
+        Args:
+            name: System name
+            x: New X coordinate
+            y: New Y coordinate
+        """
+        try:
+            system = self._systems[name]
+        except KeyError:
+            raise KeyError(f"Unknown system '{name}'") from None
+
+        self._mark_dirty(system['extent'])
+        system['marker'].set_data([x], [y])
+        for text, dx, dy in system['labels']:
+            text.set_position((x + dx, y + dy + self._label_offset))
+        system['extent'] = self._extent(system)
+        self._mark_dirty(system['extent'])
+
+    def add(self, name, x, y, category):
+        """
+        Add a new system. Takes effect on the next redraw.
+
+        Args:
+            name: System name (must not already be on the chart)
+            x: X coordinate
+            y: Y coordinate
+            category: Category name from CATEGORIES
+        """
+        if name in self._systems:
+            raise ValueError(f"System '{name}' is already on the chart")
+
+        self._create_artists(name, x, y, category)
+        system = self._systems[name]
+        system['extent'] = self._extent(system)
+        self._mark_dirty(system['extent'])
+
+    def remove(self, name):
+        """
+        Remove a system. Takes effect on the next redraw.
+
+        Args:
+            name: System name
+        """
+        try:
+            system = self._systems.pop(name)
+        except KeyError:
+            raise KeyError(f"Unknown system '{name}'") from None
+
+        for artist in self._artists(system):
+            artist.remove()
+        self._mark_dirty(system['extent'])
+
+    def refresh(self):
+        """
+        Redraw everything: render the static layers, cache them as the
+        background, then draw every system on top. Needed after changing
+        static artists or resizing the figure.
+        """
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+        self._draw_systems(self._systems.values())
+        for system in self._systems.values():
+            system['extent'] = self._extent(system)
+
+        self.canvas.blit(self.fig.bbox)
+        self._dirty = []
+
+    def _grow(self, box, extents):
+        """
+        Grow a display-space box until it covers every system it overlaps.
+
+        Returns:
+            tuple: (grown (x0, y0, x1, y1), boolean mask of overlapping systems)
+        """
+        x0, y0, x1, y1 = box
+        overlapping = np.zeros(len(extents), dtype=bool)
+        while True:
+            hits = ((extents[:, 0] <= x1) & (extents[:, 2] >= x0) &
+                    (extents[:, 1] <= y1) & (extents[:, 3] >= y0))
+            if (hits == overlapping).all():
+                return (x0, y0, x1, y1), overlapping
+            overlapping = hits
+            x0 = min(x0, extents[hits, 0].min())
+            y0 = min(y0, extents[hits, 1].min())
+            x1 = max(x1, extents[hits, 2].max())
+            y1 = max(y1, extents[hits, 3].max())
+
+    def _draw_systems(self, systems):
+        """Draw systems in the same order as refresh: markers first, then labels."""
+        for system in systems:
+            self.ax.draw_artist(system['marker'])
+        for system in systems:
+            for text, _, _ in system['labels']:
+                self.ax.draw_artist(text)
+
+    def redraw(self):
+        """
+        Blit pending changes: restore the cached background under each dirty
+        area and redraw only the systems overlapping it. An area is grown
+        until it covers every system it touches, so each of them is repainted
+        whole onto freshly restored background.
+
+        Returns:
+            int: Number of areas redrawn
+        """
+        from matplotlib.transforms import Bbox
+
+        if self._background is None:
+            self.refresh()
+            return 1
+        if not self._dirty:
+            return 0
+
+        dirty = self._dirty
+        self._dirty = []
+
+        systems = list(self._systems.values())
+        extents = np.array([system['extent'] for system in systems]).reshape(-1, 4)
+        extents[:, :2] = np.floor(extents[:, :2]) - DIRTY_PADDING_PX
+        extents[:, 2:] = np.ceil(extents[:, 2:]) + DIRTY_PADDING_PX
+
+        areas = []
+        repainted = 0
+        for x0, y0, x1, y1 in dirty:
+            box = (np.floor(x0) - DIRTY_PADDING_PX, np.floor(y0) - DIRTY_PADDING_PX,
+                   np.ceil(x1) + DIRTY_PADDING_PX, np.ceil(y1) + DIRTY_PADDING_PX)
+            box, overlapping = self._grow(box, extents)
+            areas.append((box, np.flatnonzero(overlapping)))
+            repainted += overlapping.sum()
+
+        # On crowded charts the areas chain across most systems; one full
+        # repaint over the cached background is then cheaper
+        if repainted > len(systems) // 2:
+            self.canvas.restore_region(self._background)
+            self._draw_systems(systems)
+            self.canvas.blit(self.fig.bbox)
+            return 1
+
+        width, height = self.fig.bbox.width, self.fig.bbox.height
+        redrawn = 0
+        for (x0, y0, x1, y1), rows in areas:
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1, width), min(y1, height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            # Agg addresses saved regions from the top-left corner; xy is
+            # where the (full-figure) background's own origin goes
+            self.canvas.restore_region(self._background, bbox=(x0, height - y1, x1, height - y0),
+                                       xy=(0, 0))
+            self._draw_systems([systems[i] for i in rows])
+            self.canvas.blit(Bbox([[x0, y0], [x1, y1]]))
+            redrawn += 1
+
+        return redrawn
+
+    def to_rgba(self):
+        """
+        Get the current canvas pixels.
+
+        Returns:
+            numpy.ndarray: (height, width, 4) uint8 RGBA array
+        """
+        return np.asarray(self.canvas.buffer_rgba()).copy()
+
+    def savefig(self, output_filename, **kwargs):
+        """
+        Save the chart as it currently stands.
+
+        Args:
+            output_filename: Output file (format from the extension)
+            **kwargs: Passed to Figure.savefig
+        """
+        artists = [artist for system in self._systems.values()
+                   for artist in self._artists(system)]
+
+        # Animated artists are skipped by a normal draw
+        for artist in artists:
+            artist.set_animated(False)
+        try:
+            self.fig.savefig(output_filename, **kwargs)
+        finally:
+            for artist in artists:
+                artist.set_animated(True)
+        self.refresh()
+
+    def close(self):
+        """Close the figure."""
+        import matplotlib.pyplot as plt
+        plt.close(self.fig)
@@ -0,0 +1,201 @@
+"""
+Module for observing chart generation
+generate_chart reports stage start/end events (with durations and artist
+counts), saved outputs and cache lookups to an observer. Three observers
+are provided: a no-op default, a logging adapter and an in-memory metrics
+collector that can export per-stage latency histograms.
+"""
+
+import bisect
+import logging
+import time
+
+# Default latency histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class ChartObserver:
+    """
+    Base observer. Every hook does nothing, so subclasses only override the
+    events they care about.
+    """
+
+    def stage_started(self, stage):
+        """Called when a pipeline stage begins."""
+
+    def stage_finished(self, stage, seconds, artists):
+        """
+        Called when a pipeline stage ends.
+
+        Args:
+            stage: Stage name (e.g. 'setup_axes', 'save')
+            seconds: Wall-clock duration
+            artists: Number of artists the stage added to the axis
+        """
+
+    def chart_saved(self, filename, fmt, size_bytes, seconds, cached=False):
+        """
+        Called when an output file has been written.
+
+        Args:
+            filename: Output path
+            fmt: Output format ('png', 'svg' or 'pdf')
+            size_bytes: Size of the written file
+            seconds: Time taken to produce the file
+            cached: Whether the file was copied from the render cache
+        """
+
+    def cache_lookup(self, key, hit):
+        """
+        Called after a render cache lookup.
+
+        Args:
+            key: Cache key
+            hit: Whether the render was found
+        """
+
+# Shared no-op observer used when none is given
+NULL_OBSERVER = ChartObserver()
+
+class LoggingObserver(ChartObserver):
+    """Observer that writes every event to a standard library logger."""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger('charts')
+        self.level = level
+
+    def stage_started(self, stage):
+        self.logger.debug("stage %s started", stage)
+
+    def stage_finished(self, stage, seconds, artists):
+        self.logger.log(self.level, "stage %s finished in %.1f ms (%d artists)",
+                        stage, seconds * 1000, artists)
+
+    def chart_saved(self, filename, fmt, size_bytes, seconds, cached=False):
+        self.logger.log(self.level, "saved %s (%s, %d bytes) in %.1f ms%s",
+                        filename, fmt, size_bytes, seconds * 1000,
+                        " from cache" if cached else "")
+
+    def cache_lookup(self, key, hit):
+        self.logger.log(self.level, "render cache %s for %s", "hit" if hit else "miss", key[:12])
+
+class MetricsCollector(ChartObserver):
+    """
+    Observer that keeps every event in memory for later export.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.durations = {}
+        self.artists = {}
+        self.outputs = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def stage_finished(self, stage, seconds, artists):
+        self.durations.setdefault(stage, []).append(seconds)
+        self.artists.setdefault(stage, []).append(artists)
+
+    def chart_saved(self, filename, fmt, size_bytes, seconds, cached=False):
+        self.outputs.append({
+            'filename': filename,
+            'format': fmt,
+            'bytes': size_bytes,
+            'seconds': seconds,
+            'cached': cached
+        })
+
+    def cache_lookup(self, key, hit):
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+    def histogram(self, stage):
+        """
+        Get a cumulative latency histogram for a stage.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            list: (upper bound in seconds, count of durations <= bound) pairs,
+                  ending with (inf, total count)
+        """
+        counts = [0] * (len(self.buckets) + 1)
+        for seconds in self.durations.get(stage, []):
+            counts[bisect.bisect_left(self.buckets, seconds)] += 1
+
+        histogram = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            total += count
+            histogram.append((bound, total))
+        return histogram
+
+    def histograms(self):
+        """Get the histogram of every observed stage."""
+        return {stage: self.histogram(stage) for stage in self.durations}
+
+    def summary(self):
+        """
+        Summarise everything collected so far.
+
+        Returns:
+            dict: Per-stage count/mean/p50/p95/max (seconds) and mean artists,
+                  plus output and cache totals
+        """
+        stages = {}
+        for stage, durations in self.durations.items():
+            ordered = sorted(durations)
+            count = len(ordered)
+            stages[stage] = {
+                'count': count,
+                'mean_s': sum(ordered) / count,
+                'p50_s': ordered[(count - 1) // 2],
+                'p95_s': ordered[min(count - 1, int(0.95 * count))],
+                'max_s': ordered[-1],
+                'mean_artists': sum(self.artists[stage]) / count
+            }
+
+        return {
+            'stages': stages,
+            'outputs': len(self.outputs),
+            'output_bytes': sum(output['bytes'] for output in self.outputs),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses
+        }
+
+def count_artists(ax):
+    """Count the artists currently attached to an axis."""
+    if ax is None:
+        return 0
+    return len(ax.get_children())
+
+class observed_stage:
+    """
+    Context manager that reports one pipeline stage to an observer.
+    Artists are counted on the axis given up front, or on .ax if the stage
+    creates it (as setup_chart does).
+
+    Example:
+        with observed_stage(observer, 'setup_axes', ax):
+            setup_axes(ax)
+    """
+
+    def __init__(self, observer, stage, ax=None):
+        self.observer = observer
+        self.stage = stage
+        self.ax = ax
+
+    def __enter__(self):
+        self.observer.stage_started(self.stage)
+        self._artists_before = count_artists(self.ax)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.start
+        if exc_type is None:
+            artists = count_artists(self.ax) - self._artists_before
+            self.observer.stage_finished(self.stage, self.seconds, artists)
+        return False
@@ -1,10 +1,11 @@
 """
 Module for drawing highlighted regions on the chart to group related systems
+Regions can also classify coordinate arrays and summarise the points that
+fall inside each one.
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch
+import numpy as np
+
 from distributed_systems_data import *
 
 # Define regions based on system clusters
@@ -48,6 +49,38 @@ REGIONS = [
     }
 ]
 
+# Label colour for each region fill colour
+REGION_LABEL_COLORS = {
+    'lightblue': 'darkblue',
+    'lightgreen': 'darkgreen',
+    'lightcoral': 'darkred'
+}
+
+# Optional annotations about regions (unusual patterns, opportunities, etc.)
+REGION_ANNOTATIONS = [
+    {
+        'text': ['High coordination,', 'Low agreement', '(Unusual)'],
+        'x': 320,
+        'y': 300,
+        'color': 'darkgray',
+        'style': 'italic'
+    },
+    {
+        'text': ['Low coordination,', 'High agreement', '(Innovation)'],
+        'x': 190,
+        'y': 270,
+        'color': 'darkgray',
+        'style': 'italic'
+    },
+    {
+        'text': ['Empty space:', 'Opportunity?'],
+        'x': 730,
+        'y': 660,
+        'color': 'darkgray',
+        'style': 'italic'
+    }
+]
+
 def draw_region(ax, region):
     """
     Draw a single highlighted region on the chart.
@@ -56,6 +89,9 @@ def draw_region(ax, region):
         ax: Matplotlib axis object
         region: Dictionary containing region properties
     """
+    # Imported here so the region definitions can be used without matplotlib
+    from matplotlib.patches import FancyBboxPatch
+    
     bounds = region['bounds']
     
     # Calculate rectangle properties
@@ -81,12 +117,7 @@ def draw_region(ax, region):
     label_y = bounds['y_min'] + region['label_offset']['y']
     
     # Determine label color based on region color
-    label_colors = {
-        'lightblue': 'darkblue',
-        'lightgreen': 'darkgreen',
-        'lightcoral': 'darkred'
-    }
-    label_color = label_colors.get(region['color'], 'black')
+    label_color = REGION_LABEL_COLORS.get(region['color'], 'black')
     
     ax.text(label_x, label_y, region['name'],
             fontsize=14, fontweight='bold', fontfamily='sans-serif',
@@ -100,31 +131,7 @@ def add_region_annotations(ax):
     Args:
         ax: Matplotlib axis object
     """
-    annotations = [
-        {
-            'text': ['High coordination,', 'Low agreement', '(Unusual)'],
-            'x': 320,
-            'y': 300,
-            'color': 'darkgray',
-            'style': 'italic'
-        },
-        {
-            'text': ['Low coordination,', 'High agreement', '(Innovation)'],
-            'x': 190,
-            'y': 270,
-            'color': 'darkgray',
-            'style': 'italic'
-        },
-        {
-            'text': ['Empty space:', 'Opportunity?'],
-            'x': 730,
-            'y': 660,
-            'color': 'darkgray',
-            'style': 'italic'
-        }
-    ]
-    
-    for annotation in annotations:
+    for annotation in REGION_ANNOTATIONS:
         y_offset = 0
         for line in annotation['text']:
             ax.text(annotation['x'], annotation['y'] + y_offset, line,
@@ -148,4 +155,116 @@ def setup_regions(ax, include_annotations=True):
     
     # Add annotations if requested
     if include_annotations:
-        add_region_annotations(ax)
\ No newline at end of file
+        add_region_annotations(ax)
+
+def region_bounds_array(regions=None):
+    """
+    Get region bounds as an array.
+    
+    Args:
+        regions: List of region dicts (default: REGIONS)
+    
+    Returns:
+        ndarray: (n_regions, 4) array of x_min, x_max, y_min, y_max
+    """
+    if regions is None:
+        regions = REGIONS
+    return np.array([[r['bounds']['x_min'], r['bounds']['x_max'],
+                      r['bounds']['y_min'], r['bounds']['y_max']] for r in regions],
+                    dtype=float).reshape(-1, 4)
+
+def classify_points(x, y, regions=None):
+    """
+    Find which regions each point falls in (bounds inclusive).
+    Regions may overlap, so a point can belong to several or none.
+    
+    Args:
+        x: Array of X coordinates
+        y: Array of Y coordinates
+        regions: List of region dicts (default: REGIONS)
+    
+    Returns:
+        ndarray: (n_regions, n_points) boolean membership masks
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    bounds = region_bounds_array(regions)
+    
+    return ((x >= bounds[:, 0:1]) & (x <= bounds[:, 1:2]) &
+            (y >= bounds[:, 2:3]) & (y <= bounds[:, 3:4]))
+
+def region_statistics(x, y, regions=None, masks=None):
+    """
+    Count the points in each region and compute their centroid and spread.
+    
+    Args:
+        x: Array of X coordinates
+        y: Array of Y coordinates
+        regions: List of region dicts (default: REGIONS)
+        masks: Memberships from classify_points, if already computed
+    
+    Returns:
+        list: One dict per region with 'name', 'count', 'centroid' (x, y)
+              and 'spread' (standard deviation in x and y); centroid and
+              spread are None for empty regions
+    """
+    if regions is None:
+        regions = REGIONS
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if masks is None:
+        masks = classify_points(x, y, regions)
+    
+    # Sums of member values per region, then squared deviations around each
+    # region's mean (two passes, no cancellation). Non-members are masked
+    # out rather than weighted by 0, so NaN or inf points outside a region
+    # do not leak into its statistics
+    counts = masks.sum(axis=1)
+    divisor = np.maximum(counts, 1)[:, None]
+    means = np.stack([np.where(masks, x, 0.0).sum(axis=1),
+                      np.where(masks, y, 0.0).sum(axis=1)], axis=1) / divisor
+    variances = np.stack([np.where(masks, x - means[:, 0:1], 0.0) ** 2,
+                          np.where(masks, y - means[:, 1:2], 0.0) ** 2],
+                         axis=1).sum(axis=2) / divisor
+    
+    stats = []
+    for region, count, mean, variance in zip(regions, counts, means, variances):
+        centroid = spread = None
+        if count:
+            centroid = (float(mean[0]), float(mean[1]))
+            spread = (float(np.sqrt(variance[0])), float(np.sqrt(variance[1])))
+        stats.append({
+            'name': region['name'],
+            'count': int(count),
+            'centroid': centroid,
+            'spread': spread
+        })
+    
+    return stats
+
+def annotate_region_statistics(ax, stats, regions=None):
+    """
+    Mark each region's centroid and write its point count under the region label.
+    
+    Args:
+        ax: Matplotlib axis object
+        stats: Output of region_statistics
+        regions: The regions the statistics were computed for (default: REGIONS)
+    """
+    if regions is None:
+        regions = REGIONS
+    
+    for region, region_stats in zip(regions, stats):
+        bounds = region['bounds']
+        label_color = REGION_LABEL_COLORS.get(region['color'], 'black')
+        
+        label_x = (bounds['x_min'] + bounds['x_max']) / 2 + region['label_offset']['x']
+        label_y = bounds['y_min'] + region['label_offset']['y'] + 18
+        ax.text(label_x, label_y, f"n = {region_stats['count']:,}",
+                fontsize=9, fontfamily='sans-serif', color=label_color,
+                ha='center', va='top', zorder=2)
+        
+        if region_stats['centroid'] is not None:
+            cx, cy = region_stats['centroid']
+            ax.plot(cx, cy, marker='+', markersize=10, markeredgewidth=1.2,
+                    color=label_color, linestyle='none', zorder=3)
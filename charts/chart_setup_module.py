@@ -2,8 +2,6 @@
 Module for setting up the chart figure, titles, and references
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 from distributed_systems_data import *
 
 def create_figure(width_px=864, height_px=864, dpi=100):
@@ -18,6 +16,9 @@ def create_figure(width_px=864, height_px=864, dpi=100):
     Returns:
         fig, ax: Matplotlib figure and axis objects
     """
+    # pyplot is loaded on the first render rather than at import time
+    import matplotlib.pyplot as plt
+    
     # Convert pixels to inches for matplotlib
     width_inches = width_px / dpi
     height_inches = height_px / dpi
@@ -84,6 +85,8 @@ def add_legend(ax):
     Args:
         ax: Matplotlib axis object
     """
+    from matplotlib.lines import Line2D
+    
     # Legend starting position
     legend_x = 146.729412
     legend_y_start = 45.257261
@@ -100,25 +103,25 @@ def add_legend(ax):
         
         # Draw marker
         if cat_info['marker'] == 'triangle':
-            marker = plt.Line2D([legend_x], [y_pos], marker='^', 
-                              markersize=8, markerfacecolor=cat_info['color'],
-                              markeredgewidth=0.5, markeredgecolor='white',
-                              linestyle='none')
+            marker = Line2D([legend_x], [y_pos], marker='^', 
+                          markersize=8, markerfacecolor=cat_info['color'],
+                          markeredgewidth=0.5, markeredgecolor='white',
+                          linestyle='none')
         elif cat_info['marker'] == 'star':
-            marker = plt.Line2D([legend_x], [y_pos], marker='*', 
-                              markersize=10, markerfacecolor=cat_info['color'],
-                              markeredgewidth=0.5, markeredgecolor='white',
-                              linestyle='none')
+            marker = Line2D([legend_x], [y_pos], marker='*', 
+                          markersize=10, markerfacecolor=cat_info['color'],
+                          markeredgewidth=0.5, markeredgecolor='white',
+                          linestyle='none')
         elif cat_info['marker'] == 'square':
-            marker = plt.Line2D([legend_x], [y_pos], marker='s', 
-                              markersize=8, markerfacecolor=cat_info['color'],
-                              markeredgewidth=0.5, markeredgecolor='white',
-                              linestyle='none')
+            marker = Line2D([legend_x], [y_pos], marker='s', 
+                          markersize=8, markerfacecolor=cat_info['color'],
+                          markeredgewidth=0.5, markeredgecolor='white',
+                          linestyle='none')
         else:  # circle
-            marker = plt.Line2D([legend_x], [y_pos], marker='o', 
-                              markersize=8, markerfacecolor=cat_info['color'],
-                              markeredgewidth=0.5, markeredgecolor='white',
-                              linestyle='none')
+            marker = Line2D([legend_x], [y_pos], marker='o', 
+                          markersize=8, markerfacecolor=cat_info['color'],
+                          markeredgewidth=0.5, markeredgecolor='white',
+                          linestyle='none')
         
         ax.add_line(marker)
         
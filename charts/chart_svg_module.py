@@ -0,0 +1,325 @@
+"""
+Module for writing the chart directly as SVG, without matplotlib
+The chart data is already in SVG pixel coordinates, so every element is
+streamed straight to the output file using the same positions, colours and
+sizes as the matplotlib modules.
+"""
+
+from xml.sax.saxutils import escape
+
+from distributed_systems_data import *
+from chart_regions_module import REGIONS, REGION_ANNOTATIONS, REGION_LABEL_COLORS
+from chart_labels_module import LABEL_OFFSET_HEIGHTS, get_label_properties
+
+# One SVG user unit is one chart pixel at the default 100 dpi, i.e. 0.72pt.
+# Font sizes, line widths and marker sizes below are given in points like
+# the matplotlib modules and converted with this factor.
+POINTS_PER_UNIT = 72.0 / 100.0
+
+# DejaVu Sans "lp" metrics as fractions of the font size; matplotlib aligns
+# text vertically using these
+FONT_ASCENT = 0.760
+FONT_DESCENT = 0.208
+
+# Average advance width of DejaVu Sans as a fraction of the font size (as
+# measured by chart_label_layout_module.TextMetrics for the trade-off
+# label), used only where alignment depends on text width (rotated labels)
+AVERAGE_CHAR_WIDTH = 0.5
+
+# Height of matplotlib's box around one line of text, as a fraction of the
+# font size; chart_labels_module measures it to offset labels
+LINE_HEIGHT = 1.0
+
+FONT_FAMILY = "DejaVu Sans, Bitstream Vera Sans, sans-serif"
+
+# Unit marker outlines (Y down), matching matplotlib's '^', '*', 's' and 'o'
+MARKER_PATHS = {
+    'triangle': [(0.0, -0.5), (-0.5, 0.5), (0.5, 0.5)],
+    'star': [(0.0, -0.5), (-0.1123, -0.1545), (-0.4755, -0.1545), (-0.1816, 0.059),
+             (-0.2939, 0.4045), (0.0, 0.191), (0.2939, 0.4045), (0.1816, 0.059),
+             (0.4755, -0.1545), (0.1123, -0.1545)],
+    'square': [(-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5)]
+}
+
+# Marker sizes (points) on the plot and in the legend, as in the matplotlib modules
+MARKER_SIZES = {'triangle': 10, 'star': 12, 'square': 10, 'circle': 10}
+LEGEND_MARKER_SIZES = {'triangle': 8, 'star': 10, 'square': 8, 'circle': 8}
+
+def pt(value):
+    """Convert a size in points to SVG user units."""
+    return value / POINTS_PER_UNIT
+
+def fmt(value):
+    """Format a number compactly for SVG output."""
+    return f"{value:.3f}".rstrip('0').rstrip('.')
+
+def baseline_y(y, fontsize, va):
+    """
+    Get the baseline position that gives matplotlib's vertical alignment.
+
+    Args:
+        y: Anchor Y coordinate
+        fontsize: Font size in points
+        va: Vertical alignment ('top', 'center', 'bottom' or 'baseline')
+
+    Returns:
+        float: Baseline Y coordinate
+    """
+    size = pt(fontsize)
+    if va == 'top':
+        return y + FONT_ASCENT * size
+    if va == 'center':
+        return y + (FONT_ASCENT - FONT_DESCENT) / 2 * size
+    if va == 'bottom':
+        return y - FONT_DESCENT * size
+    return y
+
+def svg_text(x, y, text, fontsize, color, ha='left', va='baseline',
+             weight=None, style=None, rotation=0, opacity=None):
+    """
+    Build an SVG <text> element.
+    Rotated text is aligned on its own centre, which matches matplotlib's
+    placement for the centre-aligned rotated labels used in this chart.
+
+    Args:
+        x, y: Anchor position
+        text: Text content
+        fontsize: Font size in points
+        color: Fill colour
+        ha, va: Horizontal and vertical alignment
+        weight: Optional font weight ('bold')
+        style: Optional font style ('italic')
+        rotation: Counter-clockwise rotation in degrees (matplotlib convention)
+        opacity: Optional fill opacity
+
+    Returns:
+        str: SVG element
+    """
+    anchor = {'left': 'start', 'center': 'middle', 'right': 'end'}[ha]
+    attrs = [f'x="{fmt(x)}"', f'y="{fmt(baseline_y(y, fontsize, va))}"',
+             f'font-size="{fmt(pt(fontsize))}"', f'fill="{color}"',
+             f'text-anchor="{anchor}"']
+    if weight:
+        attrs.append(f'font-weight="{weight}"')
+    if style:
+        attrs.append(f'font-style="{style}"')
+    if opacity is not None:
+        attrs.append(f'fill-opacity="{opacity}"')
+    if rotation:
+        attrs.append(f'transform="rotate({fmt(-rotation)} {fmt(x)} {fmt(y)})"')
+    return f'<text {" ".join(attrs)}>{escape(text)}</text>\n'
+
+def svg_line(x1, y1, x2, y2, color, linewidth, opacity=None, dashes=None):
+    """
+    Build an SVG <line> element.
+
+    Args:
+        x1, y1, x2, y2: End points
+        color: Stroke colour
+        linewidth: Line width in points
+        opacity: Optional stroke opacity
+        dashes: Optional (on, off) dash lengths in points, scaled by the
+                line width as matplotlib does
+
+    Returns:
+        str: SVG element
+    """
+    attrs = [f'x1="{fmt(x1)}"', f'y1="{fmt(y1)}"', f'x2="{fmt(x2)}"', f'y2="{fmt(y2)}"',
+             f'stroke="{color}"', f'stroke-width="{fmt(pt(linewidth))}"']
+    if opacity is not None:
+        attrs.append(f'stroke-opacity="{opacity}"')
+    if dashes:
+        pattern = ','.join(fmt(pt(d * linewidth)) for d in dashes)
+        attrs.append(f'stroke-dasharray="{pattern}"')
+    return f'<line {" ".join(attrs)}/>\n'
+
+def marker_symbol(symbol_id, marker, markersize):
+    """
+    Build a reusable <path>/<circle> marker definition centred on the origin.
+
+    Args:
+        symbol_id: Element id
+        marker: Marker name from CATEGORIES ('triangle', 'star', 'square', 'circle')
+        markersize: Marker size in points
+
+    Returns:
+        str: SVG element for <defs>
+    """
+    size = pt(markersize)
+    stroke = f'stroke="white" stroke-width="{fmt(pt(0.5))}" stroke-linejoin="miter"'
+    if marker not in MARKER_PATHS:
+        return f'<circle id="{symbol_id}" r="{fmt(size / 2)}" {stroke}/>\n'
+    points = ' L '.join(f'{fmt(px * size)} {fmt(py * size)}' for px, py in MARKER_PATHS[marker])
+    return f'<path id="{symbol_id}" d="M {points} Z" {stroke}/>\n'
+
+def write_header(out, width, height):
+    """Write the SVG header, background and marker definitions."""
+    out.write('<?xml version="1.0" encoding="utf-8" standalone="no"?>\n')
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+              f'version="1.1" width="{fmt(width * POINTS_PER_UNIT)}pt" '
+              f'height="{fmt(height * POINTS_PER_UNIT)}pt" viewBox="0 0 {width} {height}" '
+              f'font-family="{FONT_FAMILY}">\n')
+    out.write('<defs>\n')
+    out.write(marker_symbol('marker-default', 'circle', MARKER_SIZES['circle']))
+    for key, cat_info in CATEGORIES.items():
+        out.write(marker_symbol(f'marker-{key}', cat_info['marker'],
+                                MARKER_SIZES.get(cat_info['marker'], 10)))
+        out.write(marker_symbol(f'legend-{key}', cat_info['marker'],
+                                LEGEND_MARKER_SIZES.get(cat_info['marker'], 8)))
+    out.write('</defs>\n')
+    out.write(f'<rect width="{width}" height="{height}" fill="white"/>\n')
+
+def write_regions(out):
+    """Write the highlighted region rectangles."""
+    for region in REGIONS:
+        bounds = region['bounds']
+        out.write(f'<rect x="{fmt(bounds["x_min"])}" y="{fmt(bounds["y_min"])}" '
+                  f'width="{fmt(bounds["x_max"] - bounds["x_min"])}" '
+                  f'height="{fmt(bounds["y_max"] - bounds["y_min"])}" rx="0.01" '
+                  f'fill="{region["color"]}" fill-opacity="{region["alpha"]}"/>\n')
+
+def write_axes_lines(out):
+    """Write the plot border, grid lines, tick marks and trade-off line."""
+    plot_area = CHART_DIMENSIONS['plot_area']
+    left = plot_area['x']
+    top = plot_area['y']
+    right = left + plot_area['width']
+    bottom = top + plot_area['height']
+    tick_length = 3.5
+
+    out.write(f'<rect x="{fmt(left)}" y="{fmt(top)}" width="{fmt(plot_area["width"])}" '
+              f'height="{fmt(plot_area["height"])}" fill="none" stroke="#1a1a1a" '
+              f'stroke-width="{fmt(pt(1))}"/>\n')
+
+    for _, _, x_pos in X_AXIS_CATEGORIES:
+        out.write(svg_line(x_pos, top, x_pos, bottom, '#d3d3d3', 0.4,
+                           opacity=0.7, dashes=(1.48, 0.64)))
+        out.write(svg_line(x_pos, bottom, x_pos, bottom + tick_length, '#1a1a1a', 0.8))
+
+    for _, _, y_pos in Y_AXIS_CATEGORIES:
+        out.write(svg_line(left, y_pos, right, y_pos, '#d3d3d3', 0.4,
+                           opacity=0.7, dashes=(1.48, 0.64)))
+        out.write(svg_line(left - tick_length, y_pos, left, y_pos, '#1a1a1a', 0.8))
+
+    out.write(svg_line(TRADE_OFF_LINE['start']['x'], TRADE_OFF_LINE['start']['y'],
+                       TRADE_OFF_LINE['end']['x'], TRADE_OFF_LINE['end']['y'],
+                       '#808080', 1, opacity=0.6))
+
+def write_legend_markers(out):
+    """Write the legend category markers."""
+    legend_x = 146.729412
+    y_pos = 45.257261 + 11.178125
+    for key in CATEGORIES:
+        out.write(f'<use xlink:href="#legend-{key}" x="{fmt(legend_x)}" y="{fmt(y_pos)}" '
+                  f'fill="{CATEGORIES[key]["color"]}"/>\n')
+        y_pos += 14.678125
+
+def write_region_texts(out):
+    """Write region names and the region annotations."""
+    for region in REGIONS:
+        bounds = region['bounds']
+        label_x = (bounds['x_min'] + bounds['x_max']) / 2 + region['label_offset']['x']
+        label_y = bounds['y_min'] + region['label_offset']['y']
+        out.write(svg_text(label_x, label_y, region['name'], 14,
+                           REGION_LABEL_COLORS.get(region['color'], 'black'),
+                           ha='center', va='top', weight='bold'))
+
+    for annotation in REGION_ANNOTATIONS:
+        y_offset = 0
+        for line in annotation['text']:
+            out.write(svg_text(annotation['x'], annotation['y'] + y_offset, line, 10,
+                               annotation['color'], va='top', style=annotation['style']))
+            y_offset += 15
+
+def write_chart_texts(out):
+    """Write the title, axis labels, legend texts, tick labels and trade-off label."""
+    out.write(svg_text(232.168456, 22.658824, CHART_TITLE, 16, '#333333', weight='bold'))
+    out.write(svg_text(400.63369, 851.287489, X_AXIS_LABEL, 13, '#1a1a1a',
+                       ha='center', weight='bold'))
+    out.write(svg_text(19.919099, 494.545781, Y_AXIS_LABEL, 13, '#1a1a1a',
+                       ha='center', va='center', weight='bold', rotation=90))
+
+    legend_x = 146.729412
+    legend_y_start = 45.257261
+    out.write(svg_text(154.952068, legend_y_start, "Category", 10, '#333333'))
+    y_pos = legend_y_start + 11.178125
+    for cat_info in CATEGORIES.values():
+        out.write(svg_text(legend_x + 18, y_pos + 3.5, cat_info['label'], 10, '#333333'))
+        y_pos += 14.678125
+
+    plot_area = CHART_DIMENSIONS['plot_area']
+    for category_name, rtt_label, x_pos in X_AXIS_CATEGORIES:
+        label_y = plot_area['y'] + plot_area['height'] + 10.3
+        out.write(svg_text(x_pos, label_y, category_name, 9, '#1a1a1a', ha='center', va='top'))
+        out.write(svg_text(x_pos, label_y + 10.1, rtt_label, 9, '#1a1a1a', ha='center', va='top'))
+
+    for category_name, percentage, y_pos in Y_AXIS_CATEGORIES:
+        out.write(svg_text(plot_area['x'] - 10, y_pos, f"{category_name} ({percentage})", 9,
+                           '#1a1a1a', ha='right', va='center'))
+
+    # The label sits centred above the line's midpoint; matplotlib aligns the
+    # rotated bounding box, so shift the text centre up by half its height
+    start, end = TRADE_OFF_LINE['start'], TRADE_OFF_LINE['end']
+    fontsize = 8
+    width = AVERAGE_CHAR_WIDTH * pt(fontsize) * len(TRADE_OFF_LINE['label'])
+    height = (FONT_ASCENT + FONT_DESCENT) * pt(fontsize)
+    rotated_height = (width + height) / 2 ** 0.5
+    mid_x = (start['x'] + end['x']) / 2
+    mid_y = (start['y'] + end['y']) / 2 - rotated_height / 2
+    out.write(svg_text(mid_x, mid_y, TRADE_OFF_LINE['label'], fontsize, '#808080',
+                       ha='center', va='center', rotation=-45))
+
+def write_data_points(out, data_points):
+    """Write one marker per data point, reusing the category definitions."""
+    for data_point in data_points:
+        category = data_point['category']
+        if category in CATEGORIES:
+            symbol, color = f'marker-{category}', CATEGORIES[category]['color']
+        else:
+            symbol, color = 'marker-default', '#000000'
+        out.write(f'<use xlink:href="#{symbol}" x="{fmt(data_point["x"])}" '
+                  f'y="{fmt(data_point["y"])}" fill="{color}"/>\n')
+
+def write_data_point_labels(out, data_points):
+    """Write the data point labels and annotations below their markers."""
+    props = get_label_properties()
+    fontsize, color = props['fontsize'], props['color']
+    offset = LABEL_OFFSET_HEIGHTS * LINE_HEIGHT * pt(fontsize)
+    for data_point in data_points:
+        out.write(svg_text(data_point['x'], data_point['y'] + offset, data_point['name'],
+                           fontsize, color, ha=props['ha'], va=props['va']))
+    for annotation in get_annotations_for(data_points):
+        out.write(svg_text(annotation['x'], annotation['y'] + offset, annotation['name'],
+                           fontsize, color, ha=props['ha'], va=props['va']))
+
+def write_svg_chart(output_filename='distributed_systems_chart.svg', include_regions=True,
+                    data_points=None):
+    """
+    Write the complete chart to an SVG file without going through matplotlib.
+    Elements are written in the same stacking order matplotlib draws them.
+
+    Args:
+        output_filename: Output filename (default: 'distributed_systems_chart.svg')
+        include_regions: Whether to include highlighted regions (default: True)
+        data_points: List of data point dicts (default: DATA_POINTS)
+
+    Returns:
+        str: The output filename
+    """
+    if data_points is None:
+        data_points = DATA_POINTS
+
+    with open(output_filename, 'w', encoding='utf-8') as out:
+        write_header(out, CHART_DIMENSIONS['width'], CHART_DIMENSIONS['height'])
+        if include_regions:
+            write_regions(out)
+        write_axes_lines(out)
+        write_legend_markers(out)
+        if include_regions:
+            write_region_texts(out)
+        write_chart_texts(out)
+        write_data_points(out, data_points)
+        write_data_point_labels(out, data_points)
+        out.write('</svg>\n')
+
+    return output_filename
@@ -0,0 +1,188 @@
+"""
+Module for mapping measurements onto chart coordinates
+The X axis is linear in round-trips (RTT) and the Y axis is linear in the
+fraction of replicas that must agree. Both scales are derived from the tick
+positions in X_AXIS_CATEGORIES / Y_AXIS_CATEGORIES, so measured systems can
+be placed (and chart positions read back) with whole NumPy arrays.
+"""
+
+import re
+
+import numpy as np
+
+from distributed_systems_data import *
+
+_NUMBER = re.compile(r'[-+]?\d*\.?\d+')
+
+def parse_tick_value(label):
+    """
+    Extract the numeric value of a tick label.
+
+    Args:
+        label: Tick label such as '~1.5 RTT' or '75%'
+
+    Returns:
+        float: The value, with percentages returned as fractions (75% -> 0.75)
+    """
+    match = _NUMBER.search(label)
+    if match is None:
+        raise ValueError(f"No number in tick label '{label}'")
+    value = float(match.group())
+    if label.strip().endswith('%'):
+        value /= 100.0
+    return value
+
+def fit_axis_scale(ticks):
+    """
+    Fit a linear scale to an axis' ticks.
+
+    Args:
+        ticks: (category name, value label, position) tuples, like X_AXIS_CATEGORIES
+
+    Returns:
+        tuple: (slope, intercept) such that position = slope * value + intercept
+    """
+    values = np.array([parse_tick_value(label) for _, label, _ in ticks])
+    positions = np.array([position for _, _, position in ticks], dtype=float)
+    slope, intercept = np.polyfit(values, positions, 1)
+    return float(slope), float(intercept)
+
+class ChartTransform:
+    """
+    Linear map between (RTT, agreement fraction) and chart coordinates.
+    """
+
+    def __init__(self, x_scale, y_scale, plot_area):
+        """
+        Args:
+            x_scale: (slope, intercept) from RTT to chart X
+            y_scale: (slope, intercept) from agreement fraction to chart Y
+            plot_area: Dict with 'x', 'y', 'width' and 'height' (chart coordinates)
+        """
+        self.x_slope, self.x_intercept = x_scale
+        self.y_slope, self.y_intercept = y_scale
+        self.plot_area = plot_area
+
+    @classmethod
+    def from_axis_categories(cls, x_ticks=X_AXIS_CATEGORIES, y_ticks=Y_AXIS_CATEGORIES,
+                             plot_area=None):
+        """
+        Build the transform implied by the axis tick definitions.
+
+        Args:
+            x_ticks: X axis ticks (default: X_AXIS_CATEGORIES)
+            y_ticks: Y axis ticks (default: Y_AXIS_CATEGORIES)
+            plot_area: Plot area dict (default: CHART_DIMENSIONS['plot_area'])
+
+        Returns:
+            ChartTransform: New transform
+        """
+        if plot_area is None:
+            plot_area = CHART_DIMENSIONS['plot_area']
+        return cls(fit_axis_scale(x_ticks), fit_axis_scale(y_ticks), plot_area)
+
+    def plot_bounds(self):
+        """
+        Get the plot area in chart coordinates.
+
+        Returns:
+            tuple: (x_min, y_min, x_max, y_max)
+        """
+        area = self.plot_area
+        return (area['x'], area['y'], area['x'] + area['width'], area['y'] + area['height'])
+
+    def value_bounds(self):
+        """
+        Get the measurement range covered by the plot area.
+
+        Returns:
+            tuple: (rtt_min, agreement_min, rtt_max, agreement_max)
+        """
+        x_min, y_min, x_max, y_max = self.plot_bounds()
+        rtt, agreement = self.inverse(np.array([x_min, x_max]), np.array([y_min, y_max]))
+        return (rtt.min(), agreement.min(), rtt.max(), agreement.max())
+
+    def transform(self, rtt, agreement, clip=False):
+        """
+        Map measurements to chart coordinates.
+
+        Args:
+            rtt: Coordination cost in round-trips (scalar or array)
+            agreement: Fraction of replicas that must agree, 0..1 (scalar or array)
+            clip: Clamp the result to the plot area (default: False)
+
+        Returns:
+            tuple: (x array, y array) in chart coordinates
+        """
+        x = self.x_slope * np.asarray(rtt, dtype=float) + self.x_intercept
+        y = self.y_slope * np.asarray(agreement, dtype=float) + self.y_intercept
+        if clip:
+            x_min, y_min, x_max, y_max = self.plot_bounds()
+            x = np.clip(x, x_min, x_max)
+            y = np.clip(y, y_min, y_max)
+        return x, y
+
+    def inverse(self, x, y):
+        """
+        Map chart coordinates back to measurements.
+
+        Args:
+            x: Chart X coordinates (scalar or array)
+            y: Chart Y coordinates (scalar or array)
+
+        Returns:
+            tuple: (rtt array, agreement fraction array)
+        """
+        rtt = (np.asarray(x, dtype=float) - self.x_intercept) / self.x_slope
+        agreement = (np.asarray(y, dtype=float) - self.y_intercept) / self.y_slope
+        return rtt, agreement
+
+# Transform of the built-in chart layout
+CHART_TRANSFORM = ChartTransform.from_axis_categories()
+
+def measurements_to_chart(rtt, agreement, clip=False):
+    """
+    Map (RTT, agreement fraction) arrays onto the built-in chart.
+
+    Args:
+        rtt: Round-trips per operation
+        agreement: Fraction of replicas that must agree (0..1)
+        clip: Clamp the result to the plot area (default: False)
+
+    Returns:
+        tuple: (x array, y array) in chart coordinates
+    """
+    return CHART_TRANSFORM.transform(rtt, agreement, clip=clip)
+
+def chart_to_measurements(x, y):
+    """
+    Map chart coordinates of the built-in chart back to (RTT, agreement fraction).
+
+    Args:
+        x: Chart X coordinates
+        y: Chart Y coordinates
+
+    Returns:
+        tuple: (rtt array, agreement fraction array)
+    """
+    return CHART_TRANSFORM.inverse(x, y)
+
+def catalog_from_measurements(names, rtt, agreement, categories, clip=False, transform=None):
+    """
+    Build a SystemCatalog from measured systems in one vectorized pass.
+
+    Args:
+        names: System names (must be unique)
+        rtt: Round-trips per operation of each system
+        agreement: Agreement fraction (0..1) of each system
+        categories: Category key of each system (see CATEGORIES)
+        clip: Clamp positions to the plot area (default: False)
+        transform: ChartTransform to use (default: CHART_TRANSFORM)
+
+    Returns:
+        SystemCatalog: Catalog ready to pass as data_points
+    """
+    if transform is None:
+        transform = CHART_TRANSFORM
+    x, y = transform.transform(rtt, agreement, clip=clip)
+    return SystemCatalog(names, x, y, categories)
@@ -0,0 +1,395 @@
+"""
+Delta-state CRDTs with bounded metadata for the 2PS+CM pattern
+G-counter, PN-counter, add-wins OR-set and LWW-map replicas whose
+mutators apply locally and return a small delta of the same type, which
+other replicas merge (or join into delta groups first); merging is
+idempotent, commutative and associative, so deltas may be duplicated,
+reordered or batched (doc/dxp-17-crdts.md, Phase 0).
+
+The OR-set tags each add with a dot (replica, counter) and keeps a
+compact causal context: a version vector of contiguous counters per
+replica plus the few dots seen out of order, so removes leave no
+tombstones and the context is bounded by the number of replicas. The
+LWW-map does need tombstones, and counters keep one entry per replica
+that ever wrote. synchronize() is the 2PS+CM sync point: it snapshots
+every replica (prepare), agrees on the join of the snapshots, and has
+every replica adopt it (execute) with that shared metadata garbage
+collected - tombstones dropped, counters rebased - and a new epoch, so
+deltas generated before the sync point are recognised and ignored.
+"""
+
+import abc
+import copy
+
+class DotContext:
+    """
+    Compact causal context: per replica the largest counter n such that
+    dots 1..n have all been seen, plus the dots seen beyond a gap.
+    """
+
+    __slots__ = ('vv', 'cloud')
+
+    def __init__(self):
+        self.vv = {}
+        self.cloud = set()
+
+    def __contains__(self, dot):
+        replica, counter = dot
+        return counter <= self.vv.get(replica, 0) or dot in self.cloud
+
+    def __len__(self):
+        return len(self.vv) + len(self.cloud)
+
+    def span(self):
+        """Number of dots the context covers."""
+        return sum(self.vv.values()) + len(self.cloud)
+
+    def dots(self):
+        """Iterate over every dot the context covers."""
+        for replica, counter in self.vv.items():
+            for n in range(1, counter + 1):
+                yield (replica, n)
+        yield from self.cloud
+
+    def next_dot(self, replica):
+        """Make and record the replica's next dot."""
+        counter = self.vv.get(replica, 0) + 1
+        self.vv[replica] = counter
+        return (replica, counter)
+
+    def add(self, dot):
+        self.cloud.add(dot)
+
+    def compact(self):
+        """Fold cloud dots that extend a contiguous range into the version vector."""
+        vv = self.vv
+        for dot in sorted(self.cloud):
+            replica, counter = dot
+            seen = vv.get(replica, 0)
+            if counter == seen + 1:
+                vv[replica] = counter
+            elif counter > seen:
+                continue
+            self.cloud.discard(dot)
+
+    def merge(self, other):
+        vv = self.vv
+        for replica, counter in other.vv.items():
+            if counter > vv.get(replica, 0):
+                vv[replica] = counter
+        if other.cloud or self.cloud:
+            self.cloud |= other.cloud
+            self.compact()
+
+class DeltaCRDT(abc.ABC):
+    """Base class: replica id, epoch gating and the sync-point hooks."""
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        self.epoch = 0
+
+    def _delta(self):
+        delta = type(self)(self.replica)
+        delta.epoch = self.epoch
+        return delta
+
+    def _accepts(self, other):
+        """False for state from before the last sync point; error for state from a missed one."""
+        if other.epoch > self.epoch:
+            raise ValueError(f"replica {self.replica!r} is at epoch {self.epoch}, "
+                             f"merging state from epoch {other.epoch}: it missed a sync point")
+        return other.epoch == self.epoch
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def collect(self):
+        """Garbage-collect metadata every replica shares after a sync point."""
+
+    def adopt(self, checkpoint):
+        """Replace this replica's state with an agreed checkpoint, keeping its id."""
+        replica = self.replica
+        self.__dict__.update(copy.deepcopy(checkpoint.__dict__))
+        self.replica = replica
+
+    @abc.abstractmethod
+    def metadata(self):
+        """Number of causal metadata items (counters, dots, tombstones) held."""
+
+class GCounter(DeltaCRDT):
+    """Grow-only counter: one count per replica plus a base agreed at sync points."""
+
+    def __init__(self, replica=None):
+        super().__init__(replica)
+        self.base = 0
+        self.counts = {}
+
+    @property
+    def value(self):
+        return self.base + sum(self.counts.values())
+
+    def increment(self, amount=1):
+        """Add a non-negative amount; returns the delta."""
+        if amount < 0:
+            raise ValueError(f"G-counter cannot decrease (amount {amount})")
+        count = self.counts.get(self.replica, 0) + amount
+        self.counts[self.replica] = count
+        delta = self._delta()
+        delta.counts[self.replica] = count
+        return delta
+
+    def merge(self, other):
+        if not self._accepts(other):
+            return self
+        counts = self.counts
+        for replica, count in other.counts.items():
+            if count > counts.get(replica, 0):
+                counts[replica] = count
+        if other.base > self.base:
+            self.base = other.base
+        return self
+
+    def collect(self):
+        # Every replica agrees on the total, so it becomes the base
+        self.base = self.value
+        self.counts = {}
+
+    def metadata(self):
+        return len(self.counts)
+
+class PNCounter(DeltaCRDT):
+    """Counter with increments and decrements: a pair of G-counters."""
+
+    def __init__(self, replica=None):
+        super().__init__(replica)
+        self.p = GCounter(replica)
+        self.n = GCounter(replica)
+
+    @property
+    def value(self):
+        return self.p.value - self.n.value
+
+    def increment(self, amount=1):
+        """Add amount (negative amounts decrement); returns the delta."""
+        delta = self._delta()
+        if amount >= 0:
+            delta.p = self.p.increment(amount)
+        else:
+            delta.n = self.n.increment(-amount)
+        return delta
+
+    def decrement(self, amount=1):
+        return self.increment(-amount)
+
+    def merge(self, other):
+        if self._accepts(other):
+            self.p.merge(other.p)
+            self.n.merge(other.n)
+        return self
+
+    def collect(self):
+        self.p.collect()
+        self.n.collect()
+
+    def adopt(self, checkpoint):
+        super().adopt(checkpoint)
+        self.p.replica = self.n.replica = self.replica
+
+    def metadata(self):
+        return self.p.metadata() + self.n.metadata()
+
+class ORSet(DeltaCRDT):
+    """
+    Add-wins observed-remove set. Each element maps to the dots of the adds
+    that are still live; a remove only records those dots in the causal
+    context, so a concurrent add (with a dot the remover had not seen) wins.
+    """
+
+    def __init__(self, replica=None):
+        super().__init__(replica)
+        self.entries = {}
+        self.context = DotContext()
+        self._owner = {}  # dot -> element, to find what a delta's context removes
+
+    def __contains__(self, element):
+        return element in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    @property
+    def value(self):
+        return set(self.entries)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_owner']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._owner = {dot: element for element, dots in self.entries.items() for dot in dots}
+
+    def _drop(self, element):
+        dots = self.entries.pop(element, ())
+        for dot in dots:
+            del self._owner[dot]
+        return dots
+
+    def add(self, element):
+        """Add element (replacing its earlier dots); returns the delta."""
+        dot = self.context.next_dot(self.replica)
+        delta = self._delta()
+        delta.context.cloud.update(self._drop(element))
+        delta.context.cloud.add(dot)
+        delta.entries[element] = {dot}
+        delta._owner[dot] = element
+        self.entries[element] = {dot}
+        self._owner[dot] = element
+        return delta
+
+    def remove(self, element):
+        """Remove element as observed here; returns the delta."""
+        delta = self._delta()
+        delta.context.cloud.update(self._drop(element))
+        return delta
+
+    def merge(self, other):
+        if not self._accepts(other):
+            return self
+        entries, owner, context = self.entries, self._owner, self.context
+        theirs = other.entries
+
+        # Dots the other side has seen but no longer holds were removed there
+        removed = []
+        if other.context.span() < len(owner):
+            for dot in other.context.dots():
+                element = owner.get(dot)
+                if element is not None and dot not in theirs.get(element, ()):
+                    removed.append(dot)
+        else:
+            seen = other.context
+            for element, dots in entries.items():
+                held = theirs.get(element, ())
+                removed.extend(dot for dot in dots if dot not in held and dot in seen)
+        for dot in removed:
+            element = owner.pop(dot)
+            dots = entries[element]
+            dots.discard(dot)
+            if not dots:
+                del entries[element]
+
+        # Dots the other side holds that this side has never seen are new adds
+        for element, dots in theirs.items():
+            for dot in dots:
+                if dot not in context:
+                    entries.setdefault(element, set()).add(dot)
+                    owner[dot] = element
+        context.merge(other.context)
+        return self
+
+    def collect(self):
+        self.context.compact()
+
+    def metadata(self):
+        return len(self._owner) + len(self.context)
+
+class LWWMap(DeltaCRDT):
+    """
+    Last-writer-wins map ordered by (Lamport clock, replica). A remove
+    writes a tombstone, which must outlive every older write still in
+    flight; tombstones are dropped at sync points.
+    """
+
+    def __init__(self, replica=None):
+        super().__init__(replica)
+        self.clock = 0
+        self.entries = {}  # key -> (clock, replica, value, live)
+
+    def __contains__(self, key):
+        entry = self.entries.get(key)
+        return entry is not None and entry[3]
+
+    def __len__(self):
+        return sum(entry[3] for entry in self.entries.values())
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        return entry[2] if entry is not None and entry[3] else default
+
+    @property
+    def value(self):
+        return {key: entry[2] for key, entry in self.entries.items() if entry[3]}
+
+    @property
+    def tombstones(self):
+        return sum(not entry[3] for entry in self.entries.values())
+
+    def _write(self, key, value, live):
+        self.clock += 1
+        entry = (self.clock, self.replica, value, live)
+        self.entries[key] = entry
+        delta = self._delta()
+        delta.clock = self.clock
+        delta.entries[key] = entry
+        return delta
+
+    def put(self, key, value):
+        """Set key; returns the delta."""
+        return self._write(key, value, True)
+
+    def remove(self, key):
+        """Remove key with a tombstone; returns the delta."""
+        return self._write(key, None, False)
+
+    def merge(self, other):
+        if not self._accepts(other):
+            return self
+        entries = self.entries
+        for key, entry in other.entries.items():
+            mine = entries.get(key)
+            if mine is None or (entry[0], entry[1]) > (mine[0], mine[1]):
+                entries[key] = entry
+        if other.clock > self.clock:
+            self.clock = other.clock
+        return self
+
+    def collect(self):
+        # Every replica has the tombstones' effect and later writes carry larger clocks
+        self.entries = {key: entry for key, entry in self.entries.items() if entry[3]}
+
+    def metadata(self):
+        return len(self.entries)
+
+def join(deltas):
+    """Join deltas (or states) into one delta group."""
+    deltas = list(deltas)
+    group = deltas[0].copy()
+    for delta in deltas[1:]:
+        group.merge(delta)
+    return group
+
+def synchronize(replicas):
+    """
+    Run a 2PS+CM sync point over all replicas of one CRDT.
+
+    Phase 1 snapshots every replica; phase 2 agrees on the join of the
+    snapshots, garbage-collects the metadata that join makes redundant,
+    starts a new epoch and has every replica adopt the result.
+
+    Args:
+        replicas: Replicas of one CRDT type, all at the same epoch
+
+    Returns:
+        DeltaCRDT: The agreed checkpoint
+    """
+    snapshots = [replica.copy() for replica in replicas]
+    checkpoint = join(snapshots)
+    checkpoint.collect()
+    checkpoint.epoch += 1
+    for replica in replicas:
+        replica.adopt(checkpoint)
+    return checkpoint
@@ -3,6 +3,8 @@ Distributed Systems State-Convergence Chart Data
 Extracted from the Full-Spectrum State-Convergence Map SVG
 """
 
+from system_catalog import SystemCatalog
+
 # Chart metadata
 CHART_TITLE = "Full-Spectrum State-Convergence Map (All Original Data)"
 X_AXIS_LABEL = "Coordination Intensity →"
@@ -108,27 +110,34 @@ CHART_DIMENSIONS = {
     }
 }
 
+# Indexed views of the data above, built once at import time
+CATALOG = SystemCatalog.from_data_points(DATA_POINTS)
+_X_POSITIONS = {name: x_pos for name, rtt, x_pos in X_AXIS_CATEGORIES}
+_Y_POSITIONS = {name: y_pos for name, percentage, y_pos in Y_AXIS_CATEGORIES}
+
 def get_x_position_for_category(category_name):
     """Get the x-coordinate for a given x-axis category name."""
-    for name, rtt, x_pos in X_AXIS_CATEGORIES:
-        if name == category_name:
-            return x_pos
-    return None
+    return _X_POSITIONS.get(category_name)
 
 def get_y_position_for_category(category_name):
     """Get the y-coordinate for a given y-axis category name."""
-    for name, percentage, y_pos in Y_AXIS_CATEGORIES:
-        if name == category_name:
-            return y_pos
-    return None
+    return _Y_POSITIONS.get(category_name)
 
-def get_systems_by_category(category):
+def get_systems_by_category(category, catalog=None):
     """Get all systems belonging to a specific category."""
-    return [dp for dp in DATA_POINTS if dp["category"] == category]
+    if catalog is None:
+        catalog = CATALOG
+    return list(catalog.systems_in_category(category))
 
-def get_system_coordinates(system_name):
+def get_system_coordinates(system_name, catalog=None):
     """Get the coordinates for a specific system."""
-    for dp in DATA_POINTS:
-        if dp["name"] == system_name:
-            return (dp["x"], dp["y"])
-    return None
\ No newline at end of file
+    if catalog is None:
+        catalog = CATALOG
+    return catalog.coordinates(system_name)
+
+def get_annotations_for(data_points):
+    """Get the annotations whose parent system is present in data_points."""
+    if data_points is DATA_POINTS:
+        return ANNOTATIONS
+    names = {dp["name"] for dp in data_points}
+    return [annotation for annotation in ANNOTATIONS if annotation["parent"] in names]
@@ -0,0 +1,397 @@
+"""
+Structural invariants of compiled Petri nets
+P-invariants (weighted token sums every firing preserves, y.C = 0) and
+T-invariants (firing counts that reproduce a marking, C.x = 0) are computed
+from the incidence matrix, one connected component of the net at a time:
+- minimal semi-positive invariants with the Farkas algorithm, pruned by
+  minimal support after every eliminated column
+- an integer basis of all invariants by unimodular row reduction to
+  Hermite normal form
+Places covered by a semi-positive P-invariant are structurally bounded,
+with a bound read off the invariant and the initial marking.
+
+Usage:
+    python petri_invariants.py net.pnml [--replicate PAGE=N ...] [--basis] [--quiet]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from petri_net import ARC_TYPES, load_pnml, replicate
+
+# Rows the Farkas tableau may grow to before giving up
+DEFAULT_MAX_ROWS = 100_000
+
+# Support-containment checks are done this many rows at a time
+_BLOCK_ROWS = 2048
+
+def components(net):
+    """
+    Split a net into connected components (places and transitions linked
+    by arcs of any type).
+
+    Args:
+        net: PetriNet
+
+    Returns:
+        list: (place indices, transition indices) per component; a place
+              or transition without arcs is a component of its own
+    """
+    # Union-find over places 0..P-1 and transitions P..P+T-1
+    parent = np.arange(net.n_places + net.n_transitions)
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for place, transition in zip(net.arc_place.tolist(),
+                                 (net.arc_transition + net.n_places).tolist()):
+        a, b = find(place), find(transition)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    roots = np.array([find(node) for node in range(len(parent))], dtype=np.int64)
+    _, labels = np.unique(roots, return_inverse=True)
+    place_labels, transition_labels = labels[:net.n_places], labels[net.n_places:]
+
+    order_places = np.argsort(place_labels, kind='stable')
+    order_transitions = np.argsort(transition_labels, kind='stable')
+    count = labels.max() + 1 if len(labels) else 0
+    place_offsets = np.searchsorted(place_labels[order_places], np.arange(count + 1))
+    transition_offsets = np.searchsorted(transition_labels[order_transitions],
+                                         np.arange(count + 1))
+    return [(order_places[place_offsets[c]:place_offsets[c + 1]],
+             order_transitions[transition_offsets[c]:transition_offsets[c + 1]])
+            for c in range(count)]
+
+def _normalize(rows):
+    """Divide each row by the gcd of its entries."""
+    if not len(rows):
+        return rows
+    divisor = np.gcd.reduce(np.abs(rows), axis=1)
+    divisor[divisor == 0] = 1
+    return rows // divisor[:, None]
+
+def _minimal_support(support):
+    """
+    Find the rows whose support contains no other row's support.
+    Rows with equal supports are all kept.
+
+    Args:
+        support: (rows, columns) boolean
+
+    Returns:
+        ndarray: Boolean mask of minimal rows
+    """
+    sizes = support.sum(axis=1)
+    inside = support.astype(np.float32)
+    outside = (~support).astype(np.float32)
+    minimal = np.ones(len(support), dtype=bool)
+    for start in range(0, len(support), _BLOCK_ROWS):
+        block = slice(start, start + _BLOCK_ROWS)
+        # extra[r, s]: entries of row r's support missing from row s's
+        extra = inside @ outside[block].T
+        contained = (extra == 0) & (sizes[:, None] < sizes[None, block])
+        minimal[block] = ~contained.any(axis=0)
+    return minimal
+
+def farkas(matrix, max_rows=DEFAULT_MAX_ROWS):
+    """
+    Compute the minimal-support semi-positive solutions of y.matrix = 0.
+
+    Args:
+        matrix: (n, m) integer matrix (the incidence matrix for
+                P-invariants, its transpose for T-invariants)
+        max_rows: Give up (OverflowError) if the tableau grows beyond this
+
+    Returns:
+        ndarray: (k, n) int64, one invariant per row, each scaled to
+                 coprime entries
+    """
+    remaining = np.array(matrix, dtype=np.int64)
+    n, m = remaining.shape
+    solutions = np.eye(n, dtype=np.int64)
+    columns = list(range(m))
+
+    while columns and len(solutions):
+        # Eliminate the column that creates the fewest new rows first
+        signs = np.sign(remaining[:, columns])
+        positive = (signs > 0).sum(axis=0)
+        negative = (signs < 0).sum(axis=0)
+        pick = int(np.argmin(positive * negative - positive - negative))
+        column = columns.pop(pick)
+
+        values = remaining[:, column]
+        zero = values == 0
+        pos, neg = np.flatnonzero(values > 0), np.flatnonzero(values < 0)
+        if len(pos) * len(neg) + zero.sum() > max_rows:
+            raise OverflowError(f"Farkas tableau would exceed {max_rows} rows")
+
+        # Every positive/negative pair combines into a row that is zero here
+        p, q = np.repeat(pos, len(neg)), np.tile(neg, len(pos))
+        a, b = values[p][:, None], -values[q][:, None]
+        new_remaining = b * remaining[p] + a * remaining[q]
+        new_solutions = b * solutions[p] + a * solutions[q]
+
+        rows = _normalize(np.hstack([np.vstack([remaining[zero], new_remaining]),
+                                     np.vstack([solutions[zero], new_solutions])]))
+        rows = np.unique(rows, axis=0)
+        rows = rows[_minimal_support(rows[:, m:] != 0)]
+        remaining, solutions = rows[:, :m], rows[:, m:]
+
+    # Rows left with a non-zero remainder have no semi-positive completion
+    solutions = solutions[(remaining == 0).all(axis=1)] if m else solutions
+    if len(solutions):
+        solutions = solutions[_minimal_support(solutions != 0)]
+    return solutions
+
+def hermite_kernel(matrix):
+    """
+    Compute an integer basis of all solutions of y.matrix = 0.
+
+    [matrix | I] is brought to Hermite normal form with unimodular row
+    operations (Euclid-style reduction, one column at a time); the rows
+    whose matrix part vanishes span the kernel lattice.
+
+    Args:
+        matrix: (n, m) integer matrix
+
+    Returns:
+        ndarray: (n - rank, n) int64 basis, one solution per row
+    """
+    work = np.array(matrix, dtype=np.int64)
+    n, m = work.shape
+    basis = np.eye(n, dtype=np.int64)
+    pivot = 0
+
+    for column in range(m):
+        while pivot < n:
+            rows = pivot + np.flatnonzero(work[pivot:, column])
+            if not len(rows):
+                break
+            # Smallest entry becomes the pivot; reduce the others modulo it
+            best = rows[np.argmin(np.abs(work[rows, column]))]
+            if best != pivot:
+                work[[pivot, best]] = work[[best, pivot]]
+                basis[[pivot, best]] = basis[[best, pivot]]
+            others = pivot + 1 + np.flatnonzero(work[pivot + 1:, column])
+            if not len(others):
+                pivot += 1
+                break
+            quotient = work[others, column] // work[pivot, column]
+            work[others] -= quotient[:, None] * work[pivot]
+            basis[others] -= quotient[:, None] * basis[pivot]
+
+        if np.abs(basis).max(initial=0) > 2 ** 40:
+            raise OverflowError("Hermite reduction coefficients grew too large for int64")
+
+    return _normalize(basis[pivot:])
+
+def _embed(local, indices, size):
+    """Scatter per-component rows into full-width rows."""
+    rows = np.zeros((len(local), size), dtype=np.int64)
+    rows[:, indices] = local
+    return rows
+
+def p_invariants(net, method='farkas', max_rows=DEFAULT_MAX_ROWS):
+    """
+    Compute a net's P-invariants (y with y.C = 0).
+
+    Args:
+        net: PetriNet
+        method: 'farkas' for the minimal semi-positive invariants, 'basis'
+                for an integer basis of all invariants (default: 'farkas')
+        max_rows: Farkas tableau limit per component
+
+    Returns:
+        ndarray: (k, places) int64
+    """
+    return _invariants(net, method, max_rows, transpose=False)
+
+def t_invariants(net, method='farkas', max_rows=DEFAULT_MAX_ROWS):
+    """
+    Compute a net's T-invariants (x with C.x = 0).
+
+    Args:
+        net: PetriNet
+        method: 'farkas' or 'basis', as for p_invariants
+        max_rows: Farkas tableau limit per component
+
+    Returns:
+        ndarray: (k, transitions) int64
+    """
+    return _invariants(net, method, max_rows, transpose=True)
+
+def _invariants(net, method, max_rows, transpose):
+    if method not in ('farkas', 'basis'):
+        raise ValueError(f"method must be 'farkas' or 'basis', not '{method}'")
+
+    # Only the arcs of one component at a time are needed; avoid the dense
+    # incidence matrix of the whole net
+    size = net.n_transitions if transpose else net.n_places
+    place_position = np.empty(net.n_places, dtype=np.intp)
+    transition_position = np.empty(net.n_transitions, dtype=np.intp)
+    normal = net.arc_type == ARC_TYPES.index('normal')
+    sign = np.where(net.arc_input, -1, 1)[normal]
+    arc_places, arc_transitions = net.arc_place[normal], net.arc_transition[normal]
+    arc_values = sign * net.arc_weight[normal]
+    component_of = np.empty(net.n_places, dtype=np.intp)
+
+    parts = components(net)
+    for number, (places, _) in enumerate(parts):
+        component_of[places] = number
+    arc_order = np.argsort(component_of[arc_places], kind='stable')
+    arc_offsets = np.searchsorted(component_of[arc_places][arc_order], np.arange(len(parts) + 1))
+
+    rows = []
+    for number, (places, transitions) in enumerate(parts):
+        place_position[places] = np.arange(len(places))
+        transition_position[transitions] = np.arange(len(transitions))
+        arcs = arc_order[arc_offsets[number]:arc_offsets[number + 1]]
+
+        incidence = np.zeros((len(places), len(transitions)), dtype=np.int64)
+        np.add.at(incidence, (place_position[arc_places[arcs]],
+                              transition_position[arc_transitions[arcs]]), arc_values[arcs])
+        if transpose:
+            incidence, indices = incidence.T, transitions
+        else:
+            indices = places
+        if not incidence.shape[0]:
+            continue
+
+        local = farkas(incidence, max_rows) if method == 'farkas' else hermite_kernel(incidence)
+        rows.append(_embed(local, indices, size))
+
+    return np.vstack(rows) if rows else np.zeros((0, size), dtype=np.int64)
+
+def structural_bounds(invariants, marking):
+    """
+    Bound each place using semi-positive P-invariants: y.M = y.M0 for every
+    reachable M, so M(p) <= floor(y.M0 / y(p)).
+
+    Args:
+        invariants: (k, places) semi-positive P-invariants
+        marking: Initial marking
+
+    Returns:
+        ndarray: Bound per place, -1 where no invariant covers the place
+    """
+    invariants = np.asarray(invariants, dtype=np.int64)
+    conserved = invariants @ np.asarray(marking, dtype=np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bounds = np.where(invariants > 0, conserved[:, None] // np.maximum(invariants, 1),
+                          np.iinfo(np.int64).max)
+    bounds = bounds.min(axis=0, initial=np.iinfo(np.int64).max)
+    bounds[bounds == np.iinfo(np.int64).max] = -1
+    return bounds
+
+def analyze(net, marking=None, method='farkas', max_rows=DEFAULT_MAX_ROWS):
+    """
+    Compute P- and T-invariants and what they cover.
+
+    Args:
+        net: PetriNet
+        marking: Initial marking for conserved sums and bounds (default: the net's)
+        method: 'farkas' or 'basis' (see p_invariants)
+        max_rows: Farkas tableau limit per component
+
+    Returns:
+        dict: 'p_invariants', 't_invariants', 'conserved' (y.M0 per
+              P-invariant), 'covered_places', 'covered_transitions'
+              (boolean masks; covered places are structurally bounded
+              with the farkas method), 'bounds' (per place, -1 if not
+              covered; farkas only) and 'seconds'
+    """
+    start = time.perf_counter()
+    if marking is None:
+        marking = net.initial_marking
+    marking = np.asarray(marking, dtype=np.int64)
+
+    p_inv = p_invariants(net, method, max_rows)
+    t_inv = t_invariants(net, method, max_rows)
+    result = {
+        'p_invariants': p_inv,
+        't_invariants': t_inv,
+        'conserved': p_inv @ marking,
+        'covered_places': (p_inv != 0).any(axis=0),
+        'covered_transitions': (t_inv != 0).any(axis=0),
+        'bounds': structural_bounds(p_inv, marking) if method == 'farkas' else None
+    }
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def describe_invariant(names, invariant):
+    """
+    Write an invariant as a weighted sum, e.g. 'AVAILABLE + RESERVED_POOL'.
+
+    Args:
+        names: Place or transition names
+        invariant: Coefficient per place or transition
+
+    Returns:
+        str: The sum over its support
+    """
+    terms = []
+    for i in np.flatnonzero(invariant):
+        coefficient = int(invariant[i])
+        sign = '-' if coefficient < 0 else '+'
+        magnitude = abs(coefficient)
+        term = names[i] if magnitude == 1 else f'{magnitude}*{names[i]}'
+        terms.append((sign, term))
+    if not terms:
+        return '0'
+    text = ('-' if terms[0][0] == '-' else '') + terms[0][1]
+    return text + ''.join(f' {sign} {term}' for sign, term in terms[1:])
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Compute P- and T-invariants of a PNML net")
+    parser.add_argument('pnml', help="PNML file")
+    parser.add_argument('--replicate', action='append', default=[], metavar='PAGE=N',
+                        help="Replicate a page N times before the analysis (repeatable)")
+    parser.add_argument('--basis', action='store_true',
+                        help="Integer (Hermite) basis of all invariants instead of the "
+                             "minimal semi-positive ones")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Only print counts and coverage")
+    args = parser.parse_args(argv)
+
+    from petri_reachability import parse_assignments
+    try:
+        net = load_pnml(args.pnml)
+        for page, copies in parse_assignments(args.replicate).items():
+            net = replicate(net, page, copies)
+    except (KeyError, ValueError, argparse.ArgumentTypeError) as error:
+        # KeyError's str() would quote the message
+        parser.error(error.args[0] if isinstance(error, KeyError) else str(error))
+
+    result = analyze(net, method='basis' if args.basis else 'farkas')
+
+    print(f"{net.id}: {net.n_places} places, {net.n_transitions} transitions, "
+          f"{len(components(net))} components ({result['seconds']:.2f}s)")
+    print(f"{len(result['p_invariants'])} P-invariants, {len(result['t_invariants'])} T-invariants")
+    if not args.quiet:
+        for invariant, total in zip(result['p_invariants'], result['conserved']):
+            print(f"  P: {describe_invariant(net.place_names, invariant)} = {total}")
+        for invariant in result['t_invariants']:
+            print(f"  T: {describe_invariant(net.transition_names, invariant)}")
+
+    covered = result['covered_places']
+    print(f"places covered by P-invariants: {covered.sum()}/{net.n_places}")
+    uncovered = [net.place_names[p] for p in np.flatnonzero(~covered)]
+    if uncovered:
+        shown = ', '.join(uncovered[:20]) + (', ...' if len(uncovered) > 20 else '')
+        print(f"  not covered: {shown}")
+    print(f"transitions covered by T-invariants: "
+          f"{result['covered_transitions'].sum()}/{net.n_transitions}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
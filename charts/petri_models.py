@@ -0,0 +1,179 @@
+"""
+Generated Petri net models of 3PS and 3PS+QM
+One transaction run by a coordinator against n identical participants,
+built from a single participant page that is replicated n times, so the
+nets carry the replica groups symmetry reduction needs. With a quorum Q
+the coordinator moves on after Q acknowledgements or votes (3PS+QM, see
+doc/dxp-14-proof-3ps-plus-qm.md); without one it needs all n (3PS, see
+doc/dxp-11-proof-3ps.md).
+"""
+
+import numpy as np
+
+from petri_net import PetriNet, replicate
+
+PARTICIPANT_PAGE = 'participant'
+
+# Coordinator timeout (seconds) of the reserve and validate phases, for simulation
+TIMEOUT = 30
+
+# Participant places holding a reservation (must be empty once the coordinator is done)
+HOLDING_PLACES = ('reserved', 'validated')
+
+def majority_quorum(participants):
+    """
+    Get the 3PS+QM quorum size Q = ceil(n/2) + 1 (at most n), as in
+    doc/dxp-14-proof-3ps-plus-qm.md.
+
+    Args:
+        participants: Number of participants n
+
+    Returns:
+        int: Quorum size
+    """
+    return min(-(-participants // 2) + 1, participants)
+
+def _node(node_id, page='', initial=0, **metadata):
+    node = {'id': node_id, 'name': node_id, 'page': page, 'metadata': metadata}
+    if initial is not None:
+        node['initial'] = initial
+    return node
+
+def three_phase_net(participants=3, quorum=None, capacity=None, faults=None):
+    """
+    Build a 3PS (or 3PS+QM) transaction net.
+
+    The coordinator broadcasts RESERVE, VALIDATE and EXECUTE (or ABORT) to
+    every participant's own inbox and counts acknowledgements and votes in
+    shared places. Participants reserve one unit of a shared resource, may
+    refuse (no stock) or fail validation (expired reservation) and release
+    their unit on abort. Coordinator timeouts abort from the reserve and validate
+    phases after TIMEOUT seconds (a delay only the simulator uses). With a
+    quorum, up to `faults` participants may crash while idle.
+
+    Args:
+        participants: Number of participants n
+        quorum: Acknowledgements/votes needed to proceed (default: n, i.e. 3PS)
+        capacity: Units of the shared resource (default: n)
+        faults: Participants allowed to crash (default: n - quorum)
+
+    Returns:
+        PetriNet: The model, with the participant places as one replica group
+    """
+    n = participants
+    q = n if quorum is None else quorum
+    if not 1 <= q <= n:
+        raise ValueError(f"Quorum must be between 1 and {n}, not {q}")
+    capacity = n if capacity is None else capacity
+    faults = n - q if faults is None else faults
+
+    places = [_node('init', initial=1)]
+    places += [_node(p) for p in ('reserving', 'validating', 'executing')]
+    places.append(_node('committed', placeType='exit-point'))
+    places.append(_node('aborted', placeType='abort-point'))
+    places += [_node(p) for p in ('ack', 'nack', 'vote_ok', 'vote_fail')]
+    places.append(_node('available', initial=capacity))
+    places.append(_node('fault_budget', initial=faults))
+    places.append(_node('idle', PARTICIPANT_PAGE, initial=1))
+    places += [_node(p, PARTICIPANT_PAGE) for p in ('reserved', 'validated', 'executed',
+                                                    'released', 'refused', 'crashed')]
+
+    # Point-to-point inboxes: a broadcast puts one message in every copy
+    places += [_node(p, PARTICIPANT_PAGE) for p in ('reserve_msg', 'validate_msg',
+                                                    'execute_msg', 'abort_msg')]
+
+    # name: (page, inputs, outputs, inhibitors); inputs/outputs map place -> weight
+    reject = n - q + 1
+    specs = {
+        'begin': ('', {'init': 1}, {'reserving': 1, 'reserve_msg': 1}, {}),
+        'reserve_quorum': ('', {'reserving': 1, 'ack': q},
+                           {'validating': 1, 'validate_msg': 1}, {}),
+        'reserve_rejected': ('', {'reserving': 1, 'nack': reject},
+                             {'aborted': 1, 'abort_msg': 1}, {}),
+        'reserve_timeout': ('', {'reserving': 1}, {'aborted': 1, 'abort_msg': 1}, {}),
+        'validate_quorum': ('', {'validating': 1, 'vote_ok': q},
+                            {'executing': 1, 'execute_msg': 1}, {}),
+        'validate_rejected': ('', {'validating': 1, 'vote_fail': reject},
+                              {'aborted': 1, 'abort_msg': 1}, {}),
+        'validate_timeout': ('', {'validating': 1}, {'aborted': 1, 'abort_msg': 1}, {}),
+        'finish': ('', {'executing': 1}, {'committed': 1}, {}),
+
+        'reserve': (PARTICIPANT_PAGE, {'idle': 1, 'reserve_msg': 1, 'available': 1},
+                    {'reserved': 1, 'ack': 1}, {}),
+        'refuse': (PARTICIPANT_PAGE, {'idle': 1, 'reserve_msg': 1},
+                   {'refused': 1, 'nack': 1}, {'available': 1}),
+        'validate': (PARTICIPANT_PAGE, {'reserved': 1, 'validate_msg': 1},
+                     {'validated': 1, 'vote_ok': 1}, {}),
+        'expire': (PARTICIPANT_PAGE, {'reserved': 1, 'validate_msg': 1},
+                   {'released': 1, 'available': 1, 'vote_fail': 1}, {}),
+        'execute': (PARTICIPANT_PAGE, {'validated': 1, 'execute_msg': 1}, {'executed': 1}, {}),
+        'abort_idle': (PARTICIPANT_PAGE, {'idle': 1, 'abort_msg': 1}, {'released': 1}, {}),
+        'abort_refused': (PARTICIPANT_PAGE, {'refused': 1, 'abort_msg': 1}, {'released': 1}, {}),
+        'abort_reserved': (PARTICIPANT_PAGE, {'reserved': 1, 'abort_msg': 1},
+                           {'released': 1, 'available': 1}, {}),
+        'abort_validated': (PARTICIPANT_PAGE, {'validated': 1, 'abort_msg': 1},
+                            {'released': 1, 'available': 1}, {}),
+        'crash': (PARTICIPANT_PAGE, {'idle': 1, 'fault_budget': 1}, {'crashed': 1}, {}),
+    }
+
+    place_index = {p['id']: i for i, p in enumerate(places)}
+    transitions, arcs = [], []
+    for name, (page, inputs, outputs, inhibitors) in specs.items():
+        t = len(transitions)
+        transition = _node(name, page, initial=None)
+        if name.endswith('_timeout'):
+            transition['metadata'] = {'type': 'timed', 'delay': TIMEOUT}
+        transition['subprocess'] = False
+        transitions.append(transition)
+        for arc_places, direction, arc_type in ((inputs, 'in', 'normal'),
+                                                (outputs, 'out', 'normal'),
+                                                (inhibitors, 'in', 'inhibitor')):
+            for place, weight in arc_places.items():
+                arcs.append({'id': f'{name}:{place}', 'place': place_index[place],
+                             'transition': t, 'direction': direction, 'type': arc_type,
+                             'weight': weight, 'symbol': None, 'metadata': {}})
+
+    label = '3PS' if q == n else f'3PS+QM(Q={q})'
+    template = PetriNet(f'{label} x{n}', places, transitions, arcs,
+                        {'participants': n, 'quorum': q, 'capacity': capacity, 'faults': faults})
+    return replicate(template, PARTICIPANT_PAGE, n)
+
+def participant_places(net, place):
+    """
+    Get the indices of one participant place across all copies.
+
+    Args:
+        net: PetriNet from three_phase_net
+        place: Participant place id, e.g. 'executed'
+
+    Returns:
+        ndarray: One place index per participant
+    """
+    return np.array([net.place(f'{place}#{i + 1}') for i in range(net.metadata['participants'])])
+
+def three_phase_final(net):
+    """
+    Build the predicate for proper termination of a three_phase_net: the
+    coordinator has committed or aborted, no participant still holds a
+    reservation, a commit executed at least a quorum and an abort executed
+    nobody. Dead markings failing it are deadlocks.
+
+    Args:
+        net: PetriNet from three_phase_net
+
+    Returns:
+        callable: (k, places) markings -> boolean mask
+    """
+    committed, aborted = net.place('committed'), net.place('aborted')
+    holding = np.concatenate([participant_places(net, p) for p in HOLDING_PLACES])
+    executed = participant_places(net, 'executed')
+    quorum = net.metadata['quorum']
+
+    def is_final(markings):
+        executions = markings[:, executed].sum(axis=1)
+        clean = markings[:, holding].sum(axis=1) == 0
+        commit = (markings[:, committed] == 1) & (executions >= quorum)
+        abort = (markings[:, aborted] == 1) & (executions == 0)
+        return clean & (commit | abort)
+
+    return is_final
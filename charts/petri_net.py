@@ -0,0 +1,615 @@
+"""
+Petri net models of the 3PS protocol family
+Streams PNML files (WoPeD and PNML 2009 grammar) with iterparse, flattens
+subprocess pages into one net and compiles places and transitions into
+dense integer indices with NumPy arc arrays and pre/post incidence
+matrices. 3PS toolspecific metadata (ttl, expirationBehavior, guard,
+timeout, multiset, broadcast, ...) is kept per place, transition and arc,
+and WoPeD timing (time, timeUnit, probability) per transition.
+"""
+
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+# Toolspecific blocks that carry protocol metadata
+METADATA_TOOL = '3PS'
+
+# Arc types; 'normal' arcs consume/produce, 'test' arcs only check tokens
+ARC_TYPES = ('normal', 'test', 'inhibitor')
+
+# WoPeD transition settings used for timed simulation
+WOPED_TIMING = ('time', 'timeUnit', 'probability')
+
+# Namespaced tag -> local name; PNML files only use a handful of tags
+_LOCAL_TAGS = {}
+
+def _local(tag):
+    """Strip the XML namespace from a tag."""
+    local = _LOCAL_TAGS.get(tag)
+    if local is None:
+        if not isinstance(tag, str):
+            return None  # comments and processing instructions
+        local = _LOCAL_TAGS[tag] = tag.rsplit('}', 1)[-1]
+    return local
+
+def _child(elem, name):
+    """Get the first child of elem with the given local name."""
+    for child in elem:
+        if _local(child.tag) == name:
+            return child
+    return None
+
+def _children(elem):
+    """
+    Index an element's children in one pass.
+
+    Returns:
+        tuple: (local name -> first child, list of <toolspecific> children)
+    """
+    first = {}
+    tools = []
+    for child in elem:
+        tag = _local(child.tag)
+        if tag == 'toolspecific':
+            tools.append(child)
+        elif tag not in first:
+            first[tag] = child
+    return first, tools
+
+def _label_text(label):
+    """Get the stripped <text> of a label element (e.g. <name>), or None."""
+    if label is None:
+        return None
+    text = _child(label, 'text')
+    if text is None or text.text is None:
+        return None
+    return text.text.strip()
+
+def _convert(value):
+    """Convert a metadata string to bool, int or float where it looks like one."""
+    lowered = value.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+def parse_metadata(elem):
+    """
+    Convert a toolspecific subtree into plain Python data.
+
+    Leaves become their (converted) text, or True when empty; attributes
+    become keys; repeated children become lists.
+
+    Args:
+        elem: XML element
+
+    Returns:
+        Parsed value (dict, list, str, int, float or bool)
+    """
+    children = list(elem)
+    text = (elem.text or '').strip()
+    if not children:
+        if elem.attrib:
+            data = {key: _convert(value) for key, value in elem.attrib.items()}
+            if text:
+                data['text'] = _convert(text)
+            return data
+        return _convert(text) if text else True
+
+    data = {key: _convert(value) for key, value in elem.attrib.items()}
+    for child in children:
+        key = _local(child.tag)
+        if key is None:
+            continue
+        value = parse_metadata(child)
+        if key in data:
+            if not isinstance(data[key], list):
+                data[key] = [data[key]]
+            data[key].append(value)
+        else:
+            data[key] = value
+    return data
+
+def _tool_metadata(tools, tool=METADATA_TOOL):
+    """Merge the <toolspecific tool=...> blocks among tools into one dict."""
+    metadata = {}
+    for block in tools:
+        if block.get('tool') == tool:
+            parsed = parse_metadata(block)
+            if isinstance(parsed, dict):
+                parsed.pop('tool', None)
+                parsed.pop('version', None)
+                metadata.update(parsed)
+    return metadata
+
+def _is_subprocess(tools):
+    """Whether toolspecific blocks mark a WoPeD substitution transition."""
+    for block in tools:
+        if block.get('tool') == 'WoPeD':
+            flag = _child(block, 'subprocess')
+            if flag is not None and (flag.text or '').strip().lower() == 'true':
+                return True
+    return False
+
+def _woped_timing(tools):
+    """Get the WoPeD <time>, <timeUnit> and <probability> of a transition."""
+    timing = {}
+    for block in tools:
+        if block.get('tool') == 'WoPeD':
+            for key in WOPED_TIMING:
+                value = _child(block, key)
+                if value is not None and (value.text or '').strip():
+                    timing[key] = _convert(value.text.strip())
+    return timing
+
+def parse_inscription(text):
+    """
+    Parse an arc inscription.
+
+    Args:
+        text: Inscription text, or None when the arc has none
+
+    Returns:
+        tuple: (weight, symbol); symbolic inscriptions such as 'amount'
+               get weight 1 and keep their text as symbol
+    """
+    if text is None:
+        return 1, None
+    try:
+        return int(text), None
+    except ValueError:
+        return 1, text
+
+class PetriNet:
+    """
+    Compiled place/transition net.
+
+    Places and transitions are numbered 0..n-1 in document order. Arcs are
+    kept as parallel NumPy arrays grouped by transition (CSR style), which
+    scales to very large nets; the dense pre/post/incidence matrices
+    (places x transitions) are built on first use.
+    """
+
+    def __init__(self, net_id, places, transitions, arcs, metadata=None, replica_groups=None):
+        """
+        Compile a net from parsed nodes.
+
+        Args:
+            net_id: Net id from the PNML file
+            places: List of dicts with 'id', 'name', 'initial', 'page', 'metadata'
+            transitions: List of dicts with 'id', 'name', 'page', 'subprocess', 'metadata'
+                         and optionally 'timing' (WoPeD time, timeUnit, probability)
+            arcs: List of dicts with 'id', 'place', 'transition' (indices),
+                  'direction' ('in' = place->transition, 'out' = transition->place),
+                  'type', 'weight', 'symbol' and 'metadata'
+            metadata: Net-level 3PS metadata (colour sets, declarations)
+            replica_groups: (copies, places) index arrays of interchangeable
+                            place blocks, as made by replicate
+        """
+        self.id = net_id
+        self.metadata = metadata or {}
+        self.replica_groups = [np.asarray(group, dtype=np.intp) for group in replica_groups or []]
+
+        self.place_ids = [p['id'] for p in places]
+        self.place_names = [p['name'] for p in places]
+        self.place_pages = [p['page'] for p in places]
+        self.place_metadata = [p['metadata'] for p in places]
+        self.place_index = {pid: i for i, pid in enumerate(self.place_ids)}
+        self.initial_marking = np.array([p['initial'] for p in places], dtype=np.int64)
+
+        self.transition_ids = [t['id'] for t in transitions]
+        self.transition_names = [t['name'] for t in transitions]
+        self.transition_pages = [t['page'] for t in transitions]
+        self.transition_metadata = [t['metadata'] for t in transitions]
+        self.transition_timing = [t.get('timing', {}) for t in transitions]
+        self.subprocess = np.array([t['subprocess'] for t in transitions], dtype=bool)
+        self.transition_index = {tid: i for i, tid in enumerate(self.transition_ids)}
+
+        self.arc_ids = [a['id'] for a in arcs]
+        self.arc_place = np.array([a['place'] for a in arcs], dtype=np.int64)
+        self.arc_transition = np.array([a['transition'] for a in arcs], dtype=np.int64)
+        self.arc_weight = np.array([a['weight'] for a in arcs], dtype=np.int64)
+        self.arc_input = np.array([a['direction'] == 'in' for a in arcs], dtype=bool)
+        self.arc_type = np.array([ARC_TYPES.index(a['type']) for a in arcs], dtype=np.int8)
+        self.arc_symbols = {i: a['symbol'] for i, a in enumerate(arcs) if a['symbol'] is not None}
+        self.arc_metadata = {i: a['metadata'] for i, a in enumerate(arcs) if a['metadata']}
+
+        normal = self.arc_type == ARC_TYPES.index('normal')
+        self.pre_offsets, self.pre_places, self.pre_weights = self._group(normal & self.arc_input)
+        self.post_offsets, self.post_places, self.post_weights = self._group(normal & ~self.arc_input)
+        self.test_offsets, self.test_places, self.test_weights = self._group(
+            self.arc_type == ARC_TYPES.index('test'))
+        self.inhibitor_offsets, self.inhibitor_places, self.inhibitor_weights = self._group(
+            self.arc_type == ARC_TYPES.index('inhibitor'))
+
+        self._pre = None
+        self._post = None
+
+    def _group(self, mask):
+        """
+        Group selected arcs by transition, merging parallel arcs.
+
+        Returns:
+            tuple: (offsets of length n_transitions + 1, place indices, weights);
+                   transition t's arcs are [offsets[t]:offsets[t + 1]]
+        """
+        transitions = self.arc_transition[mask]
+        places = self.arc_place[mask]
+        weights = self.arc_weight[mask]
+
+        # Sum the weights of parallel arcs between the same place and transition
+        keys = transitions * max(self.n_places, 1) + places
+        unique, inverse = np.unique(keys, return_inverse=True)
+        merged = np.bincount(inverse.reshape(-1), weights=weights, minlength=len(unique))
+
+        group_transitions = unique // max(self.n_places, 1)
+        offsets = np.searchsorted(group_transitions, np.arange(self.n_transitions + 1))
+        return offsets, unique % max(self.n_places, 1), merged.astype(np.int64)
+
+    @property
+    def n_places(self):
+        return len(self.place_ids)
+
+    @property
+    def n_transitions(self):
+        return len(self.transition_ids)
+
+    def _dense(self, offsets, places, weights):
+        matrix = np.zeros((self.n_places, self.n_transitions), dtype=np.int64)
+        transitions = np.repeat(np.arange(self.n_transitions), np.diff(offsets))
+        matrix[places, transitions] = weights
+        return matrix
+
+    @property
+    def pre(self):
+        """Dense (places x transitions) matrix of tokens consumed by each transition."""
+        if self._pre is None:
+            self._pre = self._dense(self.pre_offsets, self.pre_places, self.pre_weights)
+        return self._pre
+
+    @property
+    def post(self):
+        """Dense (places x transitions) matrix of tokens produced by each transition."""
+        if self._post is None:
+            self._post = self._dense(self.post_offsets, self.post_places, self.post_weights)
+        return self._post
+
+    @property
+    def incidence(self):
+        """Dense incidence matrix C = post - pre (places x transitions)."""
+        return self.post - self.pre
+
+    def inputs(self, transition):
+        """Get (place indices, weights) consumed by a transition."""
+        start, end = self.pre_offsets[transition], self.pre_offsets[transition + 1]
+        return self.pre_places[start:end], self.pre_weights[start:end]
+
+    def outputs(self, transition):
+        """Get (place indices, weights) produced by a transition."""
+        start, end = self.post_offsets[transition], self.post_offsets[transition + 1]
+        return self.post_places[start:end], self.post_weights[start:end]
+
+    def _unsatisfied(self, marking, offsets, places, weights, inhibitor=False):
+        """Count, per transition, the arcs of a group that block firing."""
+        transitions = np.repeat(np.arange(self.n_transitions), np.diff(offsets))
+        tokens = marking[places]
+        blocked = tokens >= weights if inhibitor else tokens < weights
+        return np.bincount(transitions[blocked], minlength=self.n_transitions)
+
+    def enabled(self, marking):
+        """
+        Find the transitions enabled in a marking.
+
+        Args:
+            marking: Token count per place
+
+        Returns:
+            ndarray: Boolean mask over transitions
+        """
+        marking = np.asarray(marking)
+        blocked = self._unsatisfied(marking, self.pre_offsets, self.pre_places, self.pre_weights)
+        blocked += self._unsatisfied(marking, self.test_offsets, self.test_places, self.test_weights)
+        blocked += self._unsatisfied(marking, self.inhibitor_offsets, self.inhibitor_places,
+                                     self.inhibitor_weights, inhibitor=True)
+        return blocked == 0
+
+    def fire(self, marking, transition):
+        """
+        Fire a transition (the caller checks it is enabled).
+
+        Args:
+            marking: Token count per place
+            transition: Transition index
+
+        Returns:
+            ndarray: The new marking
+        """
+        marking = np.array(marking, dtype=np.int64)
+        places, weights = self.inputs(transition)
+        np.subtract.at(marking, places, weights)
+        places, weights = self.outputs(transition)
+        np.add.at(marking, places, weights)
+        return marking
+
+    def nodes(self):
+        """
+        Get the net in the form the constructor takes.
+
+        Returns:
+            tuple: (places, transitions, arcs) lists of dicts
+        """
+        places = [{'id': pid, 'name': name, 'initial': int(initial), 'page': page,
+                   'metadata': metadata}
+                  for pid, name, initial, page, metadata in zip(
+                      self.place_ids, self.place_names, self.initial_marking,
+                      self.place_pages, self.place_metadata)]
+        transitions = [{'id': tid, 'name': name, 'page': page, 'subprocess': bool(subprocess),
+                        'metadata': metadata, 'timing': timing}
+                       for tid, name, page, subprocess, metadata, timing in zip(
+                           self.transition_ids, self.transition_names, self.transition_pages,
+                           self.subprocess, self.transition_metadata, self.transition_timing)]
+        arcs = [{'id': arc_id,
+                 'place': int(self.arc_place[i]),
+                 'transition': int(self.arc_transition[i]),
+                 'direction': 'in' if self.arc_input[i] else 'out',
+                 'type': ARC_TYPES[self.arc_type[i]],
+                 'weight': int(self.arc_weight[i]),
+                 'symbol': self.arc_symbols.get(i),
+                 'metadata': self.arc_metadata.get(i, {})}
+                for i, arc_id in enumerate(self.arc_ids)]
+        return places, transitions, arcs
+
+    def place(self, place_id):
+        """Get the index of a place by id or name."""
+        if place_id in self.place_index:
+            return self.place_index[place_id]
+        return self.place_names.index(place_id)
+
+    def transition(self, transition_id):
+        """Get the index of a transition by id or name."""
+        if transition_id in self.transition_index:
+            return self.transition_index[transition_id]
+        return self.transition_names.index(transition_id)
+
+    def summary(self):
+        """
+        Describe the net's size.
+
+        Returns:
+            dict: Counts of places, transitions, arcs (by type), subprocess
+                  transitions, symbolic arcs and initial tokens
+        """
+        return {
+            'id': self.id,
+            'places': self.n_places,
+            'transitions': self.n_transitions,
+            'arcs': len(self.arc_ids),
+            'test_arcs': int((self.arc_type == ARC_TYPES.index('test')).sum()),
+            'inhibitor_arcs': int((self.arc_type == ARC_TYPES.index('inhibitor')).sum()),
+            'subprocess_transitions': int(self.subprocess.sum()),
+            'symbolic_arcs': len(self.arc_symbols),
+            'initial_tokens': int(self.initial_marking.sum())
+        }
+
+def load_pnml(path):
+    """
+    Stream a PNML file into a compiled PetriNet.
+
+    Pages are flattened: their places, transitions and arcs join the
+    top-level net, with each node remembering the page path it came from.
+    Substitution transitions (WoPeD <subprocess>) are kept as ordinary
+    transitions flagged in PetriNet.subprocess, and an arc joining two
+    transitions gets an implicit channel place between them. Node ids repeated on
+    different pages are qualified as 'page/id'; arcs resolve ids in their
+    own page first, then enclosing pages.
+
+    Args:
+        path: PNML file
+
+    Returns:
+        PetriNet: Compiled net
+    """
+    places, transitions, raw_arcs = [], [], []
+    scopes = {'': {}}
+    seen_ids = set()
+    net_metadata = {}
+    net_id = None
+
+    pages = []      # enclosing page ids
+    page = ''
+    local_tags = _LOCAL_TAGS
+
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        tag = local_tags.get(elem.tag)
+        if tag is None:
+            tag = _local(elem.tag)
+
+        if event == 'start':
+            if tag == 'page':
+                pages.append(elem.get('id', f'page{len(pages)}'))
+                page = '/'.join(pages)
+            elif tag == 'net' and net_id is None:
+                net_id = elem.get('id')
+            continue
+
+        if tag == 'arc':
+            labels, tools = _children(elem)
+            type_elem = labels.get('type')
+            arc_type = type_elem.get('value', 'normal') if type_elem is not None else 'normal'
+            if arc_type not in ARC_TYPES:
+                raise ValueError(f"Unsupported arc type '{arc_type}' in {path}")
+            weight, symbol = parse_inscription(_label_text(labels.get('inscription')))
+            raw_arcs.append({
+                'id': elem.get('id'),
+                'source': elem.get('source'),
+                'target': elem.get('target'),
+                'page': page,
+                'type': arc_type,
+                'weight': weight,
+                'symbol': symbol,
+                'metadata': _tool_metadata(tools)
+            })
+            elem.clear()
+
+        elif tag == 'place' or tag == 'transition':
+            node_id = elem.get('id')
+            global_id = node_id if node_id not in seen_ids else f'{page}/{node_id}'
+            if global_id in seen_ids:
+                raise ValueError(f"Duplicate node id '{node_id}' in {path}")
+            seen_ids.add(global_id)
+            scopes.setdefault(page, {})[node_id] = global_id
+
+            labels, tools = _children(elem)
+            node = {
+                'id': global_id,
+                'name': _label_text(labels.get('name')) or node_id,
+                'page': page,
+                'metadata': _tool_metadata(tools)
+            }
+            if tag == 'place':
+                initial = _label_text(labels.get('initialMarking'))
+                node['initial'] = int(initial) if initial else 0
+                places.append(node)
+            else:
+                node['subprocess'] = _is_subprocess(tools)
+                node['timing'] = _woped_timing(tools)
+                transitions.append(node)
+            elem.clear()
+
+        elif tag == 'net':
+            # Net-level declarations (colour sets etc.); nodes are already cleared
+            net_metadata.update(_tool_metadata(_children(elem)[1]))
+            elem.clear()
+
+        elif tag == 'page':
+            pages.pop()
+            page = '/'.join(pages)
+            elem.clear()
+
+    place_index = {p['id']: i for i, p in enumerate(places)}
+    transition_index = {t['id']: i for i, t in enumerate(transitions)}
+
+    arcs = []
+    for number, arc in enumerate(raw_arcs):
+        source = _resolve(scopes, arc['page'], arc['source'])
+        target = _resolve(scopes, arc['page'], arc['target'])
+        arc_id = arc['id'] or f'arc{number}'
+        if source in place_index and target in transition_index:
+            place, transition, direction = place_index[source], transition_index[target], 'in'
+        elif source in transition_index and target in place_index:
+            place, transition, direction = place_index[target], transition_index[source], 'out'
+        elif source in transition_index and target in transition_index and arc['type'] == 'normal':
+            # Abstract flows between (substitution) transitions become an
+            # implicit channel place carrying the arc's weight both ways
+            channel = {
+                'id': f'{arc_id}:{source}->{target}',
+                'name': f'{source} -> {target}',
+                'initial': 0,
+                'page': arc['page'],
+                'metadata': {'implicit': True}
+            }
+            place_index[channel['id']] = len(places)
+            places.append(channel)
+            place = place_index[channel['id']]
+            arcs.append(dict(arc, id=f'{arc_id}:out', place=place,
+                             transition=transition_index[source], direction='out'))
+            arcs.append(dict(arc, id=f'{arc_id}:in', place=place,
+                             transition=transition_index[target], direction='in'))
+            continue
+        else:
+            raise ValueError(f"Arc '{arc_id}' in {path} must join a place and a transition "
+                             f"({arc['source']} -> {arc['target']})")
+        if arc['type'] != 'normal' and direction != 'in':
+            raise ValueError(f"{arc['type'].capitalize()} arc '{arc_id}' in {path} "
+                             f"must go from a place to a transition")
+        arcs.append(dict(arc, id=arc_id, place=place, transition=transition, direction=direction))
+
+    return PetriNet(net_id, places, transitions, arcs, net_metadata)
+
+def _resolve(scopes, page, node_id):
+    """Resolve a node id from a page, searching enclosing pages outwards."""
+    while True:
+        scope = scopes.get(page, {})
+        if node_id in scope:
+            return scope[node_id]
+        if not page:
+            break
+        page = page.rpartition('/')[0]
+
+    # Cross-page references (e.g. a page arc to a top-level port)
+    for scope in scopes.values():
+        if node_id in scope:
+            return scope[node_id]
+    return node_id
+
+def _on_page(pages, page):
+    return np.array([p == page or p.startswith(page + '/') for p in pages], dtype=bool)
+
+def replicate(net, page, copies):
+    """
+    Replicate one page of a net (e.g. a participant service) into identical
+    copies. Arcs between the page and the rest of the net are repeated for
+    every copy, so shared places (message channels, resources) connect to
+    all of them. Copies of a node get ids and pages suffixed '#1'..'#copies'.
+
+    Args:
+        net: PetriNet
+        page: Page path whose places and transitions (sub-pages included)
+              are replicated
+        copies: Number of copies
+
+    Returns:
+        PetriNet: New net whose replica_groups gains the (copies, places)
+                  indices of the replicated places, one row per copy
+    """
+    if copies < 1:
+        raise ValueError("copies must be at least 1")
+    places, transitions, arcs = net.nodes()
+    page_places = _on_page(net.place_pages, page)
+    page_transitions = _on_page(net.transition_pages, page)
+    if not page_places.any() and not page_transitions.any():
+        raise KeyError(f"No page '{page}' in net '{net.id}'")
+    for group in net.replica_groups:
+        if page_places[group].any():
+            raise ValueError(f"Page '{page}' overlaps an existing replica group")
+
+    def copy_node(node, number):
+        return dict(node, id=f"{node['id']}#{number}", name=f"{node['name']} #{number}",
+                    page=f"{node['page']}#{number}")
+
+    # Shared nodes keep their order; copies follow, one block per copy
+    new_places = [p for p, replicated in zip(places, page_places) if not replicated]
+    new_transitions = [t for t, replicated in zip(transitions, page_transitions) if not replicated]
+    place_map = np.full((copies, net.n_places), -1, dtype=np.intp)
+    transition_map = np.full((copies, net.n_transitions), -1, dtype=np.intp)
+    place_map[:, ~page_places] = np.arange(len(new_places))
+    transition_map[:, ~page_transitions] = np.arange(len(new_transitions))
+
+    for number in range(copies):
+        for i in np.flatnonzero(page_places):
+            place_map[number, i] = len(new_places)
+            new_places.append(copy_node(places[i], number + 1))
+        for i in np.flatnonzero(page_transitions):
+            transition_map[number, i] = len(new_transitions)
+            new_transitions.append(copy_node(transitions[i], number + 1))
+
+    new_arcs = []
+    for arc in arcs:
+        place, transition = arc['place'], arc['transition']
+        if not page_places[place] and not page_transitions[transition]:
+            new_arcs.append(dict(arc, place=place_map[0, place],
+                                 transition=transition_map[0, transition]))
+            continue
+        for number in range(copies):
+            arc_id = f"{arc['id']}#{number + 1}" if arc['id'] is not None else None
+            new_arcs.append(dict(arc, id=arc_id, place=place_map[number, place],
+                                 transition=transition_map[number, transition]))
+
+    groups = [place_map[0][group] for group in net.replica_groups]
+    groups.append(place_map[:, page_places])
+    return PetriNet(net.id, new_places, new_transitions, new_arcs, net.metadata, groups)
@@ -0,0 +1,892 @@
+"""
+Reachability-graph exploration of compiled Petri nets
+Markings are packed into fixed-width uint64 words (one bit field per place,
+sized by the place's bound) and kept in an open-addressing hash table of
+packed rows, so a state costs a few bytes rather than a dict. The frontier
+is expanded breadth-first, one level at a time, in chunks that can be
+spread over a process pool; every chunk is fired with whole-array NumPy
+operations. Exploration reports deadlocks, place-bound violations and
+states/sec.
+
+Usage:
+    python petri_reachability.py net.pnml [--replicate PAGE=N ...] [--marking PLACE=N ...]
+                                          [--bound PLACE=N ...]
+                                          [--final PLACE=N[,PLACE=N...] ...]
+                                          [--stubborn] [--symmetry] [--compare]
+                                          [--workers N] [--max-states N]
+    python petri_reachability.py 3ps+qm:9 --stubborn --symmetry
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from petri_net import load_pnml, replicate
+
+# Markings expanded per chunk (bounds the chunk x transitions arrays)
+DEFAULT_CHUNK_SIZE = 4096
+
+# Hash table load factor that triggers doubling
+MAX_LOAD = 0.5
+
+# Example markings kept per finding
+MAX_EXAMPLES = 10
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_SEED = np.uint64(0xCBF29CE484222325)
+
+class MarkingCodec:
+    """
+    Packs markings into rows of uint64 words. Each place gets a bit field
+    wide enough for its bound; fields never straddle a word.
+    """
+
+    def __init__(self, bounds):
+        """
+        Args:
+            bounds: Largest token count each place may hold
+        """
+        self.bounds = np.asarray(bounds, dtype=np.int64)
+        if (self.bounds < 0).any():
+            raise ValueError("Place bounds must be non-negative")
+        bits = np.array([max(1, int(b).bit_length()) for b in self.bounds], dtype=np.int64)
+        if (bits > 63).any():
+            raise ValueError("Place bounds must fit in 63 bits")
+
+        word_of, shift_of = [], []
+        word, shift = 0, 0
+        for width in bits:
+            if shift + width > 64:
+                word, shift = word + 1, 0
+            word_of.append(word)
+            shift_of.append(shift)
+            shift += width
+
+        self.words = word + 1 if len(bits) else 1
+        self.place_word = np.array(word_of, dtype=np.intp)
+        self.place_shift = np.array(shift_of, dtype=np.uint64)
+        self.place_mask = (np.uint64(1) << bits.astype(np.uint64)) - np.uint64(1)
+
+    @property
+    def bytes_per_state(self):
+        return 8 * self.words
+
+    def pack(self, markings):
+        """
+        Pack markings (which must be within bounds).
+
+        Packing is linear while every field stays in range, so packed
+        token changes (negative counts included) can be added to packed
+        markings directly; uint64 arithmetic wraps the borrows away.
+
+        Args:
+            markings: (k, places) token counts, or token changes
+
+        Returns:
+            ndarray: (k, words) uint64
+        """
+        markings = np.asarray(markings, dtype=np.int64).reshape(-1, len(self.bounds))
+        fields = markings.astype(np.uint64) << self.place_shift
+        packed = np.zeros((len(markings), self.words), dtype=np.uint64)
+        for word in range(self.words):
+            # Fields are disjoint, so summing them is the same as OR-ing
+            packed[:, word] = fields[:, self.place_word == word].sum(axis=1, dtype=np.uint64)
+        return packed
+
+    def unpack(self, packed):
+        """
+        Unpack rows produced by pack.
+
+        Args:
+            packed: (k, words) uint64
+
+        Returns:
+            ndarray: (k, places) int64 token counts
+        """
+        packed = np.asarray(packed, dtype=np.uint64).reshape(-1, self.words)
+        fields = (packed[:, self.place_word] >> self.place_shift) & self.place_mask
+        return fields.astype(np.int64)
+
+class MarkingSet:
+    """
+    Hash set of packed markings: an open-addressing table (linear probing)
+    over a (capacity, words) uint64 array, inserted a batch at a time.
+    """
+
+    def __init__(self, words, capacity=1 << 16):
+        """
+        Args:
+            words: Words per packed marking
+            capacity: Initial number of slots (rounded up to a power of two)
+        """
+        self.words = words
+        capacity = 1 << max(4, int(capacity - 1).bit_length())
+        self._keys = np.zeros((capacity, words), dtype=np.uint64)
+        self._used = np.zeros(capacity, dtype=bool)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return self._keys.nbytes + self._used.nbytes
+
+    def _hash(self, keys):
+        h = np.full(len(keys), _SEED, dtype=np.uint64)
+        for word in range(self.words):
+            h ^= keys[:, word]
+            h *= _MIX
+            h ^= h >> np.uint64(29)
+        return h
+
+    def _slots(self, keys):
+        return (self._hash(keys) & np.uint64(len(self._used) - 1)).astype(np.intp)
+
+    def _probe(self, keys, insert):
+        """
+        Look up (and optionally insert) keys.
+
+        Returns:
+            ndarray: Boolean mask of keys that were not in the table
+        """
+        mask = len(self._used) - 1
+        slots = self._slots(keys)
+        missing = np.zeros(len(keys), dtype=bool)
+        pending = np.arange(len(keys))
+
+        while len(pending):
+            s = slots[pending]
+            used = self._used[s]
+
+            # Occupied slots: stop on a match, otherwise probe the next slot
+            occupied = pending[used]
+            same = (self._keys[s[used]] == keys[occupied]).all(axis=1)
+            collided = occupied[~same]
+            slots[collided] = (slots[collided] + 1) & mask
+
+            free = pending[~used]
+            if not insert:
+                missing[free] = True
+                pending = collided
+                continue
+
+            # Free slots: the first key wanting each slot takes it; the rest
+            # retry the same (now occupied) slot
+            claimed, first = np.unique(s[~used], return_index=True)
+            winners = free[first]
+            self._keys[claimed] = keys[winners]
+            self._used[claimed] = True
+            missing[winners] = True
+            losers = np.setdiff1d(free, winners, assume_unique=True)
+            pending = np.concatenate([collided, losers])
+
+        return missing
+
+    def _grow(self, needed):
+        capacity = len(self._used)
+        while needed > capacity * MAX_LOAD:
+            capacity *= 2
+        if capacity == len(self._used):
+            return
+        keys = self._keys[self._used]
+        self._keys = np.zeros((capacity, self.words), dtype=np.uint64)
+        self._used = np.zeros(capacity, dtype=bool)
+        self._probe(keys, insert=True)
+
+    def add(self, keys):
+        """
+        Insert packed markings.
+
+        Args:
+            keys: (k, words) uint64
+
+        Returns:
+            ndarray: Boolean mask of rows that were new (the first of any
+                     duplicates within keys counts as new)
+        """
+        keys = np.ascontiguousarray(keys, dtype=np.uint64).reshape(-1, self.words)
+        self._grow(self._size + len(keys))
+
+        # Equal keys race for the same free slot; the losers then find the
+        # winner there, so duplicates within keys need no separate pass
+        new = self._probe(keys, insert=True)
+        self._size += int(new.sum())
+        return new
+
+    def contains(self, keys):
+        """
+        Check packed markings for membership.
+
+        Args:
+            keys: (k, words) uint64
+
+        Returns:
+            ndarray: Boolean mask
+        """
+        keys = np.ascontiguousarray(keys, dtype=np.uint64).reshape(-1, self.words)
+        return ~self._probe(keys, insert=False)
+
+    def to_array(self):
+        """Get every packed marking in the set, as a (len, words) array."""
+        return self._keys[self._used].copy()
+
+def _any_by_transition(flags, offsets):
+    """
+    Reduce per-arc flags to per-transition 'any', for arcs grouped by
+    transition (CSR offsets), from differences of a running count.
+
+    Args:
+        flags: (k, arcs) boolean
+        offsets: Group offsets, length transitions + 1
+
+    Returns:
+        ndarray: (k, transitions) boolean
+    """
+    counts = np.zeros((len(flags), flags.shape[1] + 1), dtype=np.int32)
+    np.cumsum(flags, axis=1, out=counts[:, 1:])
+    return counts[:, offsets[1:]] != counts[:, offsets[:-1]]
+
+def _canonicalize(markings, groups):
+    """
+    Sort the interchangeable place blocks of each replica group, in place,
+    so symmetric markings become identical.
+
+    Args:
+        markings: (k, places) token counts
+        groups: List of (copies, places) index arrays
+    """
+    k = len(markings)
+    for group in groups:
+        copies, width = group.shape
+        blocks = markings[:, group].reshape(k * copies, width)
+        owner = np.repeat(np.arange(k), copies)
+
+        # Owner first, then the block's own tokens, place by place
+        order = np.lexsort(tuple(blocks[:, j] for j in reversed(range(width))) + (owner,))
+        markings[:, group.reshape(-1)] = blocks[order].reshape(k, copies * width)
+
+class Expander:
+    """
+    Vectorized successor generation for a compiled net. Picklable, so it
+    can be shipped to worker processes once.
+
+    Two optional reductions shrink the explored graph while keeping every
+    reachable dead marking (so deadlock checks stay exact; bound checks
+    only see the states that are explored):
+    - stubborn sets: each marking fires only the enabled transitions of a
+      stubborn set instead of all of them (partial-order reduction). A
+      marking is fully expanded when its set holds a self-loop or a
+      transition adding tokens to a visible place, and explore fully
+      expands markings whose stubborn successors were all visited before,
+      so no transition is ignored along a cycle
+    - symmetry: markings are canonicalized by sorting the blocks of each
+      of the net's replica groups, so permuted participants are one state
+    """
+
+    def __init__(self, net, codec, stubborn=False, symmetry=False, visible=()):
+        """
+        Args:
+            net: PetriNet
+            codec: MarkingCodec for the exploration
+            stubborn: Fire stubborn sets only (default: False)
+            symmetry: Merge markings that differ by a permutation of
+                      net.replica_groups (default: False)
+            visible: Place indices whose bounds are checked; stubborn sets
+                     firing a transition that adds tokens to one are
+                     fully expanded
+        """
+        self.codec = codec
+        self.stubborn = stubborn
+        self.groups = net.replica_groups if symmetry else []
+        self.bounds = codec.bounds
+        self.delta = net.incidence.T.copy()     # transitions x places
+        self.packed_delta = codec.pack(self.delta)
+
+        # Every arc that can disable a transition, grouped by transition
+        groups = [(net.pre_offsets, net.pre_places, net.pre_weights, False),
+                  (net.test_offsets, net.test_places, net.test_weights, False),
+                  (net.inhibitor_offsets, net.inhibitor_places, net.inhibitor_weights, True)]
+        transitions, places, weights, inhibitor = [], [], [], []
+        for offsets, group_places, group_weights, is_inhibitor in groups:
+            transitions.append(np.repeat(np.arange(net.n_transitions), np.diff(offsets)))
+            places.append(group_places)
+            weights.append(group_weights)
+            inhibitor.append(np.full(len(group_places), is_inhibitor))
+        transitions = np.concatenate(transitions)
+        order = np.argsort(transitions, kind='stable')
+        self.guard_places = np.concatenate(places)[order]
+        self.guard_weights = np.concatenate(weights)[order]
+        self.guard_inhibitor = np.concatenate(inhibitor)[order]
+        self.guard_offsets = np.searchsorted(transitions[order], np.arange(net.n_transitions + 1))
+
+        # Net token gains, grouped by transition: firing overflows a place
+        # when the gain exceeds the place's headroom
+        gain_transitions, gain_places = np.nonzero(self.delta > 0)
+        self.gain_places = gain_places
+        self.gain_tokens = self.delta[gain_transitions, gain_places]
+        self.gain_offsets = np.searchsorted(gain_transitions, np.arange(net.n_transitions + 1))
+
+        if stubborn:
+            self._build_dependencies(net)
+            # Transitions that force full expansion: self-loops (firing them
+            # leaves the marking unchanged) and gains on visible places
+            visible = np.asarray(visible, dtype=np.intp)
+            self.proviso = ((self.delta == 0).all(axis=1)
+                            | (self.delta[:, visible] > 0).any(axis=1))
+
+    def _build_dependencies(self, net):
+        """Precompute the transition dependencies stubborn sets are closed under."""
+        n_places = net.n_places
+        consume = (net.pre > 0).T                       # transitions x places
+        produce = (net.post > 0).T
+        test = np.zeros_like(consume)
+        test[np.repeat(np.arange(net.n_transitions), np.diff(net.test_offsets)),
+             net.test_places] = True
+        inhibit = np.zeros_like(consume)
+        inhibit[np.repeat(np.arange(net.n_transitions), np.diff(net.inhibitor_offsets)),
+                net.inhibitor_places] = True
+
+        def shares(a, b):
+            return (a.astype(np.int32) @ b.T.astype(np.int32)) > 0
+
+        # An enabled stubborn transition pulls in every transition that can
+        # disable it or that it can disable
+        self.conflicts = (shares(consume | test, consume) | shares(inhibit, produce) |
+                          shares(consume, test) | shares(produce, inhibit))
+        np.fill_diagonal(self.conflicts, True)
+        self.conflict_counts = self.conflicts.sum(axis=1)
+
+        # A disabled one pulls in the transitions that can lift its first
+        # blocking arc: producers for a short input, consumers for an inhibitor
+        increases = self.delta > 0
+        decreases = self.delta < 0
+        helpers = np.where(self.guard_inhibitor[:, None], decreases[:, self.guard_places].T,
+                           increases[:, self.guard_places].T)
+        # Row len(guard_places) stands for "no blocking arc"
+        self.guard_helpers = np.vstack([helpers, np.zeros((1, net.n_transitions), dtype=bool)])
+
+    def enabled(self, markings):
+        """
+        Find the enabled transitions of many markings at once.
+
+        Args:
+            markings: (k, places) token counts
+
+        Returns:
+            ndarray: (k, transitions) boolean
+        """
+        return ~_any_by_transition(self._blocked(markings), self.guard_offsets)
+
+    def _blocked(self, markings):
+        """Find the guard arcs each marking does not satisfy, (k, guard arcs)."""
+        tokens = markings[:, self.guard_places]
+        return np.where(self.guard_inhibitor, tokens >= self.guard_weights,
+                        tokens < self.guard_weights)
+
+    def stubborn_sets(self, markings):
+        """
+        Choose the transitions to fire under partial-order reduction.
+
+        Each set starts from the enabled transition with the fewest static
+        conflicts and is closed under: enabled members add every transition
+        they conflict with; disabled members add the transitions that can
+        lift their first blocking arc. Firing only its enabled members
+        preserves all reachable dead markings.
+
+        Args:
+            markings: (k, places) token counts
+
+        Returns:
+            tuple: ((k, transitions) enabled mask, (k, transitions) mask of
+                   the enabled stubborn transitions)
+        """
+        blocked = self._blocked(markings)
+        enabled = ~_any_by_transition(blocked, self.guard_offsets)
+        k, n_transitions = enabled.shape
+        if not len(self.guard_places):
+            return enabled, enabled
+
+        # Index of each transition's first blocking arc; a trailing "none"
+        # column keeps reduceat in range for transitions without guard arcs
+        none = len(self.guard_places)
+        arc = np.where(blocked, np.arange(none), none)
+        arc = np.hstack([arc, np.full((k, 1), none)])
+        first_blocking = np.minimum.reduceat(arc, self.guard_offsets[:-1], axis=1)
+        first_blocking[enabled] = none
+        dependencies = np.where(enabled[:, :, None], self.conflicts[None],
+                                self.guard_helpers[first_blocking])
+
+        score = np.where(enabled, self.conflict_counts, np.iinfo(np.int64).max)
+        seed = score.argmin(axis=1)
+        members = np.zeros((k, n_transitions), dtype=bool)
+        members[np.arange(k), seed] = enabled.any(axis=1)
+
+        while True:
+            grown = members | (members[:, :, None] & dependencies).any(axis=1)
+            if (grown == members).all():
+                return enabled, members & enabled
+            members = grown
+
+    def overflows(self, markings):
+        """
+        Find the transitions whose firing would exceed a place bound.
+
+        Args:
+            markings: (k, places) token counts
+
+        Returns:
+            ndarray: (k, transitions) boolean
+        """
+        headroom = self.bounds[self.gain_places] - markings[:, self.gain_places]
+        return _any_by_transition(headroom < self.gain_tokens, self.gain_offsets)
+
+    def expand(self, packed, rest=False):
+        """
+        Fire the enabled (or stubborn) transitions of a chunk of markings.
+
+        Args:
+            packed: (k, words) packed markings
+            rest: Fire the enabled transitions the stubborn sets left out
+                  instead, completing the expansion of these markings
+
+        Returns:
+            dict: 'successors' (packed markings within bounds), 'sources'
+                  (row in packed of each successor), 'reduced' (rows that
+                  fired fewer transitions than were enabled), 'edges'
+                  (transitions fired), 'enabled' (transitions enabled),
+                  'dead' (packed markings with nothing enabled) and
+                  'violations' (unpacked successors exceeding a bound)
+        """
+        markings = self.codec.unpack(packed)
+        if self.stubborn:
+            enabled, fired = self.stubborn_sets(markings)
+            full = (fired & self.proviso).any(axis=1)
+            fired[full] = enabled[full]
+            if rest:
+                fired = enabled & ~fired
+        else:
+            enabled = fired = self.enabled(markings)
+
+        rows, transitions = np.nonzero(fired)
+        over = self.overflows(markings)[rows, transitions]
+
+        if self.groups:
+            successors = markings[rows[~over]] + self.delta[transitions[~over]]
+            _canonicalize(successors, self.groups)
+            successors = self.codec.pack(successors)
+        else:
+            successors = packed[rows[~over]] + self.packed_delta[transitions[~over]]
+
+        return {
+            'successors': successors,
+            'sources': rows[~over],
+            'reduced': (fired != enabled).any(axis=1),
+            'edges': len(rows),
+            'enabled': 0 if rest else int(enabled.sum()),
+            'dead': packed[:0] if rest else packed[~enabled.any(axis=1)],
+            'violations': markings[rows[over]] + self.delta[transitions[over]]
+        }
+
+    def canonical(self, markings):
+        """
+        Get the representatives explored for some markings.
+
+        Args:
+            markings: (k, places) token counts
+
+        Returns:
+            ndarray: Canonicalized copy (unchanged without symmetry)
+        """
+        markings = np.array(markings, dtype=np.int64).reshape(-1, len(self.bounds))
+        _canonicalize(markings, self.groups)
+        return markings
+
+# Set by init_worker in each worker process
+_expander = None
+
+def init_worker(expander):
+    """Process pool initializer: keep the expander for expand_chunk."""
+    global _expander
+    _expander = expander
+
+def expand_chunk(packed):
+    """
+    Expand a chunk of packed markings in a worker process, dropping
+    duplicate successors before they are sent back.
+    """
+    result = _expander.expand(packed)
+    successors = result['successors']
+    seen = MarkingSet(successors.shape[1], capacity=2 * len(successors))
+    unique = seen.add(successors)
+    result['successors'] = successors[unique]
+    result['sources'] = result['sources'][unique]
+    return result
+
+def resolve_places(net, values):
+    """
+    Map place ids or names to indices.
+
+    Args:
+        net: PetriNet
+        values: Dict of place id or name -> value
+
+    Returns:
+        dict: Place index -> value
+    """
+    resolved = {}
+    for place, value in values.items():
+        try:
+            resolved[net.place(place)] = value
+        except ValueError:
+            raise KeyError(f"Unknown place '{place}' in net '{net.id}'") from None
+    return resolved
+
+def initial_marking(net, overrides=None):
+    """
+    Get a net's initial marking, with some places overridden.
+
+    Args:
+        net: PetriNet
+        overrides: Dict of place id or name -> tokens (e.g. {'AVAILABLE': 100})
+
+    Returns:
+        ndarray: Token count per place
+    """
+    marking = net.initial_marking.copy()
+    for place, tokens in resolve_places(net, overrides or {}).items():
+        marking[place] = tokens
+    return marking
+
+def place_bounds(net, marking, bounds=None):
+    """
+    Get the bound checked for every place.
+
+    Args:
+        net: PetriNet
+        marking: Initial marking
+        bounds: Int applied to every place, or dict of place id or name ->
+                bound (default for unlisted places: the initial token total,
+                which a conservative net can never exceed)
+
+    Returns:
+        ndarray: Bound per place
+    """
+    default = max(int(np.sum(marking)), 1)
+    if bounds is None or isinstance(bounds, dict):
+        result = np.full(net.n_places, default, dtype=np.int64)
+        for place, bound in resolve_places(net, bounds or {}).items():
+            result[place] = bound
+    else:
+        result = np.full(net.n_places, int(bounds), dtype=np.int64)
+
+    over = np.flatnonzero(np.asarray(marking) > result)
+    if len(over):
+        names = ', '.join(net.place_names[p] for p in over)
+        raise ValueError(f"Initial marking exceeds the bound of: {names}")
+    return result
+
+def final_condition(net, specs):
+    """
+    Build a predicate accepting properly terminated markings.
+
+    Args:
+        net: PetriNet
+        specs: List of dicts of place id or name -> exact token count; a
+               marking is final if it matches any of them
+
+    Returns:
+        callable: (k, places) markings -> boolean mask
+    """
+    conditions = []
+    for spec in specs:
+        resolved = resolve_places(net, spec)
+        conditions.append((np.array(list(resolved), dtype=np.intp),
+                           np.array(list(resolved.values()), dtype=np.int64)))
+
+    def is_final(markings):
+        accepted = np.zeros(len(markings), dtype=bool)
+        for places, tokens in conditions:
+            accepted |= (markings[:, places] == tokens).all(axis=1)
+        return accepted
+
+    return is_final
+
+def describe_marking(net, marking):
+    """
+    Get the marked places of a marking.
+
+    Returns:
+        dict: Place name -> tokens, for places holding tokens
+    """
+    return {net.place_names[p]: int(marking[p]) for p in np.flatnonzero(marking)}
+
+def explore(net, marking=None, bounds=None, final=None, workers=1,
+            chunk_size=DEFAULT_CHUNK_SIZE, max_states=None, stubborn=False, symmetry=False):
+    """
+    Explore the reachability graph breadth-first.
+
+    Args:
+        net: PetriNet
+        marking: Initial marking (default: the net's)
+        bounds: Place bounds, see place_bounds
+        final: Predicate on (k, places) markings accepting proper terminal
+               states; other dead markings are reported as deadlocks
+               (default: every dead marking is a deadlock)
+        workers: Worker processes; 1 expands in this process
+        chunk_size: Markings per expansion task
+        max_states: Stop once this many states have been found (default: no limit)
+        stubborn: Partial-order reduction with stubborn sets (default: False);
+                  keeps dead markings and violations of the bounds passed
+                  in bounds
+        symmetry: Merge markings equal up to permuting net.replica_groups,
+                  e.g. the participants of a replicated net (default: False).
+                  The final predicate must be symmetric too.
+
+    Returns:
+        dict: 'states', 'edges', 'enabled', 'levels', 'complete',
+              'deadlocks', 'terminal', 'bound_violations' (place name ->
+              count), the first few examples of each, 'bytes_per_state',
+              'table_bytes', 'seconds' and 'states_per_second'
+    """
+    start = time.perf_counter()
+    if marking is None:
+        marking = net.initial_marking
+    marking = np.asarray(marking, dtype=np.int64)
+
+    codec = MarkingCodec(place_bounds(net, marking, bounds))
+    # Stubborn sets preserve the bound checks asked for explicitly
+    visible = (list(resolve_places(net, bounds)) if isinstance(bounds, dict)
+               else [] if bounds is None else range(net.n_places))
+    expander = Expander(net, codec, stubborn=stubborn, symmetry=symmetry, visible=visible)
+    visited = MarkingSet(codec.words)
+
+    frontier = codec.pack(expander.canonical(marking))
+    visited.add(frontier)
+
+    report = {
+        'states': 1,
+        'edges': 0,
+        'enabled': 0,
+        'levels': 0,
+        'stubborn': stubborn,
+        'symmetry': symmetry,
+        'complete': True,
+        'deadlocks': 0,
+        'terminal': 0,
+        'bound_violations': {},
+        'deadlock_examples': [],
+        'violation_examples': []
+    }
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                   initargs=(expander,))
+    try:
+        while len(frontier):
+            chunks = [frontier[i:i + chunk_size] for i in range(0, len(frontier), chunk_size)]
+            if pool is not None:
+                results = pool.map(expand_chunk, chunks)
+            else:
+                results = map(expander.expand, chunks)
+
+            next_frontier = []
+            for chunk, result in zip(chunks, results):
+                report['edges'] += result['edges']
+                report['enabled'] += result['enabled']
+                _record_dead(net, codec, result['dead'], final, report)
+                _record_violations(net, codec, result['violations'], report)
+
+                successors = result['successors']
+                new = visited.add(successors)
+                next_frontier.append(successors[new])
+
+                # Ignoring proviso: a reduced marking none of whose
+                # successors is new may close a cycle, so expand it fully
+                if stubborn:
+                    fresh = np.bincount(result['sources'][new], minlength=len(chunk)) > 0
+                    ignored = chunk[result['reduced'] & ~fresh]
+                    if len(ignored):
+                        rest = expander.expand(ignored, rest=True)
+                        report['edges'] += rest['edges']
+                        _record_violations(net, codec, rest['violations'], report)
+                        successors = rest['successors']
+                        next_frontier.append(successors[visited.add(successors)])
+
+            report['levels'] += 1
+            frontier = (np.concatenate(next_frontier) if next_frontier
+                        else np.zeros((0, codec.words), dtype=np.uint64))
+            report['states'] = len(visited)
+            if max_states is not None and len(visited) >= max_states and len(frontier):
+                report['complete'] = False
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    seconds = time.perf_counter() - start
+    report.update({
+        'bytes_per_state': codec.bytes_per_state,
+        'table_bytes': visited.nbytes,
+        'seconds': seconds,
+        'states_per_second': report['states'] / seconds if seconds > 0 else float('inf')
+    })
+    return report
+
+def reduction_ratio(full, reduced):
+    """
+    Compare a reduced exploration with a full one.
+
+    Args:
+        full: Report of an unreduced explore
+        reduced: Report of an explore of the same net with reductions
+
+    Returns:
+        dict: 'states' and 'edges' ratios (full / reduced) and 'speedup'
+    """
+    return {
+        'states': full['states'] / reduced['states'],
+        'edges': full['edges'] / max(reduced['edges'], 1),
+        'speedup': full['seconds'] / reduced['seconds'] if reduced['seconds'] > 0 else float('inf')
+    }
+
+def _record_dead(net, codec, dead, final, report):
+    if not len(dead):
+        return
+    markings = codec.unpack(dead)
+    if final is not None:
+        proper = final(markings)
+        report['terminal'] += int(proper.sum())
+        markings = markings[~proper]
+    report['deadlocks'] += len(markings)
+    room = MAX_EXAMPLES - len(report['deadlock_examples'])
+    report['deadlock_examples'].extend(describe_marking(net, m) for m in markings[:room])
+
+def _record_violations(net, codec, violations, report):
+    if not len(violations):
+        return
+    over = violations > codec.bounds
+    for place in np.flatnonzero(over.any(axis=0)):
+        name = net.place_names[place]
+        report['bound_violations'][name] = (report['bound_violations'].get(name, 0)
+                                            + int(over[:, place].sum()))
+    room = MAX_EXAMPLES - len(report['violation_examples'])
+    report['violation_examples'].extend(describe_marking(net, m) for m in violations[:room])
+
+def parse_assignments(values):
+    """Parse 'NAME=N[,NAME=N...]' command-line values (places or pages) into a dict."""
+    result = {}
+    for value in values:
+        for item in value.split(','):
+            place, _, tokens = item.rpartition('=')
+            if not place:
+                raise argparse.ArgumentTypeError(f"Expected NAME=N, got '{item}'")
+            result[place.strip()] = int(tokens)
+    return result
+
+def load_net(spec):
+    """
+    Load a net from the command line: a PNML file, or a generated model
+    '3ps:N' / '3ps+qm:N' (N participants, majority quorum for QM).
+
+    Returns:
+        tuple: (PetriNet, default final predicate or None)
+    """
+    from petri_models import three_phase_net, three_phase_final, majority_quorum
+
+    model, _, participants = spec.lower().partition(':')
+    if model in ('3ps', '3ps+qm') and participants.isdigit():
+        n = int(participants)
+        net = three_phase_net(n, majority_quorum(n) if model == '3ps+qm' else None)
+        return net, three_phase_final(net)
+    return load_pnml(spec), None
+
+def print_report(net, report):
+    """Print an exploration report."""
+    status = 'complete' if report['complete'] else 'truncated'
+    reductions = [name for name in ('stubborn', 'symmetry') if report[name]]
+    print(f"{net.id}: {report['states']} states, {report['edges']} edges, "
+          f"{report['levels']} levels ({status}"
+          f"{', ' + ' + '.join(reductions) if reductions else ''})")
+    print(f"{report['seconds']:.2f}s, {report['states_per_second']:,.0f} states/s, "
+          f"{report['bytes_per_state']} bytes/state packed, "
+          f"{report['table_bytes'] / 1e6:.1f} MB table")
+    if report['stubborn'] and report['enabled']:
+        print(f"fired {report['edges']} of {report['enabled']} enabled transitions "
+              f"({report['edges'] / report['enabled']:.1%})")
+    print(f"proper terminal states: {report['terminal']}")
+    print(f"deadlocks: {report['deadlocks']}")
+    for example in report['deadlock_examples']:
+        print(f"  {example}")
+    for name, count in report['bound_violations'].items():
+        print(f"bound exceeded: {name} ({count} successors)")
+    for example in report['violation_examples']:
+        print(f"  {example}")
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Explore the reachability graph of a PNML net")
+    parser.add_argument('net', help="PNML file, or a generated model: 3ps:N or 3ps+qm:N")
+    parser.add_argument('--replicate', action='append', default=[], metavar='PAGE=N',
+                        help="Replicate a page (participant) N times (repeatable)")
+    parser.add_argument('--marking', action='append', default=[], metavar='PLACE=N',
+                        help="Override a place's initial marking (repeatable)")
+    parser.add_argument('--bound', action='append', default=[], metavar='PLACE=N',
+                        help="Check a place never exceeds N tokens (repeatable)")
+    parser.add_argument('--final', action='append', default=[], metavar='PLACE=N,...',
+                        help="Dead markings matching all of these counts are proper "
+                             "termination rather than deadlocks (repeatable)")
+    parser.add_argument('--stubborn', action='store_true',
+                        help="Partial-order reduction with stubborn sets")
+    parser.add_argument('--symmetry', action='store_true',
+                        help="Merge markings that differ only by permuting replicas")
+    parser.add_argument('--compare', action='store_true',
+                        help="Also explore without reductions and report the reduction ratio")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes (default: 1)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Markings per expansion task")
+    parser.add_argument('--max-states', type=int, default=None,
+                        help="Stop after this many states")
+    args = parser.parse_args(argv)
+
+    try:
+        net, final = load_net(args.net)
+        for page, copies in parse_assignments(args.replicate).items():
+            net = replicate(net, page, copies)
+        marking = initial_marking(net, parse_assignments(args.marking))
+        bounds = parse_assignments(args.bound)
+        resolve_places(net, bounds)  # reject unknown places before exploring
+        if args.final:
+            final = final_condition(net, [parse_assignments([spec]) for spec in args.final])
+    except (KeyError, ValueError, argparse.ArgumentTypeError) as error:
+        # KeyError's str() would quote the message
+        parser.error(error.args[0] if isinstance(error, KeyError) else str(error))
+
+    options = {
+        'bounds': bounds or None,
+        'final': final,
+        'workers': args.workers,
+        'chunk_size': args.chunk_size,
+        'max_states': args.max_states
+    }
+    report = explore(net, marking, stubborn=args.stubborn, symmetry=args.symmetry, **options)
+    print_report(net, report)
+
+    if args.compare:
+        full = explore(net, marking, **options)
+        print()
+        print_report(net, full)
+        ratio = reduction_ratio(full, report)
+        print()
+        print(f"reduction: {ratio['states']:.1f}x states, {ratio['edges']:.1f}x edges, "
+              f"{ratio['speedup']:.1f}x faster")
+
+    return 1 if report['deadlocks'] or report['bound_violations'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,655 @@
+"""
+Discrete-event simulation of timed Petri nets
+Transitions fire after a delay taken from the net (3PS 'delay' or 'timeout'
+of timed transitions, WoPeD <time>) and race each other through one
+binary-heap event queue. Untimed transitions with the same input places
+form a free choice whose branch is picked in proportion to probability
+(WoPeD <probability>, default 1); events due at the same instant go by
+3PS priority. Tokens remember when their transaction
+started, so tokens reaching an exit-point place give latencies and tokens
+reaching an abort-point place count as aborts. Tokens in places with a
+'ttl' expire; with expirationBehavior 'auto-release' the reservation is
+undone. Runs are seeded and reproducible, and sweep runs parameter grids
+(optionally over a process pool) with independent seeds per run.
+
+Usage:
+    python petri_simulation.py net.pnml [--until T] [--max-firings N] [--seed N]
+                                       [--arrival PLACE=RATE ...] [--delay TRANSITION=T ...]
+                                       [--probability TRANSITION=P ...] [--ttl PLACE=T ...]
+                                       [--exponential] [--sweep KEY=V1,V2,... ...]
+                                       [--replications N] [--workers N]
+    python petri_simulation.py 3ps+qm:5 --exponential --default-delay 1 --probability expire=0.05 \
+        --sweep delays.reserve=1,5,20 --replications 1000
+"""
+
+import argparse
+import bisect
+import heapq
+import itertools
+import math
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Seconds per 3PS delayUnit
+DELAY_UNITS = {'ms': 0.001, 'milliseconds': 0.001, 's': 1, 'seconds': 1,
+               'minutes': 60, 'hours': 3600}
+
+# Delay distributions around a transition's delay
+DISTRIBUTIONS = ('deterministic', 'exponential')
+
+# Latency percentiles reported
+PERCENTILES = (50, 90, 99)
+
+# Consecutive firings without the clock advancing that make a run without
+# a firing limit fail as a zero-delay (Zeno) cycle
+ZENO_FIRINGS = 1_000_000
+
+# Heap rank of token expiries: before any firing due at the same instant
+_EXPIRY_RANK = -math.inf
+
+# Net simulated by a sweep worker process, set by init_worker
+_net = None
+
+def _matches(names, key):
+    """Whether key names one of a node's names (replica suffixes '#i' optional)."""
+    return key in names or any(name.partition('#')[0] == key for name in names)
+
+def _check_overrides(net, overrides, ids, names):
+    """Reject override keys that name none of the given nodes."""
+    for key in overrides or {}:
+        if not any(_matches(node, key) for node in zip(ids, names)):
+            raise ValueError(f"Unknown node '{key}' in net {net.id}")
+
+def _lookup(overrides, names):
+    """Get the override for a node given by any of its names, or None."""
+    for key, value in (overrides or {}).items():
+        if _matches(names, key):
+            return value
+    return None
+
+def _seconds(value, unit):
+    return float(value) * DELAY_UNITS.get(str(unit).lower(), 1) if unit is not None else float(value)
+
+def transition_delay(net, transition):
+    """
+    Get a transition's delay from the net: a 3PS timed transition's 'delay'
+    (in 'delayUnit', seconds by default), a 3PS 'timeout', else the WoPeD
+    <time> (in the model's time unit).
+
+    Args:
+        net: PetriNet
+        transition: Transition index
+
+    Returns:
+        float: Delay, 0 for immediate transitions
+    """
+    metadata = net.transition_metadata[transition]
+    for key in ('delay', 'timeout'):
+        if isinstance(metadata.get(key), (int, float)):
+            return _seconds(metadata[key], metadata.get('delayUnit'))
+    time_value = net.transition_timing[transition].get('time')
+    return float(time_value) if isinstance(time_value, (int, float)) else 0.0
+
+def _places_of_type(net, place_type):
+    return [i for i, metadata in enumerate(net.place_metadata)
+            if metadata.get('placeType') == place_type]
+
+def _resolve(net, names, lookup):
+    indices = []
+    for name in names:
+        try:
+            indices.append(lookup(name))
+        except ValueError:
+            raise ValueError(f"Unknown node '{name}' in net {net.id}") from None
+    return indices
+
+class Simulator:
+    """
+    Event-driven simulator for one net.
+
+    The net is compiled once into per-transition Python lists (the hot loop
+    touches single tokens, where lists beat NumPy); run can then be called
+    any number of times with different seeds. Transitions are single-server
+    with race semantics: a transition is scheduled when it becomes enabled,
+    its event is dropped if it is disabled before the event is due, and it
+    is rescheduled after firing while it stays enabled. A free choice picks
+    its branch when it becomes enabled and is scheduled with that branch's
+    delay. Transitions without input arcs are driven by the environment and
+    never fire on their own; use arrivals to feed entry places.
+    """
+
+    def __init__(self, net, delays=None, probabilities=None, ttls=None, arrivals=None,
+                 distribution='deterministic', default_delay=None, complete=None, abort=None):
+        """
+        Compile a net for simulation.
+
+        Args:
+            net: PetriNet
+            delays: Transition name/id -> delay, overriding the net's timing
+                    (replicated transitions match their name without '#i')
+            probabilities: Transition name/id -> branching weight
+            ttls: Place name/id -> token time-to-live, overriding 'ttl'
+            arrivals: Place name/id -> Poisson arrival rate of new transactions
+            distribution: 'deterministic' or 'exponential' (mean = delay);
+                          timed and timeout transitions stay deterministic
+            default_delay: Delay of transitions with no timing (default 0)
+            complete: Places whose tokens end a transaction
+                      (default: places with placeType 'exit-point')
+            abort: Places whose tokens abort a transaction
+                   (default: places with placeType 'abort-point')
+        """
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{distribution}', expected one of {DISTRIBUTIONS}")
+        _check_overrides(net, delays, net.transition_ids, net.transition_names)
+        _check_overrides(net, probabilities, net.transition_ids, net.transition_names)
+        _check_overrides(net, ttls, net.place_ids, net.place_names)
+        self.net = net
+        self.distribution = distribution
+        n_transitions = net.n_transitions
+
+        def arcs(offsets, places, weights, t):
+            start, end = offsets[t], offsets[t + 1]
+            return [(int(p), int(w)) for p, w in zip(places[start:end], weights[start:end])]
+
+        self.pre = [arcs(net.pre_offsets, net.pre_places, net.pre_weights, t)
+                    for t in range(n_transitions)]
+        self.post = [arcs(net.post_offsets, net.post_places, net.post_weights, t)
+                     for t in range(n_transitions)]
+        self.test = [arcs(net.test_offsets, net.test_places, net.test_weights, t)
+                     for t in range(n_transitions)]
+        self.inhibitors = [arcs(net.inhibitor_offsets, net.inhibitor_places,
+                                net.inhibitor_weights, t) for t in range(n_transitions)]
+
+        self.delays, self.weights, self.ranks, self.fixed = [], [], [], []
+        for t in range(n_transitions):
+            names = (net.transition_ids[t], net.transition_names[t])
+            delay = _lookup(delays, names)
+            if delay is None:
+                has_timing = (any(k in net.transition_metadata[t] for k in ('delay', 'timeout'))
+                              or 'time' in net.transition_timing[t])
+                delay = transition_delay(net, t) if has_timing or default_delay is None else default_delay
+            weight = _lookup(probabilities, names)
+            if weight is None:
+                weight = net.transition_timing[t].get('probability', 1)
+            self.delays.append(float(delay))
+            self.weights.append(float(weight))
+            self.ranks.append(-float(net.transition_metadata[t].get('priority', 0)))
+            self.fixed.append(net.transition_metadata[t].get('type') == 'timed'
+                              or 'timeout' in net.transition_metadata[t])
+
+        # Place expiry: ttl (or None) and whether expiry undoes the producer
+        self.ttls, self.releases = [], []
+        for p in range(net.n_places):
+            metadata = net.place_metadata[p]
+            ttl = _lookup(ttls, (net.place_ids[p], net.place_names[p]))
+            if ttl is None and isinstance(metadata.get('ttl'), (int, float)):
+                ttl = metadata['ttl']
+            self.ttls.append(None if ttl is None else float(ttl))
+            self.releases.append(metadata.get('expirationBehavior') == 'auto-release')
+
+        # Arrivals are extra source transitions with exponential delays
+        self.sources = {}
+        for name, rate in (arrivals or {}).items():
+            place, = _resolve(net, [name], net.place)
+            if not rate > 0:
+                raise ValueError(f"Arrival rate of '{name}' must be positive, got {rate}")
+            self.sources[len(self.pre)] = place
+            for arc_list, value in ((self.pre, []), (self.post, [(place, 1)]),
+                                    (self.test, []), (self.inhibitors, [])):
+                arc_list.append(value)
+            self.delays.append(1.0 / rate)
+            self.weights.append(1.0)
+            self.ranks.append(0.0)
+            self.fixed.append(False)
+
+        complete = (_places_of_type(net, 'exit-point') if complete is None
+                    else _resolve(net, complete, net.place))
+        abort = (_places_of_type(net, 'abort-point') if abort is None
+                 else _resolve(net, abort, net.place))
+        self.outcome = [0] * net.n_places
+        for p in complete:
+            self.outcome[p] = 1
+        for p in abort:
+            self.outcome[p] = -1
+
+        self.active = [bool(self.pre[t] or self.test[t]) or t in self.sources
+                       for t in range(len(self.pre))]
+
+        # Free choices: untimed transitions with identical guards are scheduled
+        # as one unit whose branch is picked by probability when it is enabled
+        self.choices, self.choice_of, keys = [], [], {}
+        for t in range(len(self.pre)):
+            key = (tuple(self.pre[t]), tuple(self.test[t]), tuple(self.inhibitors[t]))
+            if self.fixed[t] or t in self.sources or not self.active[t]:
+                key = t
+            if key not in keys:
+                keys[key] = len(self.choices)
+                self.choices.append([])
+            self.choices[keys[key]].append(t)
+            self.choice_of.append(keys[key])
+        self.cumulative = [list(itertools.accumulate(self.weights[t] for t in members))
+                           for members in self.choices]
+
+        # Choices to recheck when a place changes, and after each transition fires
+        watchers = [set() for _ in range(net.n_places)]
+        for t in range(len(self.pre)):
+            for p, _ in self.pre[t] + self.test[t] + self.inhibitors[t]:
+                watchers[p].add(self.choice_of[t])
+        self.watchers = [sorted(w) for w in watchers]
+        self.watched = [bool(w) for w in watchers]
+        self.affected = [sorted(set().union({self.choice_of[t]},
+                                            *(watchers[p] for p, _ in self.pre[t] + self.post[t])))
+                         for t in range(len(self.pre))]
+
+    def _enabled(self, marking, t):
+        for p, w in self.pre[t]:
+            if marking[p] < w:
+                return False
+        for p, w in self.test[t]:
+            if marking[p] < w:
+                return False
+        for p, w in self.inhibitors[t]:
+            if marking[p] >= w:
+                return False
+        return self.active[t]
+
+    def run(self, seed=None, until=math.inf, max_firings=None, marking=None):
+        """
+        Simulate from a marking until the event queue runs dry, the clock
+        passes until or max_firings transitions have fired.
+
+        Args:
+            seed: Random seed (same seed, same run)
+            until: Simulated time limit
+            max_firings: Firing limit; without one, ZENO_FIRINGS firings in a
+                         row at one instant raise ValueError
+            marking: Token count per place (default: the initial marking)
+
+        Returns:
+            dict: firings, simulated time, wall seconds, firings/sec,
+                  completions, aborts (abort-point tokens plus expiries),
+                  expirations, throughput (completions per time unit),
+                  abort rate, latency percentiles, deadlock flag, final
+                  marking and firings per transition
+        """
+        net = self.net
+        rng = random.Random(seed)
+        expovariate = rng.expovariate
+        exponential = self.distribution == 'exponential'
+        pre, post, delays, weights, ranks = self.pre, self.post, self.delays, self.weights, self.ranks
+        ttls, outcome, watched, affected = self.ttls, self.outcome, self.watched, self.affected
+        sources = [t in self.sources for t in range(len(pre))]
+        # Transitions whose delay is drawn from an exponential distribution
+        drawn = [delays[t] > 0 and (sources[t] or exponential and not self.fixed[t])
+                 for t in range(len(pre))]
+        enabled = self._enabled
+
+        marking = [int(x) for x in (net.initial_marking if marking is None else marking)]
+        # Per watched place, the start times of its tokens, oldest first
+        tokens = [deque([0.0] * marking[p]) if watched[p] else None for p in range(net.n_places)]
+        # Per ttl place, each token's producer and the serials taken/added so far
+        producers = [deque([None] * marking[p]) if ttls[p] is not None else None
+                     for p in range(net.n_places)]
+        taken = [0] * net.n_places
+        added = [0] * net.n_places
+
+        n_transitions = len(pre)
+        choices, choice_of, cumulative = self.choices, self.choice_of, self.cumulative
+        scheduled = [0] * len(choices)
+        fired = [0] * n_transitions
+        stamps = itertools.count(1)
+        heap = []
+        latencies = []
+        completions = aborts = expirations = 0
+        now = 0.0
+
+        # Initial tokens of ttl places expire like produced ones, oldest serials first
+        for p in range(net.n_places):
+            if ttls[p] is not None:
+                for serial in range(marking[p]):
+                    heapq.heappush(heap, (ttls[p], _EXPIRY_RANK, 0.0, -1 - p, serial))
+                added[p] = marking[p]
+
+        def schedule(c):
+            members = choices[c]
+            if len(members) == 1:
+                t = members[0]
+            else:
+                bounds = cumulative[c]
+                t = members[bisect.bisect(bounds, rng.random() * bounds[-1])]
+            delay = delays[t]
+            if drawn[t]:
+                delay = expovariate(1.0 / delay)
+            stamp = next(stamps)
+            scheduled[c] = stamp
+            heapq.heappush(heap, (now + delay, ranks[t], expovariate(cumulative[c][-1]), t, stamp))
+
+        def produce(p, count, start, producer):
+            nonlocal completions, aborts
+            marking[p] += count
+            if tokens[p] is not None:
+                tokens[p].extend([start] * count)
+            ttl = ttls[p]
+            if ttl is not None:
+                for _ in range(count):
+                    producers[p].append(producer)
+                    heapq.heappush(heap, (now + ttl, _EXPIRY_RANK, 0.0, -1 - p, added[p]))
+                    added[p] += 1
+            if outcome[p] > 0:
+                completions += count
+                latencies.extend([now - start] * count)
+            elif outcome[p] < 0:
+                aborts += count
+
+        def consume(p, count):
+            marking[p] -= count
+            start = 0.0
+            queue = tokens[p]
+            if queue is not None:
+                for _ in range(count):
+                    start = max(start, queue.popleft())
+            if ttls[p] is not None:
+                for _ in range(count):
+                    producers[p].popleft()
+                taken[p] += count
+            return start
+
+        def recheck(affected_choices):
+            for c in affected_choices:
+                if enabled(marking, choices[c][0]):
+                    if not scheduled[c]:
+                        schedule(c)
+                elif scheduled[c]:
+                    scheduled[c] = 0
+
+        recheck(range(len(choices)))
+
+        started = time.perf_counter()
+        firings = 0
+        # Without a firing limit, a zero-delay cycle would never return
+        zeno_firings = ZENO_FIRINGS if max_firings is None else math.inf
+        instant_firings = 0
+        max_firings = math.inf if max_firings is None else max_firings
+        heappop = heapq.heappop
+        while heap and firings < max_firings:
+            if heap[0][0] > until:
+                break
+            when, _, _, t, stamp = heappop(heap)
+
+            if t < 0:
+                # Token expiry: only if the token has not been consumed yet
+                p = -1 - t
+                if stamp < taken[p]:
+                    continue
+                now = when
+                producer = producers[p][0]
+                start = consume(p, 1)
+                expirations += 1
+                aborts += 1
+                if producer is not None and self.releases[p]:
+                    skipped = False
+                    for q, w in post[producer]:
+                        if q == p and not skipped:
+                            w -= 1
+                            skipped = True
+                        if w:
+                            consume(q, min(w, marking[q]))
+                    for q, w in pre[producer]:
+                        produce(q, w, now, None)
+                    recheck(affected[producer])
+                else:
+                    recheck(self.watchers[p])
+                continue
+
+            c = choice_of[t]
+            if scheduled[c] != stamp:
+                continue
+            if when > now:
+                instant_firings = 0
+            instant_firings += 1
+            if instant_firings > zeno_firings:
+                raise ValueError(f"{zeno_firings:,} firings at time {now:g} without the clock "
+                                 f"advancing: zero-delay cycle in net {net.id} "
+                                 f"(set delays or max_firings)")
+            now = when
+            scheduled[c] = 0
+            firings += 1
+            fired[t] += 1
+
+            start = now if sources[t] else 0.0
+            for p, w in pre[t]:
+                start = max(start, consume(p, w))
+            for p, w in post[t]:
+                produce(p, w, start, t)
+            recheck(affected[t])
+
+        wall = time.perf_counter() - started
+        pending = any(scheduled) or added != taken
+        if pending and firings < max_firings:
+            now = until
+        finished = completions + aborts
+        report = {
+            'seed': seed,
+            'firings': firings,
+            'time': now,
+            'seconds': wall,
+            'firings_per_sec': firings / wall if wall > 0 else float('inf'),
+            'completions': completions,
+            'aborts': aborts,
+            'expirations': expirations,
+            'throughput': completions / now if now > 0 else float('nan'),
+            'abort_rate': aborts / finished if finished else float('nan'),
+            'latency_mean': float(np.mean(latencies)) if latencies else float('nan'),
+            'deadlocked': not pending,
+            'marking': np.array(marking, dtype=np.int64),
+            'fired': np.array(fired[:net.n_transitions], dtype=np.int64),
+            'latencies': np.array(latencies)
+        }
+        for q, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)
+                            if latencies else [float('nan')] * len(PERCENTILES)):
+            report[f'latency_p{q}'] = float(value)
+        return report
+
+def summarize(reports):
+    """
+    Pool replications of one configuration.
+
+    Args:
+        reports: Reports from Simulator.run
+
+    Returns:
+        dict: Replications, totals of firings, completions, aborts and
+              expirations, throughput and firings/sec over the summed
+              time, abort rate, latency mean and percentiles over all
+              transactions, and the share of runs that deadlocked
+    """
+    totals = {key: sum(r[key] for r in reports)
+              for key in ('firings', 'completions', 'aborts', 'expirations', 'time', 'seconds')}
+    latencies = np.concatenate([r['latencies'] for r in reports]) if reports else np.empty(0)
+    finished = totals['completions'] + totals['aborts']
+    summary = {
+        'replications': len(reports),
+        **totals,
+        'firings_per_sec': totals['firings'] / totals['seconds'] if totals['seconds'] else float('inf'),
+        'throughput': totals['completions'] / totals['time'] if totals['time'] else float('nan'),
+        'abort_rate': totals['aborts'] / finished if finished else float('nan'),
+        'latency_mean': float(latencies.mean()) if len(latencies) else float('nan'),
+        'deadlocked': sum(r['deadlocked'] for r in reports) / len(reports) if reports else 0.0
+    }
+    for q, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)
+                        if len(latencies) else [float('nan')] * len(PERCENTILES)):
+        summary[f'latency_p{q}'] = float(value)
+    return summary
+
+def _grid_points(grid):
+    """
+    Expand a parameter grid into Simulator option dicts.
+
+    Keys are Simulator options ('distribution', 'default_delay') or
+    'option.name' entries of its dict options, e.g. 'delays.reserve' or
+    'arrivals.entry'; values are lists.
+    """
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+def _options(base, point):
+    options = {key: dict(value) if isinstance(value, dict) else value
+               for key, value in base.items()}
+    for key, value in point.items():
+        option, _, name = key.partition('.')
+        if name:
+            options[option] = dict(options.get(option) or {}, **{name: value})
+        else:
+            options[option] = value
+    return options
+
+def init_worker(net):
+    """Process pool initializer: keep the net for run_point."""
+    global _net
+    _net = net
+
+def run_point(task):
+    """Run the replications of one grid point in a worker process."""
+    options, seeds, run_options = task
+    simulator = Simulator(_net, **options)
+    return summarize([simulator.run(seed, **run_options) for seed in seeds])
+
+def sweep(net, grid=None, replications=1, seed=0, workers=1, until=math.inf,
+          max_firings=None, **options):
+    """
+    Simulate every point of a parameter grid, several seeded replications each.
+
+    Run seeds are spawned from one SeedSequence in grid order, so a sweep
+    gives the same results whatever the number of workers.
+
+    Args:
+        net: PetriNet
+        grid: Parameter -> list of values (see _grid_points); None for one point
+        replications: Runs per point
+        seed: Root seed of the sweep
+        workers: Worker processes (1 runs in this process)
+        until: Simulated time limit per run
+        max_firings: Firing limit per run
+        **options: Simulator options shared by all points
+
+    Returns:
+        list: One dict per point: 'params' plus the summarize statistics
+    """
+    points = list(_grid_points(grid or {}))
+    children = np.random.SeedSequence(seed).spawn(len(points) * replications)
+    run_options = {'until': until, 'max_firings': max_firings}
+    tasks = []
+    for i, point in enumerate(points):
+        seeds = [int(child.generate_state(1)[0])
+                 for child in children[i * replications:(i + 1) * replications]]
+        tasks.append((_options(options, point), seeds, run_options))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(net,)) as pool:
+            summaries = list(pool.map(run_point, tasks))
+    else:
+        init_worker(net)
+        summaries = [run_point(task) for task in tasks]
+    return [{'params': point, **summary} for point, summary in zip(points, summaries)]
+
+def _parse_values(values, cast=float):
+    """Parse 'NAME=V[,NAME=V...]' command-line values into a dict."""
+    result = {}
+    for value in values:
+        for item in value.split(','):
+            name, _, number = item.rpartition('=')
+            if not name:
+                raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got '{item}'")
+            result[name.strip()] = cast(number)
+    return result
+
+def _parse_grid(values):
+    """Parse 'KEY=V1,V2,...' sweep values into a grid."""
+    grid = {}
+    for value in values:
+        key, _, numbers = value.partition('=')
+        if not numbers:
+            raise argparse.ArgumentTypeError(f"Expected KEY=V1,V2,..., got '{value}'")
+        grid[key.strip()] = [float(number) for number in numbers.split(',')]
+    return grid
+
+def print_summary(summary):
+    """Print the statistics of one grid point."""
+    params = ', '.join(f'{key}={value:g}' for key, value in summary['params'].items())
+    if params:
+        print(params)
+    print(f"  {summary['replications']} runs, {summary['firings']:,} firings in "
+          f"{summary['seconds']:.2f}s ({summary['firings_per_sec']:,.0f} firings/s), "
+          f"simulated time {summary['time']:g}")
+    print(f"  {summary['completions']} completed, {summary['aborts']} aborted "
+          f"({summary['expirations']} expired), abort rate {summary['abort_rate']:.2%}, "
+          f"throughput {summary['throughput']:.4g}/time unit")
+    latencies = ', '.join(f"p{q} {summary[f'latency_p{q}']:.4g}" for q in PERCENTILES)
+    print(f"  latency mean {summary['latency_mean']:.4g}, {latencies}")
+    if summary['deadlocked']:
+        print(f"  deadlocked: {summary['deadlocked']:.0%} of runs")
+
+def main(argv=None):
+    """Command-line entry point."""
+    from petri_net import replicate
+    from petri_reachability import parse_assignments, load_net
+
+    parser = argparse.ArgumentParser(description="Simulate a timed Petri net")
+    parser.add_argument('net', help="PNML file, or a generated model: 3ps:N or 3ps+qm:N")
+    parser.add_argument('--replicate', action='append', default=[], metavar='PAGE=N',
+                        help="Replicate a page (participant) N times (repeatable)")
+    parser.add_argument('--until', type=float, default=math.inf,
+                        help="Simulated time limit per run")
+    parser.add_argument('--max-firings', type=int, default=None,
+                        help="Firing limit per run")
+    parser.add_argument('--seed', type=int, default=0, help="Root random seed (default: 0)")
+    parser.add_argument('--arrival', action='append', default=[], metavar='PLACE=RATE',
+                        help="Poisson arrivals of new transactions into a place (repeatable)")
+    parser.add_argument('--delay', action='append', default=[], metavar='TRANSITION=T',
+                        help="Override a transition's delay (repeatable)")
+    parser.add_argument('--probability', action='append', default=[], metavar='TRANSITION=P',
+                        help="Override a transition's branching weight (repeatable)")
+    parser.add_argument('--ttl', action='append', default=[], metavar='PLACE=T',
+                        help="Override a place's token time-to-live (repeatable)")
+    parser.add_argument('--default-delay', type=float, default=None,
+                        help="Delay of transitions without timing (default: 0)")
+    parser.add_argument('--exponential', action='store_true',
+                        help="Exponentially distributed delays instead of fixed ones")
+    parser.add_argument('--sweep', action='append', default=[], metavar='KEY=V1,V2,...',
+                        help="Grid parameter, e.g. delays.reserve=1,2,4 (repeatable)")
+    parser.add_argument('--replications', type=int, default=1,
+                        help="Seeded runs per grid point (default: 1)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    try:
+        net, _ = load_net(args.net)
+        for page, copies in parse_assignments(args.replicate).items():
+            net = replicate(net, page, copies)
+        results = sweep(net, _parse_grid(args.sweep), replications=args.replications,
+                        seed=args.seed, workers=args.workers, until=args.until,
+                        max_firings=args.max_firings,
+                        delays=_parse_values(args.delay),
+                        probabilities=_parse_values(args.probability),
+                        ttls=_parse_values(args.ttl),
+                        arrivals=_parse_values(args.arrival),
+                        distribution='exponential' if args.exponential else 'deterministic',
+                        default_delay=args.default_delay)
+    except (KeyError, ValueError, argparse.ArgumentTypeError) as error:
+        # KeyError's str() would quote the message
+        parser.error(error.args[0] if isinstance(error, KeyError) else str(error))
+    print(f"{net.id}: {net.n_places} places, {net.n_transitions} transitions")
+    for summary in results:
+        print_summary(summary)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
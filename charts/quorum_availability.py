@@ -0,0 +1,296 @@
+"""
+Commit availability of 2PC, 3PS and 3PS+QM under replica failures
+A transaction commits when enough participants are up: all of them for
+3PS, all of them plus the coordinator for 2PC (a failed 2PC coordinator
+blocks, a 3PS one is replaced by the termination protocol), and at least
+Q for 3PS+QM (doc/dxp-14-proof-3ps-plus-qm.md). Replicas fail with
+probability p; they are spread round-robin over failure zones (racks,
+availability zones), and within a zone any two replicas' failures have
+correlation rho: with probability rho a zone fails or survives as a
+whole, otherwise its replicas fail independently. Cells are computed
+exactly: the binomial form for independent failures, the convolution of
+the per-zone distributions for correlated ones. --monte-carlo estimates
+them instead, drawing each zone's failure count from its exact
+distribution so a trial costs one uniform per zone.
+
+Usage:
+    python quorum_availability.py [--replicas 3,5,7] [--p 0.01,0.05,0.1]
+                                  [--correlation 0,0.1,0.5] [--zones N]
+                                  [--trials N] [--quorum majority|simple]
+                                  [--monte-carlo] [--workers N] [--seed N]
+                                  [--chart FILE] [--json FILE]
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from petri_models import majority_quorum
+
+PROTOCOLS = ('2pc', '3ps', '3ps+qm')
+
+# Failure zones replicas are spread over (e.g. three availability zones)
+DEFAULT_ZONES = 3
+
+# Monte Carlo trials per grid cell
+DEFAULT_TRIALS = 1_000_000
+
+# Trials drawn per batch (bounds the trials x zones arrays)
+CHUNK_TRIALS = 1 << 20
+
+def simple_majority(n):
+    """
+    Get the smallest strict majority floor(n/2) + 1. doc/dxp-14's 0.99
+    availability for n=5, p=0.1 is P(at least 3 of 5 up), i.e. this quorum;
+    the ceil(n/2) + 1 rule of majority_quorum needs 4 of 5 (0.919).
+    """
+    return n // 2 + 1
+
+QUORUM_RULES = {'majority': majority_quorum, 'simple': simple_majority}
+
+def zone_sizes(n, zones):
+    """Replicas per zone when n replicas are spread round-robin."""
+    zones = min(zones, n)
+    return [n // zones + (i < n % zones) for i in range(zones)]
+
+def _binomial_pmf(n, p):
+    k = np.arange(n + 1)
+    coefficients = np.array([math.comb(n, i) for i in range(n + 1)], dtype=float)
+    return coefficients * p ** (n - k) * (1 - p) ** k  # k replicas up
+
+def up_distribution(n, p, rho=0.0, zones=DEFAULT_ZONES):
+    """
+    Get P(k of n replicas up) exactly: the binomial distribution for
+    independent failures, else the convolution of the zones' distributions.
+
+    Args:
+        n: Replicas
+        p: Failure probability per replica
+        rho: Failure correlation within a zone
+        zones: Failure zones
+
+    Returns:
+        ndarray: n + 1 probabilities, index k = replicas up
+    """
+    if rho == 0:
+        return _binomial_pmf(n, p)
+    distribution = np.ones(1)
+    for size in zone_sizes(n, zones):
+        distribution = np.convolve(distribution, zone_distribution(size, p, rho))
+    return distribution
+
+def protocol_availability(up, p, quorum):
+    """
+    Get each protocol's commit availability from the distribution of
+    replicas up.
+
+    Args:
+        up: P(k replicas up), k = 0..n (exact or estimated)
+        p: Failure probability, of the 2PC coordinator too
+        quorum: 3PS+QM quorum Q
+
+    Returns:
+        dict: Protocol -> availability
+    """
+    all_up = up[-1]
+    return {'2pc': (1 - p) * all_up, '3ps': all_up, '3ps+qm': up[quorum:].sum()}
+
+def zone_distribution(size, p, rho):
+    """
+    Get P(k of a zone's replicas up) when the zone fails as a whole with
+    probability rho * p, survives as a whole with probability rho * (1 - p)
+    and otherwise fails replica by replica.
+    """
+    distribution = (1 - rho) * _binomial_pmf(size, p)
+    distribution[0] += rho * p
+    distribution[-1] += rho * (1 - p)
+    return distribution
+
+def sample_up_counts(n, p, rho, zones, trials, rng):
+    """
+    Estimate P(k of n replicas up) by Monte Carlo.
+
+    Args:
+        n: Replicas
+        p: Failure probability per replica
+        rho: Failure correlation within a zone
+        zones: Failure zones
+        trials: Trials
+        rng: NumPy Generator
+
+    Returns:
+        ndarray: n + 1 frequencies
+    """
+    sizes = zone_sizes(n, zones)
+    cdfs = [np.cumsum(zone_distribution(size, p, rho)) for size in sizes]
+    for cdf in cdfs:
+        cdf[-1] = 1.0  # guard against rounding leaving a gap at the top
+    counts = np.zeros(n + 1, dtype=np.int64)
+    for start in range(0, trials, CHUNK_TRIALS):
+        batch = min(CHUNK_TRIALS, trials - start)
+        up = np.zeros(batch, dtype=np.int64)
+        uniforms = rng.random((len(sizes), batch))
+        for cdf, u in zip(cdfs, uniforms):
+            up += np.searchsorted(cdf, u, side='right')
+        counts += np.bincount(up, minlength=n + 1)
+    return counts / trials
+
+def evaluate_cell(task):
+    """
+    Evaluate one (n, p, rho) cell, exactly or by Monte Carlo.
+
+    Args:
+        task: (n, p, rho, zones, quorum, trials, seed, exact)
+
+    Returns:
+        tuple: (availability dict, standard error dict, exact flag)
+    """
+    n, p, rho, zones, quorum, trials, seed, exact = task
+    if exact:
+        availability = protocol_availability(up_distribution(n, p, rho, zones), p, quorum)
+        return availability, dict.fromkeys(PROTOCOLS, 0.0), True
+
+    up = sample_up_counts(n, p, rho, zones, trials, np.random.default_rng(seed))
+    availability = protocol_availability(up, p, quorum)
+    stderr = {protocol: math.sqrt(value * (1 - value) / trials)
+              for protocol, value in availability.items()}
+    # 2PC scales the simulated all-up frequency by the exact (1 - p)
+    stderr['2pc'] = (1 - p) * stderr['3ps']
+    return availability, stderr, False
+
+def availability_grid(replicas, probabilities, correlations=(0.0,), zones=DEFAULT_ZONES,
+                      trials=DEFAULT_TRIALS, quorum='majority', exact=True, seed=0, workers=1):
+    """
+    Evaluate commit availability over a grid.
+
+    Cell seeds are spawned from one SeedSequence in grid order, so results
+    do not depend on the number of workers.
+
+    Args:
+        replicas: Replica counts n
+        probabilities: Per-replica failure probabilities p
+        correlations: Within-zone failure correlations rho
+        zones: Failure zones replicas are spread over
+        trials: Monte Carlo trials per cell
+        quorum: 'majority' (ceil(n/2) + 1), 'simple' (floor(n/2) + 1) or a
+                callable n -> Q
+        exact: Compute cells exactly instead of by Monte Carlo
+        seed: Root random seed
+        workers: Worker processes (1 evaluates in this process)
+
+    Returns:
+        dict: Axes 'n', 'p', 'correlation' and 'quorum' (per n), arrays
+              'availability' and 'stderr' (protocol -> n x p x rho), the
+              'exact' mask, 'trials', 'zones' and wall 'seconds'
+    """
+    quorum_of = QUORUM_RULES[quorum] if isinstance(quorum, str) else quorum
+    replicas, probabilities, correlations = (np.asarray(axis) for axis in
+                                             (replicas, probabilities, correlations))
+    shape = (len(replicas), len(probabilities), len(correlations))
+    cells = list(np.ndindex(*shape))
+    seeds = np.random.SeedSequence(seed).spawn(len(cells))
+    tasks = [(int(replicas[i]), float(probabilities[j]), float(correlations[k]), zones,
+              quorum_of(int(replicas[i])), trials, seeds[c], exact)
+             for c, (i, j, k) in enumerate(cells)]
+
+    started = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(evaluate_cell, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    else:
+        outcomes = [evaluate_cell(task) for task in tasks]
+    seconds = time.perf_counter() - started
+
+    availability = {protocol: np.zeros(shape) for protocol in PROTOCOLS}
+    stderr = {protocol: np.zeros(shape) for protocol in PROTOCOLS}
+    exact_mask = np.zeros(shape, dtype=bool)
+    for cell, (values, errors, is_exact) in zip(cells, outcomes):
+        for protocol in PROTOCOLS:
+            availability[protocol][cell] = values[protocol]
+            stderr[protocol][cell] = errors[protocol]
+        exact_mask[cell] = is_exact
+
+    return {
+        'n': replicas,
+        'p': probabilities,
+        'correlation': correlations,
+        'quorum': np.array([quorum_of(int(n)) for n in replicas]),
+        'availability': availability,
+        'stderr': stderr,
+        'exact': exact_mask,
+        'trials': trials,
+        'zones': zones,
+        'seconds': seconds
+    }
+
+def _parse_list(value, cast=float):
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+def print_grid(result):
+    """Print one availability table per correlation."""
+    protocols = '  '.join(f'{protocol:>9}' for protocol in PROTOCOLS)
+    for k, rho in enumerate(result['correlation']):
+        print(f"correlation {rho:g} ({result['zones']} zones)")
+        print(f"{'n':>4}{'Q':>4}{'p':>8}  {protocols}")
+        for i, n in enumerate(result['n']):
+            for j, p in enumerate(result['p']):
+                values = '  '.join(f"{result['availability'][protocol][i, j, k]:>9.5f}"
+                                   for protocol in PROTOCOLS)
+                flag = '' if result['exact'][i, j, k] else \
+                    f"  (+/- {result['stderr']['3ps+qm'][i, j, k]:.1e})"
+                print(f"{n:>4}{result['quorum'][i]:>4}{p:>8g}  {values}{flag}")
+        print()
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Commit availability of 2PC, 3PS and 3PS+QM")
+    parser.add_argument('--replicas', default='3,5,7,9', help="Comma-separated replica counts")
+    parser.add_argument('--p', default='0.01,0.05,0.1,0.2',
+                        help="Comma-separated failure probabilities")
+    parser.add_argument('--correlation', default='0,0.1,0.3',
+                        help="Comma-separated within-zone failure correlations")
+    parser.add_argument('--zones', type=int, default=DEFAULT_ZONES,
+                        help=f"Failure zones (default: {DEFAULT_ZONES})")
+    parser.add_argument('--trials', type=int, default=DEFAULT_TRIALS,
+                        help=f"Monte Carlo trials per cell (default: {DEFAULT_TRIALS:,})")
+    parser.add_argument('--quorum', choices=sorted(QUORUM_RULES), default='majority',
+                        help="Quorum rule: ceil(n/2)+1 (majority) or floor(n/2)+1 (simple)")
+    parser.add_argument('--monte-carlo', action='store_true',
+                        help="Estimate every cell by simulation instead of exactly")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--chart', default=None, help="Save a heatmap of the grid to this file")
+    parser.add_argument('--json', default=None, help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    result = availability_grid(_parse_list(args.replicas, int), _parse_list(args.p),
+                               _parse_list(args.correlation), zones=args.zones,
+                               trials=args.trials, quorum=args.quorum,
+                               exact=not args.monte_carlo, seed=args.seed, workers=args.workers)
+    print_grid(result)
+    simulated = int((~result['exact']).sum())
+    print(f"{result['exact'].size} cells ({simulated} simulated, {args.trials:,} trials each) "
+          f"in {result['seconds']:.2f}s")
+    if simulated:
+        print(f"{simulated * args.trials / result['seconds']:,.0f} trials/s")
+
+    if args.chart:
+        from chart_availability_module import save_availability_chart
+        for filename in save_availability_chart(result, args.chart):
+            print(f"Chart saved as '{filename}'")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({key: ({k: v.tolist() for k, v in value.items()}
+                             if isinstance(value, dict) else
+                             value.tolist() if isinstance(value, np.ndarray) else value)
+                       for key, value in result.items()}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Bitset quorum collector for 3PS+QM response aggregation
+Relaxes the all_responses_received guard of a multiset response place
+(such as Collect Reserves in ecommerce_medium_3ps_petri.pnml, whose
+expectedResponses lists the participants) to a quorum, ceil(n/2) + 1 by
+default (doc/dxp-13-quorum-modifier.md). Each open transaction holds a
+yes and a no bitset over the participants plus their popcounts, so a
+vote is O(1): a participant already present in either bitset is a retried
+(or conflicting) response and is ignored, and the transaction is decided
+as soon as the yes count reaches the quorum or the no count makes the
+quorum unreachable. All state lives in NumPy arrays indexed by a reusable
+slot number, and batches of votes are applied with whole-array
+operations, so hundreds of thousands of transactions in flight cost a
+few dozen bytes each.
+"""
+
+import numpy as np
+
+from petri_models import majority_quorum
+
+# Decisions
+PENDING = 0
+QUORUM = 1
+UNREACHABLE = -1
+
+# Initial transaction capacity; arrays double as needed
+DEFAULT_CAPACITY = 1024
+
+# Smaller vote_many batches are applied vote by vote; array calls cost more
+_SCALAR_BATCH = 32
+
+_WORD_BITS = 64
+_INDEX_BITS = 32
+_INDEX_MASK = (1 << _INDEX_BITS) - 1
+
+def expected_responses(net):
+    """
+    Get the participants named by the expectedResponses of a net's response
+    places, in declaration order.
+
+    Args:
+        net: PetriNet
+
+    Returns:
+        list: Participant names (empty if none are declared)
+    """
+    names = []
+    for metadata in net.place_metadata:
+        services = metadata.get('expectedResponses', {})
+        services = services.get('service', []) if isinstance(services, dict) else services
+        for name in [services] if isinstance(services, str) else services:
+            if name not in names:
+                names.append(name)
+    return names
+
+class QuorumCollector:
+    """
+    Votes of many in-flight transactions over one set of participants.
+
+    Handles are ints combining a slot number and a generation, so a retried
+    response for a transaction that was already closed is never counted
+    against a later transaction reusing the slot.
+    """
+
+    def __init__(self, participants, quorum=None, capacity=DEFAULT_CAPACITY):
+        """
+        Create an empty collector.
+
+        Args:
+            participants: Number of participants, or their names (votes then
+                          use positions in this list; see index)
+            quorum: Yes votes that decide a transaction (default: ceil(n/2) + 1)
+            capacity: Initial array capacity
+        """
+        if isinstance(participants, int):
+            self.names = [str(i) for i in range(participants)]
+        else:
+            self.names = list(participants)
+        self.participants = len(self.names)
+        self.quorum = majority_quorum(self.participants) if quorum is None else quorum
+        if not 0 < self.quorum <= self.participants:
+            raise ValueError(f"quorum {self.quorum} out of range for {self.participants} participants")
+        self._ids = {name: i for i, name in enumerate(self.names)}
+        self._words = (self.participants + _WORD_BITS - 1) // _WORD_BITS
+        self._open = 0
+
+        self.keys = np.zeros(capacity, dtype=np.int64)
+        self.yes = np.zeros((capacity, self._words), dtype=np.uint64)
+        self.no = np.zeros((capacity, self._words), dtype=np.uint64)
+        self.yes_counts = np.zeros(capacity, dtype=np.int32)
+        self.no_counts = np.zeros(capacity, dtype=np.int32)
+        self.decisions = np.zeros(capacity, dtype=np.int8)
+        self.live = np.zeros(capacity, dtype=bool)
+        self._generations = np.zeros(capacity, dtype=np.int64)
+        self._free = list(range(capacity - 1, -1, -1))
+        self._views()
+
+    def __len__(self):
+        return self._open
+
+    @property
+    def nbytes(self):
+        """Bytes held by the per-transaction arrays."""
+        return sum(getattr(self, name).nbytes for name in
+                   ('keys', 'yes', 'no', 'yes_counts', 'no_counts', 'decisions', 'live',
+                    '_generations'))
+
+    def index(self, name):
+        """Position of a participant name, as passed to vote."""
+        return self._ids[name]
+
+    def _views(self):
+        # Scalar paths index flat memoryviews of the arrays, avoiding NumPy scalar overhead
+        self._live = memoryview(self.live)
+        self._gens = memoryview(self._generations)
+        self._yes = memoryview(self.yes).cast('B').cast('Q')
+        self._no = memoryview(self.no).cast('B').cast('Q')
+        self._yes_counts = memoryview(self.yes_counts)
+        self._no_counts = memoryview(self.no_counts)
+        self._decisions = memoryview(self.decisions)
+
+    def _grow(self, needed):
+        capacity = len(self.keys)
+        new_capacity = max(2 * capacity, capacity + needed)
+        for name in ('keys', 'yes', 'no', 'yes_counts', 'no_counts', 'decisions', 'live',
+                     '_generations'):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+        self._free[:0] = range(new_capacity - 1, capacity - 1, -1)
+        self._views()
+
+    def open(self, key):
+        """Start collecting votes for a transaction; returns its handle."""
+        if not self._free:
+            self._grow(1)
+        index = self._free.pop()
+        self.keys[index] = key
+        self._live[index] = True
+        self._open += 1
+        return index | (self._gens[index] << _INDEX_BITS)
+
+    def open_many(self, keys):
+        """
+        Start collecting votes for several transactions.
+
+        Returns:
+            ndarray: Handles, one per key
+        """
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+        if not len(keys):
+            return np.empty(0, dtype=np.int64)
+        if len(self._free) < len(keys):
+            self._grow(len(keys) - len(self._free))
+        indices = np.array(self._free[-len(keys):][::-1], dtype=np.int64)
+        del self._free[-len(keys):]
+        self.keys[indices] = keys
+        self.live[indices] = True
+        self._open += len(keys)
+        return indices | (self._generations[indices] << _INDEX_BITS)
+
+    def _index(self, handle):
+        """Slot number of an open handle, or None."""
+        index = handle & _INDEX_MASK
+        if index < len(self._live) and self._live[index] and \
+                self._gens[index] == handle >> _INDEX_BITS:
+            return index
+        return None
+
+    def __contains__(self, handle):
+        return self._index(int(handle)) is not None
+
+    def _valid(self, handles):
+        indices = handles & _INDEX_MASK
+        valid = indices < len(self.keys)
+        valid[valid] = (self.live[indices[valid]]
+                        & (self._generations[indices[valid]] == handles[valid] >> _INDEX_BITS))
+        return indices, valid
+
+    def vote(self, handle, participant, ok=True):
+        """
+        Record one response. A participant's first response counts; retries
+        and later contradicting responses are ignored.
+
+        Args:
+            handle: Transaction handle
+            participant: Participant position (ValueError outside range(participants))
+            ok: Yes (True) or no (False)
+
+        Returns:
+            int: The transaction's decision (PENDING, QUORUM or UNREACHABLE),
+                 or None if the handle is closed
+        """
+        if not 0 <= participant < self.participants:
+            raise ValueError(f"participant {participant} out of range for "
+                             f"{self.participants} participants")
+        index = handle & _INDEX_MASK
+        if index >= len(self._live) or not self._live[index] or \
+                self._gens[index] != handle >> _INDEX_BITS:
+            return None
+        if self._words == 1:
+            slot, bit = index, 1 << participant
+        else:
+            slot = index * self._words + participant // _WORD_BITS
+            bit = 1 << participant % _WORD_BITS
+        decision = self._decisions[index]
+        if (self._yes[slot] | self._no[slot]) & bit:
+            return decision
+        if ok:
+            self._yes[slot] |= bit
+            count = self._yes_counts[index] + 1
+            self._yes_counts[index] = count
+            if count >= self.quorum and not decision:
+                decision = self._decisions[index] = QUORUM
+        else:
+            self._no[slot] |= bit
+            count = self._no_counts[index] + 1
+            self._no_counts[index] = count
+            if count > self.participants - self.quorum and not decision:
+                decision = self._decisions[index] = UNREACHABLE
+        return decision
+
+    def vote_many(self, handles, participants, oks=True):
+        """
+        Record a batch of responses; the first response of a participant
+        (in the collector or earlier in the batch) counts.
+
+        Args:
+            handles: Transaction handle per response
+            participants: Participant position per response (ValueError if any is
+                          outside range(participants))
+            oks: Yes/no per response, or one for all
+
+        Returns:
+            tuple: (handles, decisions) of the transactions this batch decided
+        """
+        handles = np.asarray(handles, dtype=np.int64).reshape(-1)
+        participants = np.asarray(participants, dtype=np.int64).reshape(-1)
+        oks = np.broadcast_to(np.asarray(oks, dtype=bool), handles.shape)
+        outside = (participants < 0) | (participants >= self.participants)
+        if outside.any():
+            raise ValueError(f"participant {participants[outside][0]} out of range for "
+                             f"{self.participants} participants")
+        if len(handles) < _SCALAR_BATCH:
+            return self._vote_each(handles, participants, oks)
+        indices, valid = self._valid(handles)
+
+        # First response per (transaction, participant) within the batch
+        positions = np.flatnonzero(valid)
+        _, first = np.unique(indices[positions] * self.participants + participants[positions],
+                             return_index=True)
+        positions = positions[first]
+        indices, participants, oks = indices[positions], participants[positions], oks[positions]
+        words = participants // _WORD_BITS
+        bits = np.left_shift(np.uint64(1), (participants % _WORD_BITS).astype(np.uint64))
+        fresh = ((self.yes[indices, words] | self.no[indices, words]) & bits) == 0
+        indices, words, bits, oks = indices[fresh], words[fresh], bits[fresh], oks[fresh]
+
+        # Distinct participants set distinct bits, so OR equals add per word
+        np.add.at(self.yes, (indices[oks], words[oks]), bits[oks])
+        np.add.at(self.no, (indices[~oks], words[~oks]), bits[~oks])
+        np.add.at(self.yes_counts, indices[oks], 1)
+        np.add.at(self.no_counts, indices[~oks], 1)
+
+        touched = np.unique(indices)
+        touched = touched[self.decisions[touched] == PENDING]
+        decided = np.where(self.yes_counts[touched] >= self.quorum, QUORUM,
+                           np.where(self.no_counts[touched] > self.participants - self.quorum,
+                                    UNREACHABLE, PENDING)).astype(np.int8)
+        touched, decided = touched[decided != PENDING], decided[decided != PENDING]
+        self.decisions[touched] = decided
+        return touched | (self._generations[touched] << _INDEX_BITS), decided
+
+    def _vote_each(self, handles, participants, oks):
+        """vote_many for small batches, one vote call per response."""
+        decided, decisions = [], []
+        for handle, participant, ok in zip(handles.tolist(), participants.tolist(), oks.tolist()):
+            before = self.decision(handle)
+            after = self.vote(handle, participant, ok)
+            if before == PENDING and after != PENDING:
+                decided.append(handle)
+                decisions.append(after)
+        return np.array(decided, dtype=np.int64), np.array(decisions, dtype=np.int8)
+
+    def decision(self, handle):
+        """Decision of an open transaction (PENDING, QUORUM or UNREACHABLE), or None."""
+        index = self._index(int(handle))
+        return None if index is None else self._decisions[index]
+
+    def missing(self, handle):
+        """Positions of the participants that have not responded, or None."""
+        index = self._index(int(handle))
+        if index is None:
+            return None
+        missing = []
+        for word in range(self._words):
+            seen = self._yes[index * self._words + word] | self._no[index * self._words + word]
+            missing.extend(i for i in range(word * _WORD_BITS,
+                                            min((word + 1) * _WORD_BITS, self.participants))
+                           if not seen >> (i - word * _WORD_BITS) & 1)
+        return missing
+
+    def _clear(self, indices):
+        self.yes[indices] = 0
+        self.no[indices] = 0
+        self.yes_counts[indices] = 0
+        self.no_counts[indices] = 0
+        self.decisions[indices] = PENDING
+        self.live[indices] = False
+        self._generations[indices] += 1
+
+    def close(self, handle):
+        """
+        Stop collecting for a transaction (decided, timed out or abandoned)
+        and free its slot.
+
+        Returns:
+            int: Its last decision, or None if the handle was already closed
+        """
+        index = self._index(int(handle))
+        if index is None:
+            return None
+        decision = self._decisions[index]
+        self._clear(index)
+        self._open -= 1
+        self._free.append(index)
+        return decision
+
+    def close_many(self, handles):
+        """
+        Close several transactions.
+
+        Returns:
+            ndarray: Boolean mask of the handles that were still open
+        """
+        handles = np.asarray(handles, dtype=np.int64).reshape(-1)
+        indices, valid = self._valid(handles)
+        # A handle listed twice is closed once
+        indices = np.unique(indices[valid])
+        self._clear(indices)
+        self._open -= len(indices)
+        self._free.extend(indices.tolist())
+        return valid
@@ -0,0 +1,380 @@
+"""
+Time-bounded reservation store for 3PS auto-release
+Reservations (a key such as a txId, an amount and a phase) get a deadline
+from a TTL strategy (fixed, progressive or adaptive, as in
+doc/dxp-05-pattern-modifiers.md) and sit in a hierarchical timing wheel:
+LEVELS wheels of 2**SLOT_BITS slots, level k slots spanning
+2**(SLOT_BITS * k) ticks. Insert and cancel are O(1); a slot is emptied
+once per level, when the clock reaches it, so expiry is O(1) amortized per
+reservation however many are held. Reservation fields live in NumPy
+arrays indexed by a reusable slot number, and slots are expired and
+cascaded with whole-array operations.
+"""
+
+import math
+
+import numpy as np
+
+# Bits per wheel level (slots per level = 2 ** SLOT_BITS)
+SLOT_BITS = 8
+
+# Wheel levels; deadlines beyond the top level are cascaded until in range
+LEVELS = 4
+
+# Initial reservation capacity; arrays double as needed
+DEFAULT_CAPACITY = 1024
+
+# Default time-to-live (seconds), as in simple_3ps_petri.pnml's p_reserved
+DEFAULT_TTL = 300
+
+_INDEX_BITS = 32
+_INDEX_MASK = (1 << _INDEX_BITS) - 1
+_SLOT_MASK = (1 << SLOT_BITS) - 1
+# Ticks spanned by each level's whole wheel
+_SPANS = tuple(1 << (SLOT_BITS * (level + 1)) for level in range(LEVELS))
+
+class FixedTTL:
+    """Every reservation expires after the same time."""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = float(ttl)
+
+    def __call__(self, phase, load):
+        return self.ttl
+
+class ProgressiveTTL:
+    """
+    Later phases get longer TTLs, e.g. {1: 120, 2: 300}: reserved 2 minutes,
+    validated 5 minutes; other phases get the default.
+    """
+
+    def __init__(self, phases, default=60):
+        self.phases = {phase: float(ttl) for phase, ttl in phases.items()}
+        self.default = float(default)
+
+    def __call__(self, phase, load):
+        return self.phases.get(phase, self.default)
+
+class AdaptiveTTL:
+    """
+    Short TTLs while the store is loaded (aggressive cleanup), long ones
+    otherwise.
+    """
+
+    def __init__(self, normal=DEFAULT_TTL, loaded=30, threshold=0.8):
+        self.normal = float(normal)
+        self.loaded = float(loaded)
+        self.threshold = threshold
+
+    def __call__(self, phase, load):
+        return self.loaded if load > self.threshold else self.normal
+
+class ReservationStore:
+    """
+    Reservations with automatic expiry.
+
+    The store keeps its own clock: reserve and extend compute deadlines
+    from it, and expire(now) moves it forward and returns the reservations
+    that ran out. Handles are ints combining a slot number and a generation,
+    so a handle that was cancelled or expired is never confused with a
+    later reservation reusing the slot. Cancelled reservations are dropped
+    lazily, when the wheel reaches their slot.
+
+    reserve and cancel work on memoryviews of the arrays but still cost a
+    few microseconds of Python per call: in benchmarks/expiry_benchmark.py
+    about 330k inserts and 640k cancels per second, against 3.2M and 4.2M
+    for heapq, so one call at a time the store is slower than heapq overall
+    despite its cheaper expiry. reserve_many and cancel_many are the fast
+    path (about 4M and 2.3M per second).
+    """
+
+    def __init__(self, strategy=None, tick=1.0, limit=None, start=0.0,
+                 capacity=DEFAULT_CAPACITY):
+        """
+        Create an empty store.
+
+        Args:
+            strategy: Callable (phase, load) -> TTL in seconds, such as FixedTTL,
+                      ProgressiveTTL or AdaptiveTTL (default: FixedTTL())
+            tick: Wheel resolution in seconds; expiry happens at most one tick late
+            limit: Reservations at full load, for the load passed to the strategy
+                   (default: load is always 0)
+            start: Initial clock time in seconds
+            capacity: Initial array capacity
+        """
+        self.strategy = strategy or FixedTTL()
+        self.tick = float(tick)
+        self.limit = limit
+        self.clock = float(start)
+        self._time = math.floor(start / self.tick) + 1  # next tick to expire
+
+        self._slots = [[[] for _ in range(1 << SLOT_BITS)] for _ in range(LEVELS)]
+        self._counts = [0] * LEVELS
+        self._active = 0
+
+        self.keys = np.zeros(capacity, dtype=np.int64)
+        self.amounts = np.zeros(capacity, dtype=np.int64)
+        self.phases = np.zeros(capacity, dtype=np.int64)
+        self.deadlines = np.zeros(capacity, dtype=np.int64)
+        self.live = np.zeros(capacity, dtype=bool)
+        self._generations = np.zeros(capacity, dtype=np.int64)
+        self._stamps = np.zeros(capacity, dtype=np.int64)
+        self._free = list(range(capacity - 1, -1, -1))
+        self._views()
+
+    def __len__(self):
+        return self._active
+
+    @property
+    def load(self):
+        """Active reservations as a fraction of limit (0 without a limit)."""
+        return self._active / self.limit if self.limit else 0.0
+
+    def _views(self):
+        # Scalar paths index memoryviews of the arrays, avoiding NumPy scalar overhead
+        self._keys = memoryview(self.keys)
+        self._amounts = memoryview(self.amounts)
+        self._phases = memoryview(self.phases)
+        self._deadlines = memoryview(self.deadlines)
+        self._live = memoryview(self.live)
+        self._gens = memoryview(self._generations)
+        self._stamp_view = memoryview(self._stamps)
+
+    def _grow(self, needed):
+        capacity = len(self.keys)
+        new_capacity = max(2 * capacity, capacity + needed)
+        for name in ('keys', 'amounts', 'phases', 'deadlines', 'live', '_generations', '_stamps'):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+        self._free[:0] = range(new_capacity - 1, capacity - 1, -1)
+        self._views()
+
+    def _allocate(self, n):
+        if len(self._free) < n:
+            self._grow(n - len(self._free))
+        indices = self._free[-n:]
+        del self._free[-n:]
+        return np.array(indices[::-1], dtype=np.int64)
+
+    def _deadline(self, ttl):
+        """Deadline tick of a TTL from now: never before the next tick."""
+        return max(math.ceil((self.clock + ttl) / self.tick), self._time)
+
+    def _place_one(self, index, deadline):
+        """Put one reservation on the wheel (the scalar path of _place)."""
+        delta = deadline - self._time
+        level = 0
+        for span in _SPANS:
+            if delta < span:
+                break
+            level += 1
+        shift = SLOT_BITS * level
+        if level == LEVELS:
+            level -= 1
+            shift -= SLOT_BITS
+            slot = (self._time >> shift) - 1
+        else:
+            slot = deadline >> shift
+        self._slots[level][slot & _SLOT_MASK].append(index | (self._stamp_view[index] << _INDEX_BITS))
+        self._counts[level] += 1
+
+    def _place(self, indices, deadlines):
+        """Put slot entries (index | stamp << 32) on the wheel by deadline."""
+        stamps = self._stamps[indices]
+        entries = indices | (stamps << _INDEX_BITS)
+        delta = deadlines - self._time
+        level = np.zeros(len(indices), dtype=np.int64)
+        for k in range(1, LEVELS):
+            level += delta >= (1 << (SLOT_BITS * k))
+        slot = (deadlines >> (SLOT_BITS * level)) & ((1 << SLOT_BITS) - 1)
+
+        # Beyond the top level: the last slot, cascaded again before the deadline
+        top = LEVELS - 1
+        beyond = delta >= (1 << (SLOT_BITS * LEVELS))
+        if beyond.any():
+            slot[beyond] = ((self._time >> (SLOT_BITS * top)) - 1) & ((1 << SLOT_BITS) - 1)
+
+        keys = level * (1 << SLOT_BITS) + slot
+        order = np.argsort(keys, kind='stable')
+        keys, entries = keys[order], entries[order]
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(keys)]))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            k, s = divmod(int(keys[start]), 1 << SLOT_BITS)
+            self._slots[k][s].extend(entries[start:end].tolist())
+            self._counts[k] += end - start
+
+    def reserve_many(self, keys, amounts=1, phase=1):
+        """
+        Add reservations at the current clock time.
+
+        Args:
+            keys: Reservation keys (e.g. txIds)
+            amounts: Amount reserved, per reservation or shared
+            phase: Protocol phase, passed to the TTL strategy
+
+        Returns:
+            ndarray: Handles, one per key
+        """
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+        if not len(keys):
+            return np.empty(0, dtype=np.int64)
+        indices = self._allocate(len(keys))
+        deadline = self._deadline(self.strategy(phase, self.load))
+        self.keys[indices] = keys
+        self.amounts[indices] = amounts
+        self.phases[indices] = phase
+        self.deadlines[indices] = deadline
+        self.live[indices] = True
+        self._active += len(keys)
+        self._place(indices, np.full(len(keys), deadline, dtype=np.int64))
+        return indices | (self._generations[indices] << _INDEX_BITS)
+
+    def reserve(self, key, amount=1, phase=1):
+        """Add one reservation; returns its handle."""
+        if not self._free:
+            self._grow(1)
+        index = self._free.pop()
+        deadline = self._deadline(self.strategy(phase, self.load))
+        self._keys[index] = key
+        self._amounts[index] = amount
+        self._phases[index] = phase
+        self._deadlines[index] = deadline
+        self._live[index] = True
+        self._active += 1
+        self._place_one(index, deadline)
+        return index | (self._gens[index] << _INDEX_BITS)
+
+    def _index(self, handle):
+        """Slot number of a live handle, or None."""
+        index = handle & _INDEX_MASK
+        if index < len(self._live) and self._live[index] and \
+                self._gens[index] == handle >> _INDEX_BITS:
+            return index
+        return None
+
+    def __contains__(self, handle):
+        return self._index(int(handle)) is not None
+
+    def _release(self, indices):
+        self.live[indices] = False
+        self._generations[indices] += 1
+        self._stamps[indices] += 1
+        self._active -= len(indices)
+        self._free.extend(np.asarray(indices).tolist())
+
+    def cancel(self, handle):
+        """
+        Remove a reservation before it expires (committed or released).
+
+        Returns:
+            bool: False if the handle had already expired or been cancelled
+        """
+        index = self._index(int(handle))
+        if index is None:
+            return False
+        self._live[index] = False
+        self._gens[index] += 1
+        self._stamp_view[index] += 1
+        self._active -= 1
+        self._free.append(index)
+        return True
+
+    def cancel_many(self, handles):
+        """
+        Remove several reservations before they expire.
+
+        Returns:
+            ndarray: Boolean mask of the handles that were still live
+        """
+        handles = np.asarray(handles, dtype=np.int64).reshape(-1)
+        indices = handles & _INDEX_MASK
+        valid = indices < len(self.keys)
+        valid[valid] = (self.live[indices[valid]]
+                        & (self._generations[indices[valid]] == handles[valid] >> _INDEX_BITS))
+        # A handle listed twice is released once
+        indices = np.unique(indices[valid])
+        self._release(indices)
+        return valid
+
+    def extend(self, handle, phase=None):
+        """
+        Restart a reservation's TTL from now, optionally moving it to a new
+        phase (a progressive strategy then gives it that phase's TTL).
+
+        Returns:
+            bool: False if the handle had already expired or been cancelled
+        """
+        index = self._index(int(handle))
+        if index is None:
+            return False
+        if phase is not None:
+            self._phases[index] = phase
+        deadline = self._deadline(self.strategy(self._phases[index], self.load))
+        self._deadlines[index] = deadline
+        self._stamp_view[index] += 1  # the old wheel entry goes stale
+        self._place_one(index, deadline)
+        return True
+
+    def deadline(self, handle):
+        """Expiry time in seconds of a live reservation, or None."""
+        index = self._index(int(handle))
+        return None if index is None else self._deadlines[index] * self.tick
+
+    def _take(self, level, slot):
+        """Empty a wheel slot, keeping the entries that are still current."""
+        entries = self._slots[level][slot]
+        if not entries:
+            return np.empty(0, dtype=np.int64)
+        self._slots[level][slot] = []
+        self._counts[level] -= len(entries)
+        entries = np.array(entries, dtype=np.int64)
+        indices = entries & _INDEX_MASK
+        current = self.live[indices] & (self._stamps[indices] == entries >> _INDEX_BITS)
+        return indices[current]
+
+    def expire(self, now):
+        """
+        Move the clock to now and remove the reservations whose deadline passed.
+
+        Args:
+            now: Time in seconds (not before the current clock)
+
+        Returns:
+            dict: 'keys', 'amounts' and 'phases' arrays of the expired
+                  reservations, in deadline order, for the caller to release
+        """
+        target = math.floor(now / self.tick)
+        self.clock = max(self.clock, float(now))
+        expired = []
+        mask = (1 << SLOT_BITS) - 1
+        while self._time <= target:
+            time = self._time
+            # Cascade higher levels whose slot starts at this tick, top first
+            for k in range(LEVELS - 1, 0, -1):
+                if time & ((1 << (SLOT_BITS * k)) - 1) == 0 and self._counts[k]:
+                    indices = self._take(k, (time >> (SLOT_BITS * k)) & mask)
+                    if len(indices):
+                        self._place(indices, self.deadlines[indices])
+            indices = self._take(0, time & mask)
+            if len(indices):
+                expired.append(indices)
+                self._release(indices)
+            self._time = time + 1
+
+            # Skip ticks whose levels are empty, up to the next cascade
+            level = 0
+            while level < LEVELS and not self._counts[level]:
+                level += 1
+            if level == LEVELS:
+                self._time = max(self._time, target + 1)
+            elif level:
+                span = 1 << (SLOT_BITS * level)
+                self._time = min(-(-self._time // span) * span, target + 1)
+
+        indices = np.concatenate(expired) if expired else np.empty(0, dtype=np.int64)
+        return {'keys': self.keys[indices], 'amounts': self.amounts[indices],
+                'phases': self.phases[indices]}
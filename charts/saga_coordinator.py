@@ -0,0 +1,528 @@
+"""
+Executable 3PS reference: asyncio coordinator, participant stubs, load test
+The coordinator runs Reserve, Validate and Execute for many transactions at
+once (pipelining): each transaction is a task that broadcasts a phase
+request to every participant and waits, under the phase timeout, until all
+of them (or a quorum) answer, aborting on a refusal or timeout. Messages
+to the same participant are batched: an outbox per link sends whatever
+has queued up while the previous batch was in flight, up to a batch size,
+and participants answer in batches too. Participants hold reservations in
+a ReservationStore, so unconfirmed reservations auto-release after their
+TTL. Transports are in-process (with optional latency and loss) or
+localhost TCP with one JSON line per batch. Participants, the response
+timeout and the reservation TTL can be read from a 3PS PNML net such as
+ecommerce_medium_3ps_petri.pnml.
+
+Usage:
+    python saga_coordinator.py [--net FILE] [--participants N] [--concurrency 1,8,64,256]
+                               [--transactions N] [--transport local|tcp] [--latency S]
+                               [--loss P] [--timeout S] [--batch-size N] [--linger S]
+                               [--quorum Q] [--refuse P] [--batch-cost S]
+                               [--message-cost S] [--seed N]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+from reservation_store import FixedTTL, ReservationStore
+
+# Coordinator request per phase, and the participant's positive/negative replies
+PHASES = {
+    'RESERVE': ('RESERVE_REQUEST', 'RESERVED', 'REFUSED'),
+    'VALIDATE': ('VALIDATE_REQUEST', 'VALIDATED', 'INVALID'),
+    'EXECUTE': ('EXECUTE_REQUEST', 'EXECUTED', 'FAILED')
+}
+
+ABORT_REQUEST = 'ABORT_REQUEST'
+
+COORDINATOR = 'coordinator'
+
+# Response timeout (seconds) of Collect Reserves in ecommerce_medium_3ps_petri.pnml
+DEFAULT_TIMEOUT = 30.0
+
+# Reservation TTL (seconds) of Funds Reserved in the same net
+DEFAULT_TTL = 300.0
+
+# Largest batch an outbox sends at once
+DEFAULT_BATCH_SIZE = 256
+
+def protocol_settings(net):
+    """
+    Read the participants, response timeout and reservation TTL declared
+    in a 3PS net: recipients named by router rules (message.recipient ==
+    'payment'), the 'timeout' of the transition collecting responses and
+    the 'ttl' of reservation places.
+
+    Args:
+        net: PetriNet
+
+    Returns:
+        dict: 'participants' (list of names, empty if none are declared),
+              'timeout' and 'ttl' in seconds
+    """
+    participants, timeouts, ttls = [], [], []
+    for metadata in net.transition_metadata:
+        rules = metadata.get('router', {}).get('rule', [])
+        for rule in rules if isinstance(rules, list) else [rules]:
+            for name in re.findall(r"recipient\s*==\s*'([^']+)'", str(rule.get('if', ''))):
+                if name not in participants:
+                    participants.append(name)
+        if isinstance(metadata.get('timeout'), (int, float)):
+            collects = metadata.get('guard') == 'all_responses_received'
+            timeouts.insert(0, metadata['timeout']) if collects else timeouts.append(metadata['timeout'])
+    for metadata in net.place_metadata:
+        if isinstance(metadata.get('ttl'), (int, float)):
+            ttls.append(metadata['ttl'])
+    return {
+        'participants': participants,
+        'timeout': float(timeouts[0]) if timeouts else DEFAULT_TIMEOUT,
+        'ttl': float(ttls[0]) if ttls else DEFAULT_TTL
+    }
+
+class LocalTransport:
+    """
+    In-process transport: a batch is handed to the destination's deliver
+    after a fixed one-way latency, or lost with probability loss.
+    """
+
+    def __init__(self, latency=0.0, loss=0.0, seed=None):
+        self.latency = latency
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.endpoints = {}
+        self.batches = 0
+        self.messages = 0
+
+    def register(self, endpoint):
+        self.endpoints[endpoint.name] = endpoint
+
+    async def start(self):
+        pass
+
+    async def send(self, destination, batch):
+        self.batches += 1
+        self.messages += len(batch)
+        if self.loss and self.random.random() < self.loss:
+            return
+        loop = asyncio.get_running_loop()
+        if self.latency:
+            loop.call_later(self.latency, self.endpoints[destination].deliver, batch)
+        else:
+            loop.call_soon(self.endpoints[destination].deliver, batch)
+
+    async def close(self):
+        pass
+
+class TcpTransport(LocalTransport):
+    """
+    Localhost TCP transport: every endpoint listens on an ephemeral port and
+    keeps one connection to each peer; a batch is one JSON line.
+    """
+
+    def __init__(self, latency=0.0, loss=0.0, seed=None, host='127.0.0.1'):
+        super().__init__(latency, loss, seed)
+        self.host = host
+        self._servers = []
+        self._writers = {}
+        self._readers = []
+
+    async def _serve(self, endpoint, reader, writer):
+        self._readers.append(asyncio.current_task())
+        while line := await reader.readline():
+            endpoint.deliver(json.loads(line))
+        writer.close()
+
+    async def start(self):
+        ports = {}
+        for name, endpoint in self.endpoints.items():
+            server = await asyncio.start_server(
+                lambda r, w, endpoint=endpoint: self._serve(endpoint, r, w), self.host, 0)
+            self._servers.append(server)
+            ports[name] = server.sockets[0].getsockname()[1]
+        for name in self.endpoints:
+            _, writer = await asyncio.open_connection(self.host, ports[name])
+            self._writers[name] = writer
+
+    async def send(self, destination, batch):
+        self.batches += 1
+        self.messages += len(batch)
+        if self.loss and self.random.random() < self.loss:
+            return
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer = self._writers[destination]
+        writer.write(json.dumps(batch, separators=(',', ':')).encode() + b'\n')
+        await writer.drain()
+
+    async def close(self):
+        for writer in self._writers.values():
+            writer.close()
+            await writer.wait_closed()
+        await asyncio.gather(*self._readers)
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+
+class Outbox:
+    """
+    Batching queue of one link: a sender task ships everything queued while
+    the previous batch was in flight, optionally lingering to fill a batch.
+    """
+
+    def __init__(self, transport, destination, batch_size=DEFAULT_BATCH_SIZE, linger=0.0):
+        self.transport = transport
+        self.destination = destination
+        self.batch_size = batch_size
+        self.linger = linger
+        self._queue = []
+        self._ready = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def put(self, message):
+        self._queue.append(message)
+        self._ready.set()
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            if self.linger and len(self._queue) < self.batch_size:
+                await asyncio.sleep(self.linger)
+            batch = self._queue[:self.batch_size]
+            del self._queue[:self.batch_size]
+            if not self._queue:
+                self._ready.clear()
+            await self.transport.send(self.destination, batch)
+
+    def close(self):
+        self._task.cancel()
+
+class _Collector:
+    """Votes of one phase of one transaction."""
+
+    def __init__(self, needed, participants):
+        self.needed = needed
+        self.allowed_failures = participants - needed
+        self.ok = set()
+        self.failed = set()
+        self.future = asyncio.get_running_loop().create_future()
+
+    def record(self, sender, ok):
+        (self.ok if ok else self.failed).add(sender)
+        if self.future.done():
+            return
+        if len(self.ok) >= self.needed:
+            self.future.set_result(True)
+        elif len(self.failed) > self.allowed_failures:
+            self.future.set_result(False)
+
+class Coordinator:
+    """3PS coordinator running any number of transactions concurrently."""
+
+    def __init__(self, transport, participants, timeout=DEFAULT_TIMEOUT, quorum=None,
+                 batch_size=DEFAULT_BATCH_SIZE, linger=0.0):
+        """
+        Args:
+            transport: LocalTransport or TcpTransport
+            participants: Participant names
+            timeout: Seconds to wait for each phase's responses
+            quorum: Positive responses needed per phase (default: all, i.e. 3PS)
+            batch_size: Largest batch per participant link
+            linger: Seconds an outbox waits to fill a batch (default: 0)
+        """
+        self.name = COORDINATOR
+        self.transport = transport
+        self.participants = list(participants)
+        self.timeout = timeout
+        self.quorum = quorum or len(self.participants)
+        self.batch_size = batch_size
+        self.linger = linger
+        self._pending = {}
+        self._outboxes = {}
+        transport.register(self)
+
+    def start(self):
+        self._outboxes = {name: Outbox(self.transport, name, self.batch_size, self.linger)
+                          for name in self.participants}
+
+    def close(self):
+        for outbox in self._outboxes.values():
+            outbox.close()
+
+    def deliver(self, batch):
+        for message in batch:
+            collector = self._pending.get((message['tx'], message['phase']))
+            if collector is not None:
+                collector.record(message['from'], message['ok'])
+
+    def _broadcast(self, message_type, tx, phase, amount=0):
+        for outbox in self._outboxes.values():
+            outbox.put({'type': message_type, 'tx': tx, 'phase': phase, 'amount': amount,
+                        'from': self.name})
+
+    async def transact(self, tx, amount=1):
+        """
+        Run one transaction through Reserve, Validate and Execute.
+
+        Args:
+            tx: Transaction id (unique int)
+            amount: Units each participant reserves
+
+        Returns:
+            str: 'committed', 'aborted' (a participant refused) or 'timeout'
+        """
+        for phase, (request, _, _) in PHASES.items():
+            collector = _Collector(self.quorum, len(self.participants))
+            self._pending[(tx, phase)] = collector
+            self._broadcast(request, tx, phase, amount)
+            try:
+                ok = await asyncio.wait_for(collector.future, self.timeout)
+                outcome = 'aborted'
+            except asyncio.TimeoutError:
+                ok = False
+                outcome = 'timeout'
+            finally:
+                del self._pending[(tx, phase)]
+            if phase == 'EXECUTE':
+                # Past Validate the decision is commit; stragglers execute late or expire
+                return 'committed'
+            if not ok:
+                self._broadcast(ABORT_REQUEST, tx, phase)
+                return outcome
+
+class Participant:
+    """
+    Participant stub: one resource with a stock, reservations with TTL
+    auto-release, and an optional simulated service time per batch and per
+    message (none by default, so the load test measures the protocol).
+    """
+
+    def __init__(self, name, transport, stock=10 ** 9, ttl=DEFAULT_TTL, refuse=0.0,
+                 batch_cost=0.0, message_cost=0.0,
+                 batch_size=DEFAULT_BATCH_SIZE, linger=0.0, seed=None):
+        self.name = name
+        self.transport = transport
+        self.stock = stock
+        self.refuse = refuse
+        self.batch_cost = batch_cost
+        self.message_cost = message_cost
+        self.batch_size = batch_size
+        self.linger = linger
+        self.random = random.Random(seed)
+        self.store = ReservationStore(FixedTTL(ttl), tick=min(1.0, ttl / 100))
+        self.handles = {}
+        self.executed = 0
+        self.expired = 0
+        self._inbox = None
+        self._task = None
+        self._outbox = None
+        self._started = 0.0
+        transport.register(self)
+
+    def start(self):
+        self._inbox = asyncio.Queue()
+        self._outbox = Outbox(self.transport, COORDINATOR, self.batch_size, self.linger)
+        self._started = asyncio.get_running_loop().time()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def close(self):
+        self._task.cancel()
+        self._outbox.close()
+
+    def deliver(self, batch):
+        self._inbox.put_nowait(batch)
+
+    def _expire(self):
+        expired = self.store.expire(asyncio.get_running_loop().time() - self._started)
+        for tx, amount in zip(expired['keys'].tolist(), expired['amounts'].tolist()):
+            self.handles.pop(tx, None)
+            self.stock += amount
+            self.expired += 1
+
+    def _handle(self, message):
+        tx, phase = message['tx'], message['phase']
+        handle, amount = self.handles.get(tx, (None, 0))
+        if message['type'] == ABORT_REQUEST:
+            if handle is not None and self.store.cancel(handle):
+                self.stock += amount
+            self.handles.pop(tx, None)
+            return None
+        if phase == 'RESERVE':
+            amount = message['amount']
+            ok = self.stock >= amount and self.random.random() >= self.refuse
+            if ok:
+                self.stock -= amount
+                self.handles[tx] = (self.store.reserve(tx, amount), amount)
+        elif phase == 'VALIDATE':
+            ok = handle is not None and handle in self.store
+            if ok:
+                self.store.extend(handle, phase=2)
+        else:
+            ok = handle is not None and self.store.cancel(handle)
+            self.handles.pop(tx, None)
+            self.executed += ok
+        _, positive, negative = PHASES[phase]
+        return {'type': positive if ok else negative, 'tx': tx, 'phase': phase, 'ok': ok,
+                'from': self.name}
+
+    async def _run(self):
+        while True:
+            batch = await self._inbox.get()
+            while not self._inbox.empty():
+                batch = batch + self._inbox.get_nowait()
+            service = self.batch_cost + self.message_cost * len(batch)
+            if service:
+                await asyncio.sleep(service)
+            self._expire()
+            for message in batch:
+                response = self._handle(message)
+                if response is not None:
+                    self._outbox.put(response)
+
+async def load_test(concurrency, transactions, participants=('payment', 'inventory', 'shipping'),
+                    transport='local', latency=0.0, loss=0.0, timeout=DEFAULT_TIMEOUT,
+                    ttl=DEFAULT_TTL, quorum=None, refuse=0.0, batch_size=DEFAULT_BATCH_SIZE,
+                    linger=0.0, batch_cost=0.0, message_cost=0.0, seed=0):
+    """
+    Run transactions through a fresh coordinator and participants with a
+    fixed number of concurrent clients, each starting its next transaction
+    as soon as the previous one finishes.
+
+    Args:
+        concurrency: Concurrent clients (transactions in flight)
+        transactions: Transactions in total
+        participants: Participant names
+        transport: 'local' or 'tcp'
+        latency: One-way network latency in seconds
+        loss: Probability a batch is lost
+        timeout: Coordinator response timeout per phase
+        ttl: Participant reservation TTL
+        quorum: Positive responses needed per phase (default: all)
+        refuse: Probability a participant refuses a reservation
+        batch_size: Largest batch per link
+        linger: Seconds an outbox waits to fill a batch
+        batch_cost: Participant service time per batch in seconds
+        message_cost: Participant service time per message in seconds
+        seed: Random seed of refusals and losses
+
+    Returns:
+        dict: Counts per outcome, seconds, tx/sec, latency p50/p99 in ms,
+              mean batch size and the messages sent
+    """
+    transport_class = TcpTransport if transport == 'tcp' else LocalTransport
+    network = transport_class(latency, loss, seed)
+    coordinator = Coordinator(network, participants, timeout, quorum, batch_size, linger)
+    stubs = [Participant(name, network, ttl=ttl, refuse=refuse, batch_cost=batch_cost,
+                         message_cost=message_cost, batch_size=batch_size, linger=linger,
+                         seed=seed + i + 1)
+             for i, name in enumerate(participants)]
+    await network.start()
+    coordinator.start()
+    for stub in stubs:
+        stub.start()
+
+    loop = asyncio.get_running_loop()
+    next_tx = iter(range(transactions))
+    latencies = []
+    outcomes = {'committed': 0, 'aborted': 0, 'timeout': 0}
+
+    async def client():
+        for tx in next_tx:
+            started = loop.time()
+            outcome = await coordinator.transact(tx)
+            latencies.append(loop.time() - started)
+            outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    coordinator.close()
+    for stub in stubs:
+        stub.close()
+    await network.close()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if latencies else (float('nan'),) * 2
+    return {
+        'concurrency': concurrency,
+        'transactions': transactions,
+        **outcomes,
+        'seconds': seconds,
+        'tx_per_sec': transactions / seconds if seconds else float('inf'),
+        'p50_ms': float(p50),
+        'p99_ms': float(p99),
+        'messages': network.messages,
+        'mean_batch': network.messages / network.batches if network.batches else 0.0
+    }
+
+def run_load_test(concurrency, transactions, **options):
+    """Run load_test in a new event loop."""
+    return asyncio.run(load_test(concurrency, transactions, **options))
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Load-test an asyncio 3PS coordinator")
+    parser.add_argument('--net', default=None,
+                        help="3PS PNML net to read participants, timeout and TTL from")
+    parser.add_argument('--participants', type=int, default=None,
+                        help="Participants (default: from --net, else 3)")
+    parser.add_argument('--concurrency', default='1,8,64,256',
+                        help="Comma-separated concurrent client counts")
+    parser.add_argument('--transactions', type=int, default=5000,
+                        help="Transactions per concurrency level (default: 5000)")
+    parser.add_argument('--transport', choices=('local', 'tcp'), default='local')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="One-way network latency in seconds (default: 0)")
+    parser.add_argument('--loss', type=float, default=0.0,
+                        help="Probability a batch is lost (default: 0)")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help=f"Response timeout per phase (default: from --net, else {DEFAULT_TIMEOUT:g}s)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Largest batch per link (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--linger', type=float, default=0.0,
+                        help="Seconds to wait to fill a batch (default: 0)")
+    parser.add_argument('--quorum', type=int, default=None,
+                        help="Positive responses needed per phase (default: all)")
+    parser.add_argument('--refuse', type=float, default=0.0,
+                        help="Probability a participant refuses a reservation")
+    parser.add_argument('--batch-cost', type=float, default=0.0,
+                        help="Simulated participant service time per batch in seconds (default: 0)")
+    parser.add_argument('--message-cost', type=float, default=0.0,
+                        help="Simulated participant service time per message in seconds (default: 0)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    settings = {'participants': [], 'timeout': DEFAULT_TIMEOUT, 'ttl': DEFAULT_TTL}
+    if args.net:
+        from petri_net import load_pnml
+        settings = protocol_settings(load_pnml(args.net))
+    participants = settings['participants'] or ['payment', 'inventory', 'shipping']
+    if args.participants:
+        participants = [f'participant-{i + 1}' for i in range(args.participants)]
+    timeout = args.timeout if args.timeout is not None else settings['timeout']
+
+    print(f"{len(participants)} participants ({', '.join(participants)}), "
+          f"{args.transport} transport, timeout {timeout:g}s, ttl {settings['ttl']:g}s, "
+          f"service time {args.batch_cost:g}s/batch + {args.message_cost:g}s/message")
+    print(f"{'clients':>8}{'tx/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'commit':>8}{'abort':>7}"
+          f"{'timeout':>8}{'batch':>7}")
+    for concurrency in [int(c) for c in args.concurrency.split(',')]:
+        report = run_load_test(concurrency, args.transactions, participants=participants,
+                               transport=args.transport, latency=args.latency, loss=args.loss,
+                               timeout=timeout, ttl=settings['ttl'], quorum=args.quorum,
+                               refuse=args.refuse, batch_size=args.batch_size,
+                               linger=args.linger, batch_cost=args.batch_cost,
+                               message_cost=args.message_cost, seed=args.seed)
+        print(f"{concurrency:>8}{report['tx_per_sec']:>10,.0f}{report['p50_ms']:>9.2f}"
+              f"{report['p99_ms']:>9.2f}{report['committed']:>8}{report['aborted']:>7}"
+              f"{report['timeout']:>8}{report['mean_batch']:>7.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
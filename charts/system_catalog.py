@@ -0,0 +1,211 @@
+"""
+Columnar catalog of distributed systems for the State-Convergence Chart
+Names, coordinates and categories are stored as NumPy columns with hash
+indexes on name and category, so lookups stay O(1) for large catalogs.
+"""
+
+import csv
+import json
+
+import numpy as np
+
+class SystemCatalog:
+    """
+    Column store of systems: one row per system with name, x, y and category.
+    """
+
+    def __init__(self, names, x, y, categories):
+        """
+        Build a catalog from parallel sequences.
+
+        Args:
+            names: System names (must be unique)
+            x: X coordinates
+            y: Y coordinates
+            categories: Category key of each system (see CATEGORIES)
+        """
+        self.names = np.asarray(names, dtype=object)
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+        # Categories are stored as small integer codes into category_names
+        self.category_names, codes = np.unique(np.asarray(categories, dtype=object),
+                                               return_inverse=True)
+        self.category_codes = codes.astype(np.int32).reshape(-1)
+
+        if not (len(self.names) == len(self.x) == len(self.y) == len(self.category_codes)):
+            raise ValueError("Catalog columns must all have the same length")
+
+        self._name_index = {name: row for row, name in enumerate(self.names.tolist())}
+        if len(self._name_index) != len(self.names):
+            raise ValueError("System names in a catalog must be unique")
+
+        # Stable sort keeps catalog order within each category; categories
+        # themselves are kept in order of first appearance
+        order = np.argsort(self.category_codes, kind='stable')
+        bounds = np.searchsorted(self.category_codes[order],
+                                 np.arange(len(self.category_names) + 1))
+        groups = [(category, order[bounds[code]:bounds[code + 1]])
+                  for code, category in enumerate(self.category_names.tolist())]
+        groups.sort(key=lambda group: group[1][0])
+        self._category_index = dict(groups)
+        self._category_records = {}
+
+    @classmethod
+    def from_data_points(cls, data_points):
+        """
+        Build a catalog from a list of data point dicts (like DATA_POINTS).
+
+        Args:
+            data_points: List of dicts with 'name', 'x', 'y' and 'category'
+
+        Returns:
+            SystemCatalog: New catalog
+        """
+        catalog = cls([dp['name'] for dp in data_points],
+                      [dp['x'] for dp in data_points],
+                      [dp['y'] for dp in data_points],
+                      [dp['category'] for dp in data_points])
+
+        # Reuse the source dicts so category queries hand back the originals
+        catalog._category_records = {
+            category: [data_points[row] for row in rows]
+            for category, rows in catalog._category_index.items()
+        }
+        return catalog
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        Load a catalog from a JSON file.
+        The file holds either a list of data point objects or an object
+        with a 'data_points' list.
+
+        Args:
+            path: Path to the JSON file
+
+        Returns:
+            SystemCatalog: New catalog
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data['data_points']
+        return cls.from_data_points(data)
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        Load a catalog from a CSV file with a name,x,y,category header.
+
+        Args:
+            path: Path to the CSV file
+
+        Returns:
+            SystemCatalog: New catalog
+        """
+        names, xs, ys, categories = [], [], [], []
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                names.append(row['name'])
+                xs.append(float(row['x']))
+                ys.append(float(row['y']))
+                categories.append(row['category'])
+        return cls(names, xs, ys, categories)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a catalog from a .json or .csv file, chosen by extension.
+
+        Args:
+            path: Path to the data file
+
+        Returns:
+            SystemCatalog: New catalog
+        """
+        if str(path).lower().endswith('.csv'):
+            return cls.from_csv(path)
+        return cls.from_json(path)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._name_index
+
+    @property
+    def categories(self):
+        """Category key of every row, as an object array."""
+        return self.category_names[self.category_codes]
+
+    def index_of(self, name):
+        """Get the row of a system, or None if it is not in the catalog."""
+        return self._name_index.get(name)
+
+    def coordinates(self, name):
+        """
+        Get the coordinates of a system.
+
+        Args:
+            name: System name
+
+        Returns:
+            tuple: (x, y), or None if the system is unknown
+        """
+        row = self._name_index.get(name)
+        if row is None:
+            return None
+        return (float(self.x[row]), float(self.y[row]))
+
+    def category_indices(self, category):
+        """
+        Get the rows belonging to a category.
+
+        Args:
+            category: Category key
+
+        Returns:
+            ndarray: Row indices in catalog order (empty if none)
+        """
+        return self._category_index.get(category, np.empty(0, dtype=np.intp))
+
+    def category_groups(self):
+        """
+        Get the coordinate columns of each category.
+
+        Returns:
+            dict: category -> (x array, y array)
+        """
+        return {category: (self.x[rows], self.y[rows])
+                for category, rows in self._category_index.items()}
+
+    def record(self, row):
+        """Get one row as a data point dict."""
+        return {
+            'name': self.names[row],
+            'x': float(self.x[row]),
+            'y': float(self.y[row]),
+            'category': self.category_names[self.category_codes[row]]
+        }
+
+    def systems_in_category(self, category):
+        """
+        Get all systems of a category as data point dicts.
+        The list is built on first request and reused afterwards.
+
+        Args:
+            category: Category key
+
+        Returns:
+            list: Data point dicts in catalog order
+        """
+        records = self._category_records.get(category)
+        if records is None:
+            records = [self.record(row) for row in self.category_indices(category)]
+            self._category_records[category] = records
+        return records
+
+    def to_data_points(self):
+        """Get every row as a list of data point dicts."""
+        return [self.record(row) for row in range(len(self))]
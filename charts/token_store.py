@@ -0,0 +1,375 @@
+"""
+Coloured, txId-indexed token store for executing 3PS nets
+Places such as customer_request (tokenType OrderRequest) or the multiset
+pending_responses of ecommerce_medium_3ps_petri.pnml hold tokens that
+belong to one transaction and carry a colour (a token type or the
+responding service) and an integer value (an amount). Each place keeps
+its tokens in struct-of-arrays form - parallel tx, colour and value
+columns, deleted by swapping in the last row - with an index from txId
+to rows and token counts per colour and per (txId, colour), so a
+transaction's tokens and colours are found without scanning the place.
+
+Transitions are bound to a txId: a binding is enabled when every input
+and test arc finds enough tokens of that transaction (inhibitor arcs:
+few enough), shared places hold enough tokens in total, and the
+transition's guard accepts. Enabled bindings are kept up to date
+incrementally: firing re-evaluates only the transitions adjacent to the
+places it changed, and only for the transaction it fired, so its cost
+does not grow with the number of tokens or transactions in the net.
+
+Places without a tokenType or multiset declaration that start with
+tokens (coord_idle, payment_funds_available, available_stock) are shared
+resources: their tokens belong to no transaction (NO_TX) and count in
+total; initial tokens of other places belong to transaction 0. Guards
+are looked up by name in GUARDS; other guard expressions (e.g.
+'available_stock >= requested_quantity') are not evaluated.
+"""
+
+import bisect
+from array import array
+
+import numpy as np
+
+# txId of tokens in shared places, and binding of transitions without
+# inputs from transaction places
+NO_TX = -1
+
+# Colour of tokens in places without a tokenType (colour id 0)
+DEFAULT_COLOUR = ''
+
+class PlaceTokens:
+    """
+    Tokens of one place as parallel tx, colour and value columns. Each
+    transaction's row numbers are kept sorted, so its newest token is its
+    last row.
+    """
+
+    __slots__ = ('tx', 'colour', 'value', 'rows', 'by_colour', 'by_tx_colour')
+
+    def __init__(self):
+        self.tx = array('q')
+        self.colour = array('q')
+        self.value = array('q')
+        self.rows = {}  # tx -> row numbers
+        self.by_colour = {}  # colour -> tokens
+        self.by_tx_colour = {}  # (tx, colour) -> tokens
+
+    def __len__(self):
+        return len(self.tx)
+
+    def count(self, tx):
+        """Tokens of a transaction."""
+        rows = self.rows.get(tx)
+        return len(rows) if rows else 0
+
+    def add(self, tx, colour, value):
+        row = len(self.tx)
+        self.tx.append(tx)
+        self.colour.append(colour)
+        self.value.append(value)
+        self.rows.setdefault(tx, []).append(row)
+        self.by_colour[colour] = self.by_colour.get(colour, 0) + 1
+        self.by_tx_colour[tx, colour] = self.by_tx_colour.get((tx, colour), 0) + 1
+
+    def remove(self, tx):
+        """Remove a transaction's newest token; returns its (colour, value)."""
+        rows = self.rows[tx]
+        row = rows.pop()
+        if not rows:
+            del self.rows[tx]
+        colour = self.colour[row]
+        token = (colour, self.value[row])
+        self._uncount(self.by_colour, colour)
+        self._uncount(self.by_tx_colour, (tx, colour))
+        last = len(self.tx) - 1
+        if row != last:
+            # The last row fills the hole; it is the largest row of its
+            # transaction, so its index entry is the last one
+            moved = self.tx[last]
+            self.tx[row], self.colour[row], self.value[row] = \
+                moved, self.colour[last], self.value[last]
+            moved_rows = self.rows[moved]
+            moved_rows.pop()
+            bisect.insort(moved_rows, row)
+        self.tx.pop()
+        self.colour.pop()
+        self.value.pop()
+        return token
+
+    @staticmethod
+    def _uncount(counts, key):
+        count = counts[key] - 1
+        if count:
+            counts[key] = count
+        else:
+            del counts[key]
+
+    def count_colour(self, colour, tx=None):
+        """Tokens of a colour, optionally of one transaction."""
+        if tx is None:
+            return self.by_colour.get(colour, 0)
+        return self.by_tx_colour.get((tx, colour), 0)
+
+    def colours(self, tx):
+        """Colours of a transaction's tokens."""
+        return [self.colour[row] for row in self.rows.get(tx, ())]
+
+    def columns(self):
+        """NumPy views (tx, colour, value) of the columns, valid until the next change."""
+        return tuple(np.frombuffer(column, dtype=np.int64) if len(column) else
+                     np.empty(0, dtype=np.int64)
+                     for column in (self.tx, self.colour, self.value))
+
+def all_responses_received(store, transition, tx):
+    """
+    Guard of a multiset response place: the transaction has a token of
+    every colour its input places list in expectedResponses.
+    """
+    for place in store._inputs[transition]:
+        tokens = store.places[place]
+        for colour in store.expected[place]:
+            if not tokens.count_colour(colour, tx):
+                return False
+    return True
+
+# Guard name -> callable (store, transition index, txId) -> bool
+GUARDS = {'all_responses_received': all_responses_received}
+
+class TokenStore:
+    """
+    Coloured marking of a net with incrementally maintained enabled bindings.
+    """
+
+    def __init__(self, net, shared=None, guards=None):
+        """
+        Create the initial marking.
+
+        Args:
+            net: PetriNet
+            shared: Ids of shared (untyped resource) places (default: places
+                    with initial tokens and no tokenType or multiset)
+            guards: Extra guard name -> callable (store, transition, tx) -> bool
+        """
+        self.net = net
+        self.colour_names = [DEFAULT_COLOUR]
+        self._colour_ids = {DEFAULT_COLOUR: 0}
+        self.guards = {**GUARDS, **(guards or {})}
+
+        if shared is None:
+            self.shared = np.array([initial > 0 and not ('tokenType' in metadata or
+                                                         metadata.get('multiset'))
+                                    for initial, metadata in zip(net.initial_marking,
+                                                                 net.place_metadata)], dtype=bool)
+        else:
+            self.shared = np.zeros(net.n_places, dtype=bool)
+            self.shared[[net.place(place) for place in shared]] = True
+        self.default_colours = [self.colour(metadata.get('tokenType', DEFAULT_COLOUR))
+                                for metadata in net.place_metadata]
+        self.expected = []
+        for metadata in net.place_metadata:
+            services = metadata.get('expectedResponses', {})
+            services = services.get('service', []) if isinstance(services, dict) else services
+            services = [services] if isinstance(services, str) else services
+            self.expected.append({self.colour(name) for name in services})
+
+        self.places = [PlaceTokens() for _ in range(net.n_places)]
+        for place in np.flatnonzero(net.initial_marking):
+            tokens = self.places[place]
+            tx = NO_TX if self.shared[place] else 0
+            for _ in range(int(net.initial_marking[place])):
+                tokens.add(tx, self.default_colours[place], 0)
+
+        self._compile()
+        self.fired = 0
+
+    def _compile(self):
+        """Per transition: arcs split by place kind, guard, and place -> transitions watching it."""
+        net = self.net
+        self._arcs = [[] for _ in range(net.n_transitions)]  # (place, weight, inhibitor)
+        self._inputs = [[] for _ in range(net.n_transitions)]
+        self._pre = [[] for _ in range(net.n_transitions)]
+        self._post = [[] for _ in range(net.n_transitions)]
+        self.watchers = [[] for _ in range(net.n_places)]
+        for t in range(net.n_transitions):
+            for offsets, places, weights, blocks in (
+                    (net.pre_offsets, net.pre_places, net.pre_weights, False),
+                    (net.test_offsets, net.test_places, net.test_weights, False),
+                    (net.inhibitor_offsets, net.inhibitor_places, net.inhibitor_weights, True)):
+                for i in range(offsets[t], offsets[t + 1]):
+                    place = int(places[i])
+                    self._arcs[t].append((place, int(weights[i]), blocks))
+                    if not blocks:
+                        self._inputs[t].append(place)
+                    if t not in self.watchers[place]:
+                        self.watchers[place].append(t)
+            self._pre[t] = [(int(p), int(w)) for p, w in zip(*net.inputs(t))]
+            self._post[t] = [(int(p), int(w)) for p, w in zip(*net.outputs(t))]
+
+        # A transition is bound to a txId when it reads a transaction place
+        self.bound = [any(not self.shared[p] for p in inputs) for inputs in self._inputs]
+        self._tx_arcs = [[arc for arc in arcs if bound and not self.shared[arc[0]]]
+                         for arcs, bound in zip(self._arcs, self.bound)]
+        self._total_arcs = [[arc for arc in arcs if not (bound and not self.shared[arc[0]])]
+                            for arcs, bound in zip(self._arcs, self.bound)]
+        self._guards = [self.guards.get(metadata.get('guard')) for metadata in net.transition_metadata]
+        # First transaction place each transition produces into (None: no tx needed)
+        self._needs_tx = [next((place for place, _ in post if not self.shared[place]), None)
+                          for post in self._post]
+        # Subprocess transitions stand for their pages and never fire themselves
+        self._fireable = [not subprocess for subprocess in net.subprocess.tolist()]
+
+        self.ready = [set() for _ in range(net.n_transitions)]  # bound: enabled txIds
+        self.total_ok = [False] * net.n_transitions
+        for t in range(net.n_transitions):
+            self._check_totals(t)
+            if self.bound[t]:
+                for tx in {tx for p in self._inputs[t] for tx in self.places[p].rows}:
+                    self._check_tx(t, tx)
+
+    def colour(self, name):
+        """Get (interning if new) the id of a colour name."""
+        colour = self._colour_ids.get(name)
+        if colour is None:
+            colour = self._colour_ids[name] = len(self.colour_names)
+            self.colour_names.append(name)
+        return colour
+
+    def _check_totals(self, t):
+        ok = self._fireable[t]
+        for place, weight, blocks in self._total_arcs[t]:
+            if (len(self.places[place]) >= weight) == blocks:
+                ok = False
+                break
+        if ok and not self.bound[t] and self._guards[t] is not None:
+            ok = self._guards[t](self, t, NO_TX)
+        self.total_ok[t] = ok
+
+    def _check_tx(self, t, tx):
+        ok = True
+        for place, weight, blocks in self._tx_arcs[t]:
+            if (self.places[place].count(tx) >= weight) == blocks:
+                ok = False
+                break
+        if ok and self._guards[t] is not None:
+            ok = self._guards[t](self, t, tx)
+        if ok:
+            self.ready[t].add(tx)
+        else:
+            self.ready[t].discard(tx)
+
+    def _changed(self, place, tx):
+        """Re-evaluate the bindings a change of one transaction's tokens in a place can affect."""
+        shared = self.shared[place]
+        for t in self.watchers[place]:
+            if self.bound[t] and not shared:
+                self._check_tx(t, tx)
+            else:
+                self._check_totals(t)
+
+    def put(self, place, tx, colour=None, value=0, count=1):
+        """
+        Add tokens to a place (e.g. an order arriving at customer_request).
+
+        Args:
+            place: Place id, name or index
+            tx: Transaction id (ignored for shared places)
+            colour: Colour name (default: the place's tokenType)
+            value: Integer payload
+            count: Number of tokens
+        """
+        place = place if isinstance(place, (int, np.integer)) else self.net.place(place)
+        tx = NO_TX if self.shared[place] else tx
+        colour = self.default_colours[place] if colour is None else self.colour(colour)
+        for _ in range(count):
+            self.places[place].add(tx, colour, value)
+        self._changed(place, tx)
+
+    def enabled(self):
+        """
+        List the enabled bindings.
+
+        Returns:
+            list: (transition index, txId) pairs; unbound transitions have NO_TX
+        """
+        bindings = []
+        for t, ok in enumerate(self.total_ok):
+            if ok:
+                if self.bound[t]:
+                    bindings.extend((t, tx) for tx in self.ready[t])
+                else:
+                    bindings.append((t, NO_TX))
+        return bindings
+
+    def is_enabled(self, transition, tx=NO_TX):
+        if not self.total_ok[transition]:
+            return False
+        return tx in self.ready[transition] if self.bound[transition] else True
+
+    def fire(self, transition, tx=NO_TX, colour=None, value=0):
+        """
+        Fire a binding: consume the transaction's tokens (and shared tokens)
+        on input arcs, produce tokens of the transaction on output arcs.
+
+        Args:
+            transition: Transition index
+            tx: Transaction id; for an unbound transition, the transaction
+                its output tokens belong to (required when it produces
+                into a transaction place)
+            colour: Colour name of the produced tokens (default: each
+                    output place's tokenType)
+            value: Payload of the produced tokens
+
+        Returns:
+            list: Consumed tokens as (place, colour name, value)
+        """
+        if not self.is_enabled(transition, tx):
+            raise ValueError(f"transition {self.net.transition_ids[transition]} "
+                             f"is not enabled for tx {tx}")
+        # Checked before any token moves, so a refused firing leaves the marking as it was
+        if tx == NO_TX and self._needs_tx[transition] is not None:
+            raise ValueError(f"transition {self.net.transition_ids[transition]} "
+                             f"needs a tx for its tokens in "
+                             f"{self.net.place_ids[self._needs_tx[transition]]}")
+        consumed = []
+        changed = []
+        for place, weight in self._pre[transition]:
+            tokens = self.places[place]
+            owner = NO_TX if self.shared[place] else tx
+            for _ in range(weight):
+                token_colour, token_value = tokens.remove(owner)
+                consumed.append((place, self.colour_names[token_colour], token_value))
+            changed.append((place, owner))
+        colour_id = None if colour is None else self.colour(colour)
+        for place, weight in self._post[transition]:
+            owner = NO_TX if self.shared[place] else tx
+            token_colour = self.default_colours[place] if colour_id is None else colour_id
+            tokens = self.places[place]
+            for _ in range(weight):
+                tokens.add(owner, token_colour, value)
+            changed.append((place, owner))
+        for place, owner in changed:
+            self._changed(place, owner)
+        self.fired += 1
+        return consumed
+
+    def count(self, place, tx=None, colour=None):
+        """
+        Count tokens in a place, optionally of one transaction and/or colour.
+        """
+        place = place if isinstance(place, (int, np.integer)) else self.net.place(place)
+        tokens = self.places[place]
+        if colour is not None:
+            colour = self._colour_ids.get(colour)
+            if colour is None:
+                return 0
+            return tokens.count_colour(colour, tx)
+        return len(tokens) if tx is None else tokens.count(tx)
+
+    def transactions(self, place):
+        """txIds with tokens in a place."""
+        place = place if isinstance(place, (int, np.integer)) else self.net.place(place)
+        return list(self.places[place].rows)
+
+    def marking(self):
+        """Token count per place, as used by PetriNet.enabled."""
+        return np.array([len(tokens) for tokens in self.places], dtype=np.int64)